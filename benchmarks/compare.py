@@ -0,0 +1,62 @@
+"""
+Monster HW Controller - Benchmark Comparison
+İki benchmarks.run sonucunu (örn. iki commit) karşılaştırır. Medyan süre
+eşikten fazla kötüleşen benchmark varsa çıkış kodu 1 olur (CI için).
+
+Kullanım:
+    python3 -m benchmarks.compare bench-base.json bench-HEAD.json --threshold 15
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def compare(base: dict, head: dict, threshold_pct: float) -> int:
+    """Karşılaştırma tablosunu bas, gerileme sayısını döndür."""
+    print(f"base: {base.get('commit') or '?'}   head: {head.get('commit') or '?'}")
+    if base.get("spec") != head.get("spec"):
+        print(f"UYARI: farklı donanım parametreleri: {base.get('spec')} ↔ {head.get('spec')}")
+    print(f"  {'benchmark':<28} {'base µs':>12} {'head µs':>12} {'fark':>8}")
+
+    regressions = 0
+    base_res, head_res = base.get("results", {}), head.get("results", {})
+    for name in sorted(set(base_res) | set(head_res)):
+        if name not in base_res or name not in head_res:
+            side = "yalnızca head" if name in head_res else "yalnızca base"
+            print(f"  {name:<28} ({side})")
+            continue
+        b = base_res[name]["median_us"]
+        h = head_res[name]["median_us"]
+        delta = (h - b) / b * 100 if b > 0 else 0.0
+        mark = ""
+        if delta > threshold_pct:
+            mark = "  ✗ gerileme"
+            regressions += 1
+        elif delta < -threshold_pct:
+            mark = "  ✓ iyileşme"
+        print(f"  {name:<28} {b:12.1f} {h:12.1f} {delta:+7.1f}%{mark}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sonuçlarını karşılaştır")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument("--threshold", type=float, default=15.0,
+                        help="Gerileme eşiği (medyan, %%)")
+    args = parser.parse_args(argv)
+
+    regressions = compare(load(args.base), load(args.head), args.threshold)
+    if regressions:
+        print(f"{regressions} benchmark eşiği (%{args.threshold:.0f}) aştı")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Monster HW Controller - Fake Hardware Tree
+Controller'ları gerçek laptop olmadan çalıştırmak için sahte sysfs/debugfs
+ağacı, ayarlanabilir gecikmeli nvidia-smi stub'ı ve betiklenmiş EC imajı üretir.
+
+Kullanım:
+    python3 -m benchmarks.fake_hw /tmp/fakehw --cpus 16 --sensors 8 --smi-latency-ms 40
+    MONSTER_HW_ROOT=/tmp/fakehw python3 -m src.main status
+"""
+
+import argparse
+import json
+import os
+import stat
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+
+# Clevo EC register'ları (src.core.fan_controller.DEFAULT_REGISTERS ile aynı)
+EC_CPU_FAN_DUTY = 0x68
+EC_GPU_FAN_DUTY = 0x69
+EC_CPU_RPM_LSB = 0xCE
+EC_GPU_RPM_LSB = 0xD0
+EC_FAN_MODE = 0xD7
+EC_RPM_CONSTANT = 2156220  # RPM = 2156220 / raw
+
+NVIDIA_PCI_SLOT = "0000:01:00.0"
+IGPU_PCI_SLOT = "0000:00:02.0"
+
+# nvidia-smi --query-gpu alanları için varsayılan değerler
+DEFAULT_SMI_VALUES = {
+    "name": "NVIDIA GeForce RTX 3060 Laptop GPU",
+    "temperature.gpu": "62",
+    "fan.speed": "[N/A]",
+    "power.draw": "41.27",
+    "power.limit": "80.00",
+    "power.min_limit": "10.00",
+    "power.max_limit": "90.00",
+    "clocks.gr": "1425",
+    "clocks.mem": "5500",
+    "clocks.max.gr": "2100",
+    "clocks.max.mem": "5501",
+    "utilization.gpu": "37",
+    "utilization.memory": "21",
+    "memory.total": "6144",
+    "memory.used": "1312",
+    "persistence_mode": "Disabled",
+    "driver_version": "535.183.01",
+}
+
+# nvidia-smi stub'ı: durum JSON dosyasından okur, -pl ile günceller
+SMI_STUB = '''#!{python}
+import json, os, sys, time
+STATE = {state!r}
+time.sleep(float(os.environ.get("MONSTER_FAKE_SMI_LATENCY_MS", {latency_ms!r})) / 1000)
+with open(STATE) as f:
+    values = json.load(f)
+args = sys.argv[1:]
+for arg in args:
+    if arg.startswith("--query-gpu="):
+        fields = arg.split("=", 1)[1].split(",")
+        print(", ".join(values.get(k, "[N/A]") for k in fields))
+        sys.exit(0)
+    if arg.startswith("--query-"):
+        sys.exit(0)
+if "-pl" in args:
+    values["power.limit"] = "%.2f" % float(args[args.index("-pl") + 1])
+    with open(STATE, "w") as f:
+        json.dump(values, f)
+sys.exit(0)
+'''
+
+
+@dataclass
+class FakeHwSpec:
+    """Sahte donanım ağacı parametreleri."""
+    cpus: int = 16
+    sensors: int = 8                # Toplam hwmon sıcaklık sensörü sayısı
+    smi_latency_ms: float = 0.0     # nvidia-smi stub gecikmesi
+    nvidia_runtime_status: str = "active"
+    cpu_fan_rpm: int = 2400
+    gpu_fan_rpm: int = 2600
+    ec_overrides: Dict[int, int] = field(default_factory=dict)
+
+
+def _write(path: Path, value) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"{value}\n")
+
+
+def _build_cpu(root: Path, cpus: int) -> None:
+    """intel_pstate + CPU başına cpufreq policy dizinleri."""
+    base = root / "sys/devices/system/cpu"
+    pstate = base / "intel_pstate"
+    for name, value in (("status", "active"), ("no_turbo", 0), ("hwp_dynamic_boost", 0),
+                        ("max_perf_pct", 100), ("min_perf_pct", 8),
+                        ("num_pstates", 39), ("turbo_pct", 35)):
+        _write(pstate / name, value)
+
+    for i in range(cpus):
+        policy = base / "cpufreq" / f"policy{i}"
+        for name, value in (
+            ("affected_cpus", i),
+            ("scaling_governor", "powersave"),
+            ("scaling_available_governors", "performance powersave"),
+            ("energy_performance_preference", "balance_performance"),
+            ("energy_performance_available_preferences",
+             "default performance balance_performance balance_power power"),
+            ("scaling_min_freq", 800000),
+            ("scaling_max_freq", 5000000),
+            ("cpuinfo_min_freq", 800000),
+            ("cpuinfo_max_freq", 5000000),
+            ("scaling_cur_freq", 2200000 + 10000 * i),
+        ):
+            _write(policy / name, value)
+        cpu_dir = base / f"cpu{i}"
+        cpu_dir.mkdir(parents=True, exist_ok=True)
+        link = cpu_dir / "cpufreq"
+        if not link.exists():
+            link.symlink_to(os.path.relpath(policy, cpu_dir))
+
+
+def _build_hwmon(root: Path, sensors: int) -> None:
+    """coretemp + PCH/NVMe/WiFi/ACPI; toplam `sensors` adet temp*_input."""
+    base = root / "sys/class/hwmon"
+    extras = [("acpitz", ""), ("pch_cometlake", ""), ("nvme", "Composite"),
+              ("iwlwifi_1", "")]
+    extras = extras[:max(0, sensors - 1)]
+    core_sensors = max(1, sensors - len(extras))
+
+    coretemp = base / "hwmon0"
+    _write(coretemp / "name", "coretemp")
+    for idx in range(1, core_sensors + 1):
+        label = "Package id 0" if idx == 1 else f"Core {idx - 2}"
+        _write(coretemp / f"temp{idx}_label", label)
+        _write(coretemp / f"temp{idx}_input", 55000 + 1000 * (idx % 7))
+        _write(coretemp / f"temp{idx}_max", 100000)
+        _write(coretemp / f"temp{idx}_crit", 100000)
+
+    for n, (name, label) in enumerate(extras, start=1):
+        hw = base / f"hwmon{n}"
+        _write(hw / "name", name)
+        _write(hw / "temp1_input", 40000 + 2000 * n)
+        if label:
+            _write(hw / "temp1_label", label)
+
+
+def _build_drm(root: Path) -> None:
+    """i915 card0 frekans dosyaları."""
+    card = root / "sys/class/drm/card0"
+    for name, value in (("gt_act_freq_mhz", 350), ("gt_cur_freq_mhz", 350),
+                        ("gt_min_freq_mhz", 350), ("gt_max_freq_mhz", 1150),
+                        ("gt_boost_freq_mhz", 1150), ("gt_RP0_freq_mhz", 1150),
+                        ("gt_RP1_freq_mhz", 350), ("gt_RPn_freq_mhz", 350)):
+        _write(card / name, value)
+    _write(card / "device/vendor", "0x8086")
+
+
+def _build_pci(root: Path, runtime_status: str) -> None:
+    """NVIDIA dGPU PCI cihazı (runtime PM + nvidia driver bağlantısı)."""
+    pci = root / "sys/bus/pci/devices"
+    igpu = pci / IGPU_PCI_SLOT
+    _write(igpu / "vendor", "0x8086")
+    _write(igpu / "class", "0x030000")
+
+    dev = pci / NVIDIA_PCI_SLOT
+    _write(dev / "vendor", "0x10de")
+    _write(dev / "class", "0x030000")
+    _write(dev / "power/runtime_status", runtime_status)
+    _write(dev / "power_state", "D0" if runtime_status == "active" else "D3cold")
+    driver = root / "sys/bus/pci/drivers/nvidia"
+    driver.mkdir(parents=True, exist_ok=True)
+    link = dev / "driver"
+    if not link.exists():
+        link.symlink_to(os.path.relpath(driver, dev))
+    _write(root / "sys/module/nvidia/version", DEFAULT_SMI_VALUES["driver_version"])
+
+
+def ec_image(spec: FakeHwSpec) -> bytearray:
+    """Fan register'ları ayarlanmış 256 baytlık EC imajı."""
+    image = bytearray(256)
+    image[EC_CPU_FAN_DUTY] = 102
+    image[EC_GPU_FAN_DUTY] = 115
+    for lsb, rpm in ((EC_CPU_RPM_LSB, spec.cpu_fan_rpm), (EC_GPU_RPM_LSB, spec.gpu_fan_rpm)):
+        raw = EC_RPM_CONSTANT // rpm if rpm > 0 else 0
+        image[lsb] = raw & 0xFF
+        image[lsb + 1] = (raw >> 8) & 0xFF
+    image[EC_FAN_MODE] = 0
+    for offset, value in spec.ec_overrides.items():
+        image[offset] = value & 0xFF
+    return image
+
+
+def _build_ec(root: Path, spec: FakeHwSpec) -> None:
+    io = root / "sys/kernel/debug/ec/ec0/io"
+    io.parent.mkdir(parents=True, exist_ok=True)
+    io.write_bytes(bytes(ec_image(spec)))
+
+
+def _build_nvidia_smi(root: Path, latency_ms: float) -> Path:
+    """Ayarlanabilir gecikmeli nvidia-smi stub'ı (<kök>/usr/bin/nvidia-smi)."""
+    state = root / "var/lib/fake-nvidia/state.json"
+    state.parent.mkdir(parents=True, exist_ok=True)
+    state.write_text(json.dumps(DEFAULT_SMI_VALUES))
+
+    stub = root / "usr/bin/nvidia-smi"
+    stub.parent.mkdir(parents=True, exist_ok=True)
+    stub.write_text(SMI_STUB.format(python=sys.executable, state=str(state),
+                                    latency_ms=str(latency_ms)))
+    stub.chmod(stub.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return stub
+
+
+def build_fake_tree(root: Path, spec: FakeHwSpec = None) -> Path:
+    """`root` altında sahte donanım ağacını oluştur ve kökü döndür."""
+    spec = spec or FakeHwSpec()
+    root = Path(root).resolve()
+    _build_cpu(root, spec.cpus)
+    _build_hwmon(root, spec.sensors)
+    _build_drm(root)
+    _build_pci(root, spec.nvidia_runtime_status)
+    _build_ec(root, spec)
+    _build_nvidia_smi(root, spec.smi_latency_ms)
+    _write(root / "proc/sys/kernel/random/boot_id", "00000000-fake-hw00-0000-000000000000")
+    return root
+
+
+def _parse_ec_override(text: str):
+    offset, value = text.split("=", 1)
+    return int(offset, 0), int(value, 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sahte Monster donanım ağacı üret")
+    parser.add_argument("root", type=Path)
+    parser.add_argument("--cpus", type=int, default=16)
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--smi-latency-ms", type=float, default=0.0, dest="smi_latency_ms")
+    parser.add_argument("--nvidia-suspended", action="store_true", dest="nvidia_suspended")
+    parser.add_argument("--ec-set", action="append", default=[], type=_parse_ec_override,
+                        metavar="OFFSET=VALUE", dest="ec_set",
+                        help="EC imajında register ayarla (örn. 0xD7=1)")
+    args = parser.parse_args(argv)
+
+    spec = FakeHwSpec(
+        cpus=args.cpus, sensors=args.sensors, smi_latency_ms=args.smi_latency_ms,
+        nvidia_runtime_status="suspended" if args.nvidia_suspended else "active",
+        ec_overrides=dict(args.ec_set),
+    )
+    root = build_fake_tree(args.root, spec)
+    print(root)
+
+
+if __name__ == "__main__":
+    main()
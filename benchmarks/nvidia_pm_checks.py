@@ -0,0 +1,138 @@
+"""
+Monster HW Controller - NVIDIA Runtime PM Checks
+dGPU runtime PM ile uykudayken (D3cold) GPU'yu uyandıracak hiçbir çağrının
+yapılmadığını sahte donanım ağacına karşı doğrular. subprocess.run ve NVML
+(pynvml kuruluysa) kaydeden stub'larla değiştirilir:
+
+  - uykuda açılış: erişilebilirlik nvidia-smi'siz, sürücü bağlantısından
+  - uykuda get_status(): nvidia-smi/NVML yok, son bilinen durum döner
+  - uykuda sıcaklık ve süreç sorguları: nvidia-smi/NVML yok
+
+Kullanım:
+    python3 -m benchmarks.nvidia_pm_checks     # başarısızlıkta çıkış kodu 1
+"""
+
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from benchmarks.fake_hw import FakeHwSpec
+from benchmarks.run import BenchContext, _prepare_environment
+
+
+@contextmanager
+def no_gpu_wakeups():
+    """subprocess.run ve nvmlInit çağrılarını yapmadan kaydet; çağrı varsa AssertionError."""
+    from src.core import gpu_nvidia
+    calls: List[str] = []
+
+    def fake_run(cmd, *args, **kwargs):
+        calls.append(" ".join(map(str, cmd)))
+        raise subprocess.SubprocessError("GPU uykudayken subprocess çağrıldı")
+
+    def fake_nvml_init(*args, **kwargs):
+        calls.append("nvmlInit")
+        raise gpu_nvidia.pynvml.NVMLError(1)
+
+    real_run = subprocess.run
+    subprocess.run = fake_run
+    if gpu_nvidia.HAS_NVML:
+        real_init = gpu_nvidia.pynvml.nvmlInit
+        gpu_nvidia.pynvml.nvmlInit = fake_nvml_init
+    try:
+        yield calls
+    finally:
+        subprocess.run = real_run
+        if gpu_nvidia.HAS_NVML:
+            gpu_nvidia.pynvml.nvmlInit = real_init
+    if calls:
+        raise AssertionError(f"GPU uykudayken çağrıldı: {calls[0]}")
+
+
+def set_runtime_status(status: str):
+    """Sahte dGPU'nun power/runtime_status ve power_state dosyalarını değiştir."""
+    from src.core.gpu_nvidia import NvidiaRuntimePm
+    device = NvidiaRuntimePm().device
+    (device / "power" / "runtime_status").write_text(f"{status}\n")
+    (device / "power_state").write_text("D0\n" if status == "active" else "D3cold\n")
+
+
+def check_suspended_startup(ctx) -> str:
+    """Uykudaki GPU ile açılış: kullanılabilir, ama nvidia-smi çalıştırılmaz."""
+    from src.core.gpu_nvidia import NvidiaGpuController
+    with no_gpu_wakeups():
+        nvidia = NvidiaGpuController()
+        status = nvidia.get_status()
+    if not nvidia.available:
+        raise AssertionError("sürücü bağlıyken GPU kullanılamaz sayıldı")
+    if not status.suspended or status.runtime_status != "suspended":
+        raise AssertionError(f"uykuda görülmedi (runtime_status={status.runtime_status!r})")
+    return "available, suspended, 0 çağrı"
+
+
+def check_suspended_status_cached(ctx) -> str:
+    """Uyanıkken okunan durum, GPU uyuyunca nvidia-smi'siz aynen dönmeli."""
+    from src.core.gpu_nvidia import NvidiaGpuController
+    nvidia = NvidiaGpuController()
+    set_runtime_status("active")
+    try:
+        awake = nvidia.get_status()
+    finally:
+        set_runtime_status("suspended")
+    if awake.temp <= 0 or awake.power_limit <= 0:
+        raise AssertionError("uyanıkken durum okunamadı (nvidia-smi stub'ı?)")
+
+    with no_gpu_wakeups():
+        status = nvidia.get_status()
+    if not status.suspended:
+        raise AssertionError("suspended=False döndü")
+    for name in ("name", "temp", "power_limit", "power_min_limit", "clock_max_graphics",
+                 "driver_version"):
+        if getattr(status, name) != getattr(awake, name):
+            raise AssertionError(f"{name}: {getattr(status, name)!r} != "
+                                 f"önbellek {getattr(awake, name)!r}")
+    if status.power_draw != 0.0 or status.utilization_gpu != 0:
+        raise AssertionError("uykudaki GPU için anlık çekiş/kullanım sıfırlanmadı")
+    return f"önbellekten {status.temp:.0f}°C, {status.power_limit:.0f}W"
+
+
+def check_suspended_queries(ctx) -> str:
+    """Sıcaklık izleme ve süreç sorgusu uykudaki GPU'ya dokunmamalı."""
+    from src.core.gpu_nvidia import NvidiaGpuController
+    from src.core.temp_monitor import TempMonitor
+    with no_gpu_wakeups():
+        reading = TempMonitor().read_all()
+        usage = NvidiaGpuController().get_process_usage()
+    if reading.gpu_nvidia != 0.0:
+        raise AssertionError(f"uykudaki GPU sıcaklığı {reading.gpu_nvidia}°C döndü")
+    if usage:
+        raise AssertionError(f"uykudaki GPU için süreç listesi döndü: {usage}")
+    return "read_all + get_process_usage, 0 çağrı"
+
+
+CHECKS: List[Tuple[str, Callable]] = [
+    ("nvidia_pm.suspended_startup", check_suspended_startup),
+    ("nvidia_pm.suspended_status_cached", check_suspended_status_cached),
+    ("nvidia_pm.suspended_queries", check_suspended_queries),
+]
+
+
+def main() -> int:
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix="monster-nvidia-pm-") as tmp:
+        _prepare_environment(Path(tmp), FakeHwSpec(nvidia_runtime_status="suspended"))
+        ctx = BenchContext()
+        for name, check in CHECKS:
+            try:
+                print(f"  {name:<36} OK    {check(ctx)}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  {name:<36} HATA  {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
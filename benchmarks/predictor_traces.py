@@ -0,0 +1,109 @@
+"""
+Monster HW Controller - Thermal Predictor Trace Checks
+ThermalProtection.check()'i sahte donanım ağacına karşı sentetik sıcaklık
+izleriyle (zaman damgaları dışarıdan verilir) çalıştırır ve öngörünün
+davranışını doğrular:
+
+  - eşiği geçen rampa: seviye, gerçek sıcaklık eşiğe varmadan öngörüyle yükselir
+  - düz/gürültülü iz: öngörü hiç tetiklenmez
+  - max_level sınırı: öngörü seviyeyi max_level'ın üzerine çıkarmaz
+
+Kullanım:
+    python3 -m benchmarks.predictor_traces     # başarısızlıkta çıkış kodu 1
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from benchmarks.fake_hw import FakeHwSpec
+from benchmarks.run import BenchContext, _prepare_environment
+
+# (zaman s, cpu °C)
+Trace = List[Tuple[float, float]]
+
+
+def ramp(start: float, slope: float, duration: float, step: float = 1.0) -> Trace:
+    n = int(duration / step) + 1
+    return [(i * step, start + slope * i * step) for i in range(n)]
+
+
+def noisy_flat(base: float, amplitude: float, duration: float,
+               step: float = 1.0, seed: int = 1) -> Trace:
+    rng = random.Random(seed)
+    n = int(duration / step) + 1
+    return [(i * step, base + rng.uniform(-amplitude, amplitude)) for i in range(n)]
+
+
+def run_trace(ctx: BenchContext, trace: Iterable[Tuple[float, float]],
+              prediction: Optional[Dict] = None) -> list:
+    """İzi yeni bir ThermalProtection'dan geçir; her tur (t, temp, state) döner."""
+    from src.core.thermal_protection import ThermalProtection
+    thermal = ThermalProtection(ctx.cpu(), ctx.nvidia(), ctx.fan(), prediction)
+    return [(t, temp, thermal.check({"cpu": temp}, now=t)) for t, temp in trace]
+
+
+def check_ramp_crosses_threshold(ctx) -> str:
+    """1 °C/s rampa 80 °C'yi (seviye 2) geçer: seviye 2 öngörüyle, erken gelmeli."""
+    from src.core.thermal_protection import TEMP_LEVEL_2
+    steps = run_trace(ctx, ramp(70.0, 1.0, 15.0))
+    first = next(((t, temp, st) for t, temp, st in steps if st.level >= 2), None)
+    if first is None:
+        raise AssertionError("seviye 2'ye hiç çıkılmadı")
+    t, temp, st = first
+    if not st.predicted or temp >= TEMP_LEVEL_2:
+        raise AssertionError(f"seviye 2 öngörüsüz geldi (t={t:.0f}s, {temp:.1f}°C)")
+    return f"seviye 2, {TEMP_LEVEL_2 - temp:.1f}°C erken (t={t:.0f}s)"
+
+
+def check_noisy_flat_quiet(ctx) -> str:
+    """72 °C ± 0.5 gürültü: öngörü tetiklenmemeli, seviye 0 kalmalı."""
+    steps = run_trace(ctx, noisy_flat(72.0, 0.5, 120.0))
+    bad = [(t, st) for t, _, st in steps if st.predicted or st.level > 0]
+    if bad:
+        t, st = bad[0]
+        raise AssertionError(f"t={t:.0f}s seviye {st.level} (öngörü: {st.predicted}, "
+                             f"{st.predicted_temp:.1f}°C)")
+    return f"{len(steps)} tur, tetik yok"
+
+
+def check_max_level_cap(ctx) -> str:
+    """Dik rampa (3 °C/s): öngörülen seviye max_level'ı geçmemeli."""
+    from src.core.thermal_protection import level_for_temp
+    for max_level in (1, 3):
+        steps = run_trace(ctx, ramp(60.0, 3.0, 8.0), {"max_level": max_level})
+        for t, temp, st in steps:
+            real = level_for_temp(temp)
+            if st.predicted and st.level > max(max_level, real):
+                raise AssertionError(f"max_level={max_level}: t={t:.0f}s {temp:.1f}°C "
+                                     f"seviye {st.level}")
+        if not any(st.predicted and st.level == max_level for _, _, st in steps):
+            raise AssertionError(f"max_level={max_level}: öngörü sınıra hiç ulaşmadı")
+    return "max_level 1 ve 3 aşılmadı"
+
+
+CHECKS: List[Tuple[str, Callable]] = [
+    ("predictor.ramp_crosses_threshold", check_ramp_crosses_threshold),
+    ("predictor.noisy_flat_quiet", check_noisy_flat_quiet),
+    ("predictor.max_level_cap", check_max_level_cap),
+]
+
+
+def main() -> int:
+    failed = 0
+    with tempfile.TemporaryDirectory(prefix="monster-traces-") as tmp:
+        _prepare_environment(Path(tmp), FakeHwSpec())
+        ctx = BenchContext()
+        for name, check in CHECKS:
+            try:
+                print(f"  {name:<36} OK    {check(ctx)}")
+            except AssertionError as e:
+                failed += 1
+                print(f"  {name:<36} HATA  {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
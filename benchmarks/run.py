@@ -0,0 +1,301 @@
+"""
+Monster HW Controller - Micro-benchmark Harness
+Kontrol döngüsünün sıcak yollarını sahte donanım ağacına (fake_hw) karşı
+timeit ile ölçer ve sonuçları compare.py ile karşılaştırılabilir JSON'a yazar.
+
+Kullanım:
+    python3 -m benchmarks.run -o bench-HEAD.json
+    python3 -m benchmarks.run --filter temp --smi-latency-ms 30
+    python3 -m benchmarks.run --filter startup --startup-budget-ms 500
+    python3 -m benchmarks.compare bench-base.json bench-HEAD.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fake_hw import DEFAULT_SMI_VALUES, FakeHwSpec, build_fake_tree
+
+# get_status() sorgusunun alan sırası (gpu_nvidia.NvidiaGpuController.get_status)
+SMI_STATUS_FIELDS = (
+    "name", "temperature.gpu", "fan.speed",
+    "power.draw", "power.limit", "power.min_limit", "power.max_limit",
+    "clocks.gr", "clocks.mem", "clocks.max.gr", "clocks.max.mem",
+    "utilization.gpu", "utilization.memory",
+    "memory.total", "memory.used",
+    "persistence_mode", "driver_version",
+)
+
+# Ölçüm başına hedef süre ve tekrar sayısı
+TARGET_SEC = 0.2
+REPEAT = 5
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_STARTUP_BUDGET_MS = 1000.0
+
+
+class BenchContext:
+    """Sahte donanım üzerinde kurulmuş controller'lar (tembel)."""
+
+    def __init__(self, startup_budget_ms: float = DEFAULT_STARTUP_BUDGET_MS):
+        self._cache: Dict[str, object] = {}
+        self.startup_budget_ms = startup_budget_ms
+
+    def get(self, name: str, factory: Callable[[], object]):
+        if name not in self._cache:
+            self._cache[name] = factory()
+        return self._cache[name]
+
+    def temp(self):
+        from src.core.temp_monitor import TempMonitor
+        return self.get("temp", TempMonitor)
+
+    def cpu(self):
+        from src.core.cpu_controller import CpuController
+        return self.get("cpu", CpuController)
+
+    def nvidia(self):
+        from src.core.gpu_nvidia import NvidiaGpuController
+        return self.get("nvidia", NvidiaGpuController)
+
+    def fan(self):
+        from src.core.ec_access import EcAccess
+        from src.core.fan_controller import FanController
+        return self.get("fan", lambda: FanController(EcAccess()))
+
+    def service(self):
+        from src.daemon.hw_daemon import HwControllerService
+        return self.get("service", HwControllerService)
+
+
+# --- Benchmark tanımları: ctx -> ölçülecek callable ---
+
+def bench_temp_read_all(ctx):
+    temp = ctx.temp()
+    # GUI/daemon'da NVIDIA sıcaklığı get_status'tan beslenir; yalnızca hwmon ölçülsün
+    temp.set_nvidia_temp(62.0)
+    temp.read_all()  # Keşif/doğrulama ölçüm dışında kalsın
+    return temp.read_all
+
+
+def bench_temp_read_all_reuse(ctx):
+    """GUI/telemetri döngüsü gibi: okuma nesnesi çift tamponla yeniden kullanılır."""
+    from src.core.temp_monitor import TempReading
+    from src.utils.snapshot import DoubleBuffer
+    temp = ctx.temp()
+    temp.set_nvidia_temp(62.0)
+    temp.read_all()
+    buf = DoubleBuffer(TempReading)
+    return lambda: temp.read_all(buf.next())
+
+
+def bench_cpu_get_status(ctx):
+    return ctx.cpu().get_status
+
+
+def bench_cpu_get_status_reuse(ctx):
+    from src.core.cpu_controller import CpuStatus
+    from src.utils.snapshot import DoubleBuffer
+    cpu = ctx.cpu()
+    buf = DoubleBuffer(CpuStatus)
+    return lambda: cpu.get_status(buf.next())
+
+
+def bench_fan_get_status(ctx):
+    return ctx.fan().get_status
+
+
+def bench_fan_interpolate(ctx):
+    fan = ctx.fan()
+    temps = [35.0 + 0.5 * i for i in range(110)]
+
+    def run():
+        for t in temps:
+            fan._interpolate_duty(t)
+    return run
+
+
+def bench_thermal_check(ctx):
+    from src.core.thermal_protection import ThermalProtection
+    thermal = ThermalProtection(ctx.cpu(), ctx.nvidia(), ctx.fan())
+    temps = {"cpu": 68.0, "gpu_nvidia": 62.0, "nvme": 45.0, "pch": 50.0}
+    return lambda: thermal.check(temps)
+
+
+def bench_nvidia_parse(ctx):
+    """get_status() ayrıştırması — nvidia-smi çağrısı olmadan."""
+    nv = ctx.nvidia()
+    canned = ", ".join(DEFAULT_SMI_VALUES[k] for k in SMI_STATUS_FIELDS)
+    nv._query = lambda fields: canned
+    nv._get_graphics_mode_cached = lambda: "hybrid"
+    return nv.get_status
+
+
+def bench_nvidia_get_status_smi(ctx):
+    """get_status() — stub nvidia-smi süreci dahil."""
+    from src.core.gpu_nvidia import NvidiaGpuController
+    nv = NvidiaGpuController()
+    nv._get_graphics_mode_cached = lambda: "hybrid"
+    return nv.get_status
+
+
+def bench_apply_profile(ctx):
+    """İki profil arasında gidip gel (her çağrı gerçek fark yazar)."""
+    from src.core.gpu_intel import IntelGpuController
+    from src.core.profile_manager import ProfileManager
+    from src.utils.config import ConfigManager
+    pm = ProfileManager(ConfigManager(), ctx.cpu(), ctx.nvidia(),
+                        IntelGpuController(), ctx.fan())
+    names = ["sessiz", "performans"]
+    state = {"i": 0}
+
+    def run():
+        state["i"] ^= 1
+        pm.apply_profile(names[state["i"]])
+    return run
+
+
+def bench_dbus_dispatch(ctx):
+    """Daemon metot dağıtımı + JSON kodlama (GVariant paketleme hariç)."""
+    service = ctx.service()
+    service._nvidia._query = lambda fields: None
+    service._temp_monitor.set_nvidia_temp(62.0)
+    calls = [("GetTemperatures", ()), ("GetCpuStatus", ()), ("GetFanStatus", ()),
+             ("GetIntelGpuStatus", ()), ("ListProfiles", ())]
+
+    def run():
+        for name, args in calls:
+            service.dispatch(name, args)
+    return run
+
+
+def bench_startup_status(ctx):
+    """Soğuk başlangıç: yeni süreçte `status`; bütçe aşılırsa veya hata olursa başarısız."""
+    cmd = [sys.executable, "-m", "src.main",
+           "--startup-budget-ms", str(ctx.startup_budget_ms), "status"]
+
+    def run():
+        result = subprocess.run(cmd, cwd=PROJECT_ROOT, capture_output=True, text=True,
+                                timeout=60)
+        if result.returncode != 0:
+            tail = (result.stderr or result.stdout).strip().splitlines()[-3:]
+            raise RuntimeError(f"status çıkış kodu {result.returncode}: {' | '.join(tail)}")
+    return run
+
+
+BENCHMARKS: List[Tuple[str, Callable]] = [
+    ("temp.read_all", bench_temp_read_all),
+    ("temp.read_all_reuse", bench_temp_read_all_reuse),
+    ("cpu.get_status", bench_cpu_get_status),
+    ("cpu.get_status_reuse", bench_cpu_get_status_reuse),
+    ("fan.get_status", bench_fan_get_status),
+    ("fan.interpolate_duty_x110", bench_fan_interpolate),
+    ("thermal.check", bench_thermal_check),
+    ("nvidia.get_status_parse", bench_nvidia_parse),
+    ("nvidia.get_status_smi", bench_nvidia_get_status_smi),
+    ("profile.apply_profile", bench_apply_profile),
+    ("daemon.dispatch_x5", bench_dbus_dispatch),
+    ("startup.status_cold", bench_startup_status),
+]
+
+
+def measure(func: Callable[[], object]) -> Dict[str, float]:
+    """timeit.autorange ile iterasyon sayısını seç, REPEAT kez ölç."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    # autorange ~0.2 s hedefler; çok yavaş yollar için tek iterasyon yeter
+    number = max(1, int(number * TARGET_SEC / max(elapsed, 1e-9)))
+    runs = [t / number * 1e6 for t in timer.repeat(repeat=REPEAT, number=number)]
+    return {
+        "number": number,
+        "repeat": REPEAT,
+        "min_us": min(runs),
+        "median_us": statistics.median(runs),
+        "mean_us": statistics.mean(runs),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def _prepare_environment(workdir: Path, spec: FakeHwSpec):
+    """Sahte donanım kökünü ve izole HOME'u src import edilmeden önce ayarla."""
+    root = build_fake_tree(workdir / "hw", spec)
+    home = workdir / "home"
+    home.mkdir(exist_ok=True)
+    os.environ["MONSTER_HW_ROOT"] = str(root)
+    os.environ["HOME"] = str(home)
+    # Daemon setup_logger() DEBUG konsol çıktısı eklemesin
+    logger = logging.getLogger("monster-hw-ctrl")
+    logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.CRITICAL)
+    return root
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monster HW Controller micro-benchmark'ları")
+    parser.add_argument("-o", "--output", type=Path, help="Sonuç JSON dosyası")
+    parser.add_argument("--filter", default="", help="Yalnızca adı bunu içerenler")
+    parser.add_argument("--cpus", type=int, default=16)
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--smi-latency-ms", type=float, default=0.0, dest="smi_latency_ms")
+    parser.add_argument("--startup-budget-ms", type=float, default=DEFAULT_STARTUP_BUDGET_MS,
+                        dest="startup_budget_ms",
+                        help="startup.* ölçümlerinde `src.main --startup-budget-ms` değeri")
+    args = parser.parse_args(argv)
+
+    spec = FakeHwSpec(cpus=args.cpus, sensors=args.sensors,
+                      smi_latency_ms=args.smi_latency_ms)
+    results = {}
+    failed = []
+    with tempfile.TemporaryDirectory(prefix="monster-bench-") as tmp:
+        _prepare_environment(Path(tmp), spec)
+        ctx = BenchContext(args.startup_budget_ms)
+        for name, setup in BENCHMARKS:
+            if args.filter and args.filter not in name:
+                continue
+            try:
+                stats = measure(setup(ctx))
+            except Exception as e:
+                print(f"  {name:<28} HATA: {e}", file=sys.stderr)
+                failed.append(name)
+                continue
+            results[name] = stats
+            print(f"  {name:<28} {stats['median_us']:12.1f} µs  "
+                  f"(min {stats['min_us']:.1f}, n={stats['number']}x{stats['repeat']})")
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "spec": {"cpus": spec.cpus, "sensors": spec.sensors,
+                 "smi_latency_ms": spec.smi_latency_ms},
+        "results": results,
+        "failed": failed,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Sonuçlar yazıldı: {args.output}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
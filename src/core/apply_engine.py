@@ -0,0 +1,117 @@
+"""
+Monster HW Controller - Transactional Apply Engine
+Bağımsız alt sistemlere (CPU sysfs, nvidia-smi, i915 sysfs, EC) ait yazma
+setlerini paralel uygular. Herhangi biri başarısız olursa tüm alt sistemler
+koordineli olarak geri alınır. Alt sistem başına süreler raporlanır.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+log = get_logger("apply_engine")
+
+
+@dataclass
+class SubsystemResult:
+    """Tek bir alt sistemin uygulama sonucu."""
+    name: str
+    success: bool = True
+    elapsed_ms: float = 0.0
+    error: str = ""
+
+
+@dataclass
+class ApplyReport:
+    """Bir transaction'ın toplam sonucu."""
+    success: bool = True
+    rolled_back: bool = False
+    elapsed_ms: float = 0.0
+    results: List[SubsystemResult] = field(default_factory=list)
+
+    @property
+    def failed(self) -> List[str]:
+        return [r.name for r in self.results if not r.success]
+
+    def summary(self) -> str:
+        """Log için kısa süre özeti: 'cpu=12ms nvidia=240ms ...'."""
+        parts = [f"{r.name}={r.elapsed_ms:.0f}ms" + ("" if r.success else "(✗)")
+                 for r in self.results]
+        return " ".join(parts)
+
+
+def _timed(name: str, func: Callable[[], bool]) -> SubsystemResult:
+    """Bir adımı çalıştır ve süresini ölç. Exception başarısızlık sayılır."""
+    result = SubsystemResult(name=name)
+    start = time.monotonic()
+    try:
+        result.success = bool(func())
+    except Exception as e:
+        result.success = False
+        result.error = str(e)
+        log.error("Alt sistem uygulama hatası (%s): %s", name, e)
+    result.elapsed_ms = (time.monotonic() - start) * 1000
+    return result
+
+
+def _run_rollback(func: Callable[[], Optional[bool]]) -> bool:
+    """Rollback adımını çalıştır ve sonucunu döndür.
+
+    Sonuç döndürmeyen (None) adım başarılı sayılır; yalnızca False veya
+    exception başarısızlıktır.
+    """
+    result = func()
+    return True if result is None else bool(result)
+
+
+class ApplyTransaction:
+    """Alt sistem yazma setlerini paralel ve transactional uygular.
+
+    steps:     {"cpu": callable() -> bool, "nvidia": ..., ...}
+    rollbacks: {"cpu": callable() -> bool, ...} — başarısızlıkta hepsi çalışır
+    """
+
+    def __init__(self, steps: Dict[str, Callable[[], bool]],
+                 rollbacks: Dict[str, Callable[[], Optional[bool]]]):
+        self._steps = steps
+        self._rollbacks = rollbacks
+
+    @staticmethod
+    def _run_parallel(steps: Dict[str, Callable[[], bool]]) -> List[SubsystemResult]:
+        """Adımları eşzamanlı çalıştır; tek adım varsa thread açmadan çalıştır."""
+        if not steps:
+            return []
+        if len(steps) == 1:
+            name, func = next(iter(steps.items()))
+            return [_timed(name, func)]
+
+        with ThreadPoolExecutor(max_workers=len(steps),
+                                thread_name_prefix="profile-apply") as pool:
+            futures = [pool.submit(_timed, name, func) for name, func in steps.items()]
+            return [f.result() for f in futures]
+
+    def run(self) -> ApplyReport:
+        """Transaction'ı çalıştır ve raporu döndür."""
+        start = time.monotonic()
+        report = ApplyReport(results=self._run_parallel(self._steps))
+        report.success = all(r.success for r in report.results)
+
+        if not report.success and self._rollbacks:
+            log.warning("Alt sistem başarısız (%s) — tüm alt sistemler geri alınıyor",
+                        ", ".join(report.failed))
+            rollback_steps = {
+                name: partial(_run_rollback, func)
+                for name, func in self._rollbacks.items()
+            }
+            for r in self._run_parallel(rollback_steps):
+                if not r.success:
+                    log.error("Rollback başarısız (%s)%s — önceki ayarlar tam geri "
+                              "yüklenemedi", r.name, f": {r.error}" if r.error else "")
+            report.rolled_back = True
+
+        report.elapsed_ms = (time.monotonic() - start) * 1000
+        return report
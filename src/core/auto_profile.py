@@ -0,0 +1,290 @@
+"""
+Monster HW Controller - Automatic Profile Switching
+Çalışan süreç adları, AC/pil durumu ve sürekli CPU yüküne göre kurallarla
+profil seçen motor. Örnek: Steam oyunu açılınca "oyun", pilde "sessiz".
+
+Değerlendirme artımlıdır:
+  - /proc her turda yalnızca listelenir; comm dosyası sadece yeni PID'ler
+    için okunur, kaybolan PID'ler sayaçtan düşülür.
+  - Süreç adı → eşleşen kurallar sonucu ad başına bir kez hesaplanır.
+  - Girdi imzası (süreç eşleşmeleri, AC, yük eşikleri) değişmediyse kurallar
+    yeniden değerlendirilmez.
+
+Profil değişikliği pahalı olduğundan istenen profil `debounce_sec` boyunca
+sabit kalmalı ve son otomatik değişiklikten beri `min_dwell_sec` geçmiş
+olmalıdır. Kullanıcı elle başka profil seçerse, koşullar değişene kadar
+motor bu seçime dokunmaz.
+"""
+
+import fnmatch
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from src.core.power_supply import read_ac_online
+from src.utils.logger import get_logger
+
+log = get_logger("auto_profile")
+
+PROC_DIR = "/proc"
+
+
+@dataclass
+class ProfileRule:
+    """Bir otomatik profil kuralı; listede önce gelen kural önceliklidir.
+
+    Tüm verilen koşullar sağlanmalıdır (VE). Süreç desenleri comm adına
+    (en fazla 15 karakter) fnmatch ile uygulanır; biri yeterlidir.
+    """
+    profile: str
+    name: str = ""
+    processes: List[str] = field(default_factory=list)
+    power: Optional[str] = None        # "ac" | "battery" | None
+    min_load: Optional[float] = None   # Toplam CPU meşguliyeti % (0-100)
+    max_load: Optional[float] = None
+    load_sec: float = 0.0              # Yük koşulu bu kadar süre sürmeli
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProfileRule":
+        known = {f.name for f in fields(cls)}
+        rule = cls(**{k: v for k, v in data.items() if k in known})
+        if not rule.name:
+            rule.name = rule.profile
+        return rule
+
+
+class ProcessNameTracker:
+    """Çalışan süreç adlarını artımlı olarak izler (comm yalnızca yeni PID'de okunur)."""
+
+    def __init__(self):
+        self._pids: Dict[str, str] = {}
+        self.names: Counter = Counter()
+
+    def update(self) -> Tuple[List[str], List[str]]:
+        """(yeni görülen adlar, tamamen kaybolan adlar) döndür."""
+        try:
+            current = {pid for pid in os.listdir(PROC_DIR) if pid.isdigit()}
+        except OSError:
+            return [], []
+        added, removed = [], []
+        for pid in self._pids.keys() - current:
+            name = self._pids.pop(pid)
+            self.names[name] -= 1
+            if self.names[name] <= 0:
+                del self.names[name]
+                removed.append(name)
+        for pid in current - self._pids.keys():
+            try:
+                with open(f"{PROC_DIR}/{pid}/comm", "rb") as f:
+                    name = f.read().strip().decode("utf-8", "replace")
+            except OSError:
+                continue
+            self._pids[pid] = name
+            if self.names[name] == 0:
+                added.append(name)
+            self.names[name] += 1
+        return added, removed
+
+
+class CpuLoadMeter:
+    """/proc/stat ilk satırından iki okuma arası toplam CPU meşguliyeti (%)."""
+
+    def __init__(self):
+        self._prev: Optional[Tuple[int, int]] = None
+
+    def read(self) -> Optional[float]:
+        try:
+            with open(f"{PROC_DIR}/stat", "rb") as f:
+                parts = f.readline().split()[1:]
+            values = [int(v) for v in parts]
+        except (OSError, ValueError):
+            return None
+        idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+        total = sum(values[:8])
+        prev, self._prev = self._prev, (idle, total)
+        if prev is None or total <= prev[1]:
+            return None
+        return 100.0 * (1 - (idle - prev[0]) / (total - prev[1]))
+
+
+class AutoProfileEngine:
+    """Kuralları periyodik olarak değerlendirip profil uygulayan motor."""
+
+    def __init__(self, rules: List[ProfileRule], apply_profile: Callable[[str], bool],
+                 active_profile: Callable[[], Optional[str]],
+                 interval: float = 3.0, debounce_sec: float = 6.0,
+                 min_dwell_sec: float = 60.0, default_profile: Optional[str] = None,
+                 ac_source: Callable[[], Optional[bool]] = read_ac_online):
+        self._rules = rules
+        self._apply = apply_profile
+        self._active = active_profile
+        self._interval = max(0.5, float(interval))
+        self._debounce = float(debounce_sec)
+        self._min_dwell = float(min_dwell_sec)
+        self._default = default_profile
+        self._ac_source = ac_source
+
+        self._needs_procs = any(r.processes for r in rules)
+        self._needs_load = any(r.min_load is not None or r.max_load is not None for r in rules)
+        self._procs = ProcessNameTracker()
+        self._load = CpuLoadMeter()
+
+        # Artımlı eşleşme: ad → eşleşen kural indeksleri; kural → eşleşen çalışan ad sayısı
+        self._name_matches: Dict[str, FrozenSet[int]] = {}
+        self._rule_hits = [0] * len(rules)
+        self._load_since: List[Optional[float]] = [None] * len(rules)
+
+        self._ac_override: Optional[bool] = None
+        self._last_signature: Optional[tuple] = None
+        self._desired: Optional[str] = None
+        self._desired_since = 0.0
+        self._last_switch: Optional[float] = None
+        self._last_applied: Optional[str] = None
+        self._user_override_for: Optional[str] = None
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any], apply_profile, active_profile,
+                      **kwargs) -> Optional["AutoProfileEngine"]:
+        """Ayar sözlüğünden oluştur; kapalıysa veya kural yoksa None."""
+        if not settings.get("enabled"):
+            return None
+        rules = []
+        for data in settings.get("rules") or []:
+            try:
+                rules.append(ProfileRule.from_dict(data))
+            except TypeError as e:
+                log.error("Geçersiz otomatik profil kuralı %s: %s", data, e)
+        if not rules:
+            return None
+        return cls(
+            rules, apply_profile, active_profile,
+            interval=settings.get("interval_sec", 3.0),
+            debounce_sec=settings.get("debounce_sec", 6.0),
+            min_dwell_sec=settings.get("min_dwell_sec", 60.0),
+            default_profile=settings.get("default_profile"),
+            **kwargs,
+        )
+
+    @property
+    def desired_profile(self) -> Optional[str]:
+        return self._desired
+
+    def set_ac_online(self, online: Optional[bool]):
+        """AC durumunu olay kaynağından bildir (None = yeniden sysfs'ten oku)."""
+        self._ac_override = online
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="auto-profile")
+        self._thread.start()
+        log.info("Otomatik profil motoru başladı (%d kural)", len(self._rules))
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick(time.monotonic())
+            except Exception as e:
+                log.error("Otomatik profil hatası: %s", e)
+            self._stop.wait(self._interval)
+
+    # --- Değerlendirme ---
+
+    def _update_processes(self):
+        added, removed = self._procs.update()
+        for name in added:
+            matches = self._name_matches.get(name)
+            if matches is None:
+                matches = frozenset(
+                    i for i, rule in enumerate(self._rules)
+                    if any(fnmatch.fnmatchcase(name, pat) for pat in rule.processes)
+                )
+                self._name_matches[name] = matches
+            for i in matches:
+                self._rule_hits[i] += 1
+        for name in removed:
+            for i in self._name_matches.get(name, ()):
+                self._rule_hits[i] -= 1
+
+    def _load_ok(self, i: int, rule: ProfileRule, load: Optional[float], now: float) -> bool:
+        if rule.min_load is None and rule.max_load is None:
+            return True
+        in_range = load is not None \
+            and (rule.min_load is None or load >= rule.min_load) \
+            and (rule.max_load is None or load <= rule.max_load)
+        if not in_range:
+            self._load_since[i] = None
+            return False
+        if self._load_since[i] is None:
+            self._load_since[i] = now
+        return now - self._load_since[i] >= rule.load_sec
+
+    def evaluate(self, now: float) -> Optional[str]:
+        """Girdileri güncelle ve istenen profili döndür (eşleşme yoksa varsayılan)."""
+        if self._needs_procs:
+            self._update_processes()
+        ac = self._ac_override if self._ac_override is not None else self._ac_source()
+        load = self._load.read() if self._needs_load else None
+
+        load_flags = tuple(self._load_ok(i, r, load, now) for i, r in enumerate(self._rules))
+        signature = (tuple(h > 0 for h in self._rule_hits), ac, load_flags)
+        if signature == self._last_signature:
+            return self._desired
+        self._last_signature = signature
+
+        for i, rule in enumerate(self._rules):
+            if rule.processes and self._rule_hits[i] <= 0:
+                continue
+            if rule.power == "ac" and ac is not True:
+                continue
+            if rule.power == "battery" and ac is not False:
+                continue
+            if not load_flags[i]:
+                continue
+            log.debug("Otomatik profil kuralı eşleşti: %s → %s", rule.name, rule.profile)
+            return rule.profile
+        return self._default
+
+    def tick(self, now: float) -> Optional[str]:
+        """Bir değerlendirme turu; profil değiştiyse yeni adı döndür."""
+        desired = self.evaluate(now)
+        if desired != self._desired:
+            self._desired = desired
+            self._desired_since = now
+        if desired is None:
+            return None
+
+        active = self._active()
+        # Kullanıcı elle başka profil seçtiyse istenen profil değişene kadar bekle
+        if self._last_applied is not None and active != self._last_applied:
+            if self._user_override_for != desired:
+                log.info("Profil elle değiştirilmiş (%s); otomatik geçiş askıda", active)
+            self._user_override_for = desired
+            self._last_applied = None
+        if self._user_override_for is not None:
+            if self._user_override_for == desired:
+                return None
+            self._user_override_for = None
+
+        if active == desired:
+            self._last_applied = desired
+            return None
+        if now - self._desired_since < self._debounce:
+            return None
+        if self._last_switch is not None and now - self._last_switch < self._min_dwell:
+            return None
+
+        log.info("Otomatik profil geçişi: %s → %s", active, desired)
+        self._last_switch = now
+        if self._apply(desired):
+            self._last_applied = desired
+            return desired
+        return None
@@ -4,33 +4,40 @@ Intel i7-10750H için intel_pstate tabanlı CPU frekans ve governor kontrolü.
 """
 
 import os
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.utils.hw_paths import hw_path
 from src.utils.logger import get_logger
+from src.utils.snapshot import fit_array, reset_snapshot, snapshot_to_dict
 
 log = get_logger("cpu_controller")
 
-INTEL_PSTATE = Path("/sys/devices/system/cpu/intel_pstate")
-CPU_BASE = Path("/sys/devices/system/cpu")
+INTEL_PSTATE = hw_path("/sys/devices/system/cpu/intel_pstate")
+CPU_BASE = hw_path("/sys/devices/system/cpu")
 
 # Donanım limitleri
 CPU_FREQ_MIN_KHZ = 800000    # 800 MHz
 CPU_FREQ_MAX_KHZ = 5000000   # 5.0 GHz
 CPU_COUNT = 12               # 6 çekirdek, 12 thread
 
+# Toplu yazma: (sysfs dosyası, değer, zorunlu mu) — her policy için sırayla uygulanır
+PolicyWrite = Tuple[str, str, bool]
 
-@dataclass
+
+@dataclass(slots=True)
 class CpuStatus:
-    """CPU'nun anlık durumu."""
+    """CPU'nun anlık durumu (yeniden kullanılabilir; bkz. get_status(out))."""
     governor: str = "powersave"
     epp: str = "balance_performance"
     available_governors: List[str] = field(default_factory=list)
     available_epp: List[str] = field(default_factory=list)
     min_freq_khz: int = CPU_FREQ_MIN_KHZ
     max_freq_khz: int = CPU_FREQ_MAX_KHZ
-    cur_freqs_khz: List[int] = field(default_factory=list)
+    cur_freqs_khz: array = field(default_factory=lambda: array("i"))  # Çekirdek başına
     turbo_enabled: bool = True
     hwp_dynamic_boost: bool = True
     max_perf_pct: int = 100
@@ -40,12 +47,40 @@ class CpuStatus:
     driver: str = "intel_pstate"
     cpu_count: int = CPU_COUNT
 
+    def to_dict(self) -> Dict[str, Any]:
+        return snapshot_to_dict(self)
+
+
+@dataclass
+class CpufreqPolicy:
+    """Bir cpufreq policy dizini ve onu paylaşan CPU'lar."""
+    path: Path
+    cpus: List[int] = field(default_factory=list)
+
+
+@dataclass
+class BulkWriteResult:
+    """Tüm policy'lere yapılan toplu sysfs yazmanın yapılandırılmış sonucu."""
+    policies: int = 0
+    failed_cpus: List[int] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)  # yol -> hata
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
 
 class CpuController:
     """CPU frekans, governor ve güç ayarlarını yönetir."""
 
-    def __init__(self):
+    def __init__(self, parallel_writes: bool = True):
         self._cpu_count = self._detect_cpu_count()
+        self._policies = self._detect_policies()
+        self._cur_freq_paths = [CPU_BASE / f"cpu{i}" / "cpufreq" / "scaling_cur_freq"
+                                for i in range(self._cpu_count)]
+        self._parallel_writes = parallel_writes and len(self._policies) > 1
+        self._write_pool: Optional[ThreadPoolExecutor] = None
+        self._last_write_result: Optional[BulkWriteResult] = None
 
     @staticmethod
     def _detect_cpu_count() -> int:
@@ -56,6 +91,97 @@ class CpuController:
                 count += 1
         return count if count > 0 else CPU_COUNT
 
+    def _detect_policies(self) -> List[CpufreqPolicy]:
+        """cpufreq policy'lerini keşfet; paylaşılan policy'ler tek kez yazılır.
+
+        policy*/affected_cpus yoksa CPU başına cpu{N}/cpufreq dizinine düşülür.
+        """
+        policies = []
+        for d in (CPU_BASE / "cpufreq").glob("policy*"):
+            num = d.name[len("policy"):]
+            if not num.isdigit():
+                continue
+            affected = self._read_sysfs(d / "affected_cpus")
+            cpus = [int(c) for c in affected.split() if c.isdigit()] or [int(num)]
+            policies.append(CpufreqPolicy(path=d, cpus=cpus))
+
+        if not policies:
+            return [CpufreqPolicy(path=CPU_BASE / f"cpu{i}" / "cpufreq", cpus=[i])
+                    for i in range(self._cpu_count)]
+
+        policies.sort(key=lambda p: p.cpus[0])
+        log.debug("cpufreq policy'leri: %s",
+                  {p.path.name: p.cpus for p in policies})
+        return policies
+
+    @property
+    def last_write_result(self) -> Optional[BulkWriteResult]:
+        """Son toplu cpufreq yazmasının sonucu."""
+        return self._last_write_result
+
+    @staticmethod
+    def _write_policy(policy: CpufreqPolicy, writes: List[PolicyWrite]) -> Dict[str, str]:
+        """Bir policy'ye yazma listesini sırayla uygula.
+
+        Her dosya bir kez açılır; aynı dosyaya tekrar yazarken başa sarılıp
+        kırpılır (daha kısa değer eski değerin kuyruğunu bırakmasın).
+        """
+        errors: Dict[str, str] = {}
+        fds: Dict[str, int] = {}
+        try:
+            for attr, value, required in writes:
+                path = policy.path / attr
+                try:
+                    fd = fds.get(attr)
+                    if fd is None:
+                        fd = fds[attr] = os.open(path, os.O_WRONLY | os.O_TRUNC)
+                    else:
+                        os.lseek(fd, 0, os.SEEK_SET)
+                        os.ftruncate(fd, 0)
+                    os.write(fd, value.encode())
+                except OSError as e:
+                    if required:
+                        errors[str(path)] = e.strerror or str(e)
+        finally:
+            for fd in fds.values():
+                os.close(fd)
+        return errors
+
+    def write_policies(self, writes: List[PolicyWrite]) -> BulkWriteResult:
+        """Tüm cpufreq policy'lerine toplu yaz (tek geçiş, isteğe bağlı paralel).
+
+        cpufreq yazmaları policy güncellemesinde bloklandığından policy'ler
+        thread havuzunda eşzamanlı yazılır. Hatalar CPU bazında raporlanır.
+        """
+        result = BulkWriteResult(policies=len(self._policies))
+
+        if self._parallel_writes:
+            if self._write_pool is None:
+                self._write_pool = ThreadPoolExecutor(
+                    max_workers=min(8, len(self._policies)),
+                    thread_name_prefix="cpufreq-write",
+                )
+            per_policy = list(self._write_pool.map(
+                lambda pol: self._write_policy(pol, writes), self._policies
+            ))
+        else:
+            per_policy = [self._write_policy(pol, writes) for pol in self._policies]
+
+        for policy, errors in zip(self._policies, per_policy):
+            if errors:
+                result.errors.update(errors)
+                result.failed_cpus.extend(policy.cpus)
+
+        summary = ", ".join(f"{attr}={value}" for attr, value, _ in writes)
+        if result.ok:
+            log.info("cpufreq yazıldı: %s (%d policy)", summary, result.policies)
+        else:
+            log.error("cpufreq yazılamadı: %s — CPU %s: %s",
+                      summary, sorted(result.failed_cpus),
+                      sorted(set(result.errors.values())))
+        self._last_write_result = result
+        return result
+
     @staticmethod
     def _read_sysfs(path: Path) -> str:
         """Sysfs dosyasını oku."""
@@ -76,9 +202,15 @@ class CpuController:
             log.error("Sysfs yazılamadı: %s = %s - %s", path, value, e)
             return False
 
-    def get_status(self) -> CpuStatus:
-        """CPU'nun anlık durumunu oku."""
-        status = CpuStatus()
+    def get_status(self, out: Optional[CpuStatus] = None) -> CpuStatus:
+        """CPU'nun anlık durumunu oku.
+        `out` verilirse yeni nesne oluşturulmaz, o nesne yerinde doldurulur.
+        """
+        if out is None:
+            status = CpuStatus()
+        else:
+            status = out
+            reset_snapshot(status)
         status.cpu_count = self._cpu_count
 
         # intel_pstate parametreleri
@@ -123,10 +255,11 @@ class CpuController:
         status.max_freq_khz = int(max_f) if max_f else CPU_FREQ_MAX_KHZ
 
         # Tüm çekirdeklerin anlık frekansları
-        status.cur_freqs_khz = []
-        for i in range(self._cpu_count):
-            cur = self._read_sysfs(CPU_BASE / f"cpu{i}" / "cpufreq" / "scaling_cur_freq")
-            status.cur_freqs_khz.append(int(cur) if cur else 0)
+        freqs = status.cur_freqs_khz
+        fit_array(freqs, self._cpu_count)
+        for i, path in enumerate(self._cur_freq_paths):
+            cur = self._read_sysfs(path)
+            freqs[i] = int(cur) if cur else 0
 
         return status
 
@@ -138,12 +271,7 @@ class CpuController:
             log.error("Geçersiz governor: %s", governor)
             return False
 
-        success = True
-        for i in range(self._cpu_count):
-            path = CPU_BASE / f"cpu{i}" / "cpufreq" / "scaling_governor"
-            if not self._write_sysfs(path, governor):
-                success = False
-        return success
+        return self.write_policies([("scaling_governor", governor, True)]).ok
 
     def set_epp(self, epp: str) -> bool:
         """Tüm CPU'lar için Energy Performance Preference ayarla."""
@@ -152,12 +280,7 @@ class CpuController:
             log.error("Geçersiz EPP: %s", epp)
             return False
 
-        success = True
-        for i in range(self._cpu_count):
-            path = CPU_BASE / f"cpu{i}" / "cpufreq" / "energy_performance_preference"
-            if not self._write_sysfs(path, epp):
-                success = False
-        return success
+        return self.write_policies([("energy_performance_preference", epp, True)]).ok
 
     def set_turbo(self, enabled: bool) -> bool:
         """Turbo Boost aç/kapa."""
@@ -184,18 +307,14 @@ class CpuController:
         if min_khz > max_khz:
             min_khz, max_khz = max_khz, min_khz
 
-        success = True
-        for i in range(self._cpu_count):
-            cpu_path = CPU_BASE / f"cpu{i}" / "cpufreq"
+        return self.write_policies([
             # Adım 1: max'ı en yükseğe çek (alan aç)
-            self._write_sysfs(cpu_path / "scaling_max_freq", str(CPU_FREQ_MAX_KHZ))
+            ("scaling_max_freq", str(CPU_FREQ_MAX_KHZ), False),
             # Adım 2: min'i ayarla
-            if not self._write_sysfs(cpu_path / "scaling_min_freq", str(min_khz)):
-                success = False
+            ("scaling_min_freq", str(min_khz), True),
             # Adım 3: max'ı hedef değere düşür
-            if not self._write_sysfs(cpu_path / "scaling_max_freq", str(max_khz)):
-                success = False
-        return success
+            ("scaling_max_freq", str(max_khz), True),
+        ]).ok
 
     def set_hwp_dynamic_boost(self, enabled: bool) -> bool:
         """HWP Dynamic Boost aç/kapa."""
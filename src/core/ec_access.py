@@ -11,15 +11,17 @@ import os
 import struct
 import threading
 import time
-from pathlib import Path
 from typing import Optional, Set
 
+from src.utils.capabilities import get_capability_cache
+from src.utils.hw_paths import hw_path
 from src.utils.logger import get_logger
+from src.utils.metrics import COUNTER_EC_TIMEOUTS, get_metrics
 
 log = get_logger("ec_access")
 
-EC_IO_PATH = Path("/sys/kernel/debug/ec/ec0/io")
-DEV_PORT = Path("/dev/port")
+EC_IO_PATH = hw_path("/sys/kernel/debug/ec/ec0/io")
+DEV_PORT = hw_path("/dev/port")
 
 # EC I/O portları (Clevo standard)
 EC_CMD_PORT = 0x66
@@ -57,6 +59,22 @@ class EcAccess:
 
     def _detect_method(self):
         """Kullanılabilir EC erişim yöntemini belirle."""
+        caps = get_capability_cache()
+        cached = caps.get("ec_method")
+        cached_path = {"ec_sys": EC_IO_PATH, "dev_port": DEV_PORT}.get(cached)
+        try:
+            if cached_path is not None and cached_path.exists():
+                self._method = cached
+                log.info("EC erişim yöntemi (cache): %s", cached)
+                return
+        except (PermissionError, OSError):
+            pass
+
+        self._probe_method()
+        caps.set("ec_method", self._method)
+
+    def _probe_method(self):
+        """EC erişim yöntemlerini sırayla dene."""
         try:
             if EC_IO_PATH.exists():
                 self._method = "ec_sys"
@@ -169,6 +187,7 @@ class EcAccess:
                 return True
             time.sleep(0.001)
         log.warning("EC IBF timeout!")
+        get_metrics().incr(COUNTER_EC_TIMEOUTS)
         return False
 
     def _port_wait_obf_set(self, fd: int, timeout: float = 0.1) -> bool:
@@ -181,6 +200,7 @@ class EcAccess:
                 return True
             time.sleep(0.001)
         log.warning("EC OBF timeout!")
+        get_metrics().incr(COUNTER_EC_TIMEOUTS)
         return False
 
     def _port_read(self, offset: int) -> Optional[int]:
@@ -9,10 +9,15 @@ GÜVENLİK: Fan hızı asla %20'nin altına düşürülmez.
 import threading
 import time
 from dataclasses import dataclass, field
-from typing import Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from src.core.ec_access import EcAccess
 from src.utils.logger import get_logger
+from src.utils.metrics import (
+    COUNTER_FAN_CURVE_OVERRUNS, COUNTER_FAN_CURVE_TICKS, STAGE_FAN_CURVE_TICK,
+    STAGE_FAN_WRITE, get_metrics,
+)
+from src.utils.snapshot import reset_snapshot, snapshot_to_dict
 
 log = get_logger("fan_controller")
 
@@ -34,7 +39,7 @@ DEFAULT_REGISTERS = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class FanStatus:
     """Fan durumu."""
     ec_available: bool = False
@@ -45,6 +50,9 @@ class FanStatus:
     gpu_fan_duty_pct: int = 0
     mode: str = "auto"  # "auto" veya "manual"
 
+    def to_dict(self) -> Dict[str, Any]:
+        return snapshot_to_dict(self)
+
 
 @dataclass
 class FanCurvePoint:
@@ -115,9 +123,13 @@ class FanController:
             return int(val * 100 / 255)
         return 0
 
-    def get_status(self) -> FanStatus:
-        """Fan durumunu oku."""
-        status = FanStatus()
+    def get_status(self, out: Optional[FanStatus] = None) -> FanStatus:
+        """Fan durumunu oku (`out` verilirse yerinde doldurulur)."""
+        if out is None:
+            status = FanStatus()
+        else:
+            status = out
+            reset_snapshot(status)
         status.ec_available = self._ec.available
         status.ec_method = self._ec.method
         status.mode = self._mode
@@ -207,6 +219,17 @@ class FanController:
         s2 = self.set_gpu_fan(pct)
         return s1 and s2
 
+    def _write_duties(self, pct: int) -> bool:
+        """Eğri döngüsü için: iki fanın hızını moda dokunmadan yaz.
+
+        Public setter'lar manuel moda geçer (eğriyi durdurur); eğri thread'i
+        kendi yazımları için bunu kullanır.
+        """
+        raw = self._pct_to_raw(pct)
+        s1 = self._ec.write_byte(self._registers["cpu_fan_duty"], raw)
+        s2 = self._ec.write_byte(self._registers["gpu_fan_duty"], raw)
+        return s1 and s2
+
     # --- Fan Eğrisi (Auto Curve) ---
 
     @property
@@ -260,16 +283,23 @@ class FanController:
 
         return FAN_DUTY_MAX_PCT
 
-    def start_auto_curve(self, temp_callback: Callable[[], float], interval: float = 2.0):
-        """Sıcaklık tabanlı otomatik fan eğrisi başlat."""
-        self._stop_auto_curve()
+    def start_auto_curve(self, temp_callback: Callable[[], float],
+                         interval: float = 2.0) -> bool:
+        """Sıcaklık tabanlı otomatik fan eğrisi başlat.
+        EC manuel moda alınamadıysa False (döngü yine de başlar ve yazmayı dener).
+        """
+        # EC'yi baştan manuel moda al (önceki eğri thread'ini de durdurur);
+        # eğri thread'i içinden set_manual_mode() kendi thread'ini join etmeye çalışırdı
+        manual_ok = self.set_manual_mode()
         self._temp_callback = temp_callback
         self._auto_running = True
         self._last_duty = 0
 
         def _auto_loop():
             error_count = 0
+            metrics = get_metrics()
             while self._auto_running:
+                tick_start = time.perf_counter()
                 try:
                     temp = self._temp_callback()
                     target_duty = self._interpolate_duty(temp)
@@ -277,7 +307,8 @@ class FanController:
                     # Histerez: Sadece anlamlı fark varsa fan hızını değiştir
                     duty_diff = abs(target_duty - self._last_duty)
                     if duty_diff >= 3 or self._last_duty == 0:
-                        self.set_both_fans(target_duty)
+                        with metrics.time(STAGE_FAN_WRITE):
+                            self._write_duties(target_duty)
                         self._last_duty = target_duty
                         log.debug("Auto curve: %.1f°C -> %d%%", temp, target_duty)
 
@@ -289,12 +320,19 @@ class FanController:
                         log.critical("Auto curve: Çok fazla hata, durduruluyor!")
                         self._auto_running = False
                         break
+                finally:
+                    elapsed = time.perf_counter() - tick_start
+                    metrics.observe(STAGE_FAN_CURVE_TICK, elapsed * 1000)
+                    metrics.incr(COUNTER_FAN_CURVE_TICKS)
+                    if elapsed > interval:
+                        metrics.incr(COUNTER_FAN_CURVE_OVERRUNS)
                 time.sleep(interval)
 
         self._mode = "curve"
         self._auto_thread = threading.Thread(target=_auto_loop, daemon=True, name="fan-curve")
         self._auto_thread.start()
         log.info("Otomatik fan eğrisi başlatıldı")
+        return manual_ok
 
     def _stop_auto_curve(self):
         """Otomatik fan eğrisini durdur."""
@@ -5,12 +5,16 @@ Intel UHD Graphics (CometLake-H GT2) frekans kontrolü.
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Dict, Optional
 
+from src.utils.capabilities import get_capability_cache
+from src.utils.hw_paths import hw_path
 from src.utils.logger import get_logger
+from src.utils.snapshot import reset_snapshot, snapshot_to_dict
 
 log = get_logger("gpu_intel")
 
-DRM_BASE = Path("/sys/class/drm")
+DRM_BASE = hw_path("/sys/class/drm")
 
 # Donanım limitleri (MHz)
 IGPU_FREQ_MIN = 350
@@ -19,8 +23,12 @@ IGPU_FREQ_MAX = 1150
 
 def _find_intel_drm_card() -> Path:
     """Intel iGPU DRM card'ını dinamik olarak bul."""
+    try:
+        cards = sorted(DRM_BASE.iterdir())
+    except OSError:
+        cards = []
     # Önce bilinen Intel PCI ID'leri ile dene
-    for card_dir in sorted(DRM_BASE.iterdir()):
+    for card_dir in cards:
         if not card_dir.name.startswith("card"):
             continue
         # renderD* gibi girdileri atla
@@ -34,10 +42,18 @@ def _find_intel_drm_card() -> Path:
     return DRM_BASE / "card0"
 
 
-DRM_CARD = _find_intel_drm_card()
+def find_intel_drm_card() -> Path:
+    """Intel iGPU DRM card'ı — önce yetenek cache'inden, doğrulanamazsa tarayarak."""
+    caps = get_capability_cache()
+    cached = caps.get("drm_card")
+    if cached and (Path(cached) / "gt_cur_freq_mhz").exists():
+        return Path(cached)
+    card = _find_intel_drm_card()
+    caps.set("drm_card", str(card))
+    return card
 
 
-@dataclass
+@dataclass(slots=True)
 class IntelGpuStatus:
     """Intel iGPU anlık durumu."""
     available: bool = False
@@ -50,21 +66,41 @@ class IntelGpuStatus:
     rp1_freq_mhz: int = IGPU_FREQ_MIN  # Donanım verimli
     rpn_freq_mhz: int = IGPU_FREQ_MIN  # Donanım min
 
+    def to_dict(self) -> Dict[str, Any]:
+        return snapshot_to_dict(self)
+
 
 class IntelGpuController:
     """Intel entegre GPU frekans kontrolü."""
 
     def __init__(self):
-        self._available = DRM_CARD.exists() and (DRM_CARD / "gt_cur_freq_mhz").exists()
+        self._card = find_intel_drm_card()
+        self._available = self._card.exists() and (self._card / "gt_cur_freq_mhz").exists()
 
     @property
     def available(self) -> bool:
         return self._available
 
-    @staticmethod
-    def _read_freq(filename: str) -> int:
+    @property
+    def card(self) -> Path:
+        return self._card
+
+    def rediscover(self) -> bool:
+        """DRM card'ını yeniden bul (hotplug/sürücü yeniden yükleme sonrası).
+        Card değiştiyse True.
+        """
+        card = _find_intel_drm_card()
+        available = card.exists() and (card / "gt_cur_freq_mhz").exists()
+        if card == self._card and available == self._available:
+            return False
+        self._card, self._available = card, available
+        get_capability_cache().set("drm_card", str(card))
+        log.info("iGPU DRM card güncellendi: %s (kullanılabilir: %s)", card, available)
+        return True
+
+    def _read_freq(self, filename: str) -> int:
         """DRM frekans dosyasını oku (MHz)."""
-        path = DRM_CARD / filename
+        path = self._card / filename
         try:
             if path.exists():
                 return int(path.read_text().strip())
@@ -72,10 +108,9 @@ class IntelGpuController:
             pass
         return 0
 
-    @staticmethod
-    def _write_freq(filename: str, value: int) -> bool:
+    def _write_freq(self, filename: str, value: int) -> bool:
         """DRM frekans dosyasına yaz."""
-        path = DRM_CARD / filename
+        path = self._card / filename
         try:
             path.write_text(str(value))
             log.info("iGPU %s = %d MHz", filename, value)
@@ -84,9 +119,13 @@ class IntelGpuController:
             log.error("iGPU %s yazılamadı: %s", filename, e)
             return False
 
-    def get_status(self) -> IntelGpuStatus:
-        """iGPU anlık durumunu oku."""
-        status = IntelGpuStatus()
+    def get_status(self, out: Optional[IntelGpuStatus] = None) -> IntelGpuStatus:
+        """iGPU anlık durumunu oku (`out` verilirse yerinde doldurulur)."""
+        if out is None:
+            status = IntelGpuStatus()
+        else:
+            status = out
+            reset_snapshot(status)
         status.available = self._available
 
         if not self._available:
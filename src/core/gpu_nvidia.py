@@ -3,12 +3,24 @@ Monster HW Controller - NVIDIA GPU Controller
 GeForce RTX 2060 Mobile için nvidia-smi tabanlı kontrol.
 """
 
+import functools
 import subprocess
 import time
 from dataclasses import dataclass
-from typing import Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.utils.capabilities import get_capability_cache
+from src.utils.hw_paths import hw_path, hw_tool
 from src.utils.logger import get_logger
+from src.utils.metrics import COUNTER_SMI_TIMEOUTS, get_metrics
+from src.utils.snapshot import copy_snapshot, reset_snapshot, snapshot_to_dict
+
+try:
+    import pynvml
+    HAS_NVML = True
+except ImportError:
+    HAS_NVML = False
 
 log = get_logger("gpu_nvidia")
 
@@ -19,8 +31,26 @@ NVIDIA_CLOCK_MIN = 300   # MHz
 NVIDIA_CLOCK_MAX = 2100  # MHz
 NVIDIA_MEM_MAX = 5501    # MHz
 
+PCI_DEVICES_BASE = hw_path("/sys/bus/pci/devices")
+NVIDIA_SMI = hw_tool("nvidia-smi")
+NVIDIA_PCI_VENDOR = "0x10de"
+
+# Batch ayar işlemi: (işlem adı, argümanlar)
+BatchOp = Tuple[str, tuple]
+
+# Bu runtime PM durumlarında nvidia-smi çağrılmaz (GPU'yu uyandırır)
+RUNTIME_PM_SLEEPING = ("suspended", "suspending", "resuming")
+
+# CLOCK_BOOTTIME - CLOCK_MONOTONIC farkı bu kadar (s) büyüdüyse sistem uykuya girmiştir
+SYSTEM_SLEEP_TOLERANCE = 1.0
+
+
+def _system_sleep_offset() -> float:
+    """Açılıştan beri sistem uykusunda geçen toplam süre (s, yaklaşık)."""
+    return time.clock_gettime(time.CLOCK_BOOTTIME) - time.monotonic()
 
-@dataclass
+
+@dataclass(slots=True)
 class NvidiaStatus:
     """NVIDIA GPU'nun anlık durumu."""
     available: bool = False
@@ -45,40 +75,176 @@ class NvidiaStatus:
     persistence_mode: bool = False
     driver_version: str = ""
     graphics_mode: str = "hybrid"
+    suspended: bool = False       # dGPU runtime PM ile uykuda (D3cold)
+    runtime_status: str = ""      # power/runtime_status (active/suspended/...)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return snapshot_to_dict(self)
+
+
+@functools.lru_cache(maxsize=1)
+def find_nvidia_pci_device() -> Optional[Path]:
+    """NVIDIA ekran kartının PCI sysfs dizinini bul (GPU'yu uyandırmadan)."""
+    try:
+        devices = sorted(PCI_DEVICES_BASE.iterdir())
+    except OSError:
+        return None
+    for dev in devices:
+        try:
+            vendor = (dev / "vendor").read_text().strip()
+            pci_class = (dev / "class").read_text().strip()
+        except OSError:
+            continue
+        # 0x03xxxx: Display controller (VGA / 3D)
+        if vendor == NVIDIA_PCI_VENDOR and pci_class.startswith("0x03"):
+            log.debug("NVIDIA PCI cihazı: %s", dev)
+            return dev
+    return None
+
+
+class NvidiaRuntimePm:
+    """dGPU runtime PM durumunu sysfs'ten okur.
+
+    power/runtime_status okumak GPU'yu uyandırmaz; nvidia-smi ise uyandırır.
+    Hybrid modda D3cold'daki GPU'yu her tick'te uyandırmamak için kullanılır.
+    """
+
+    def __init__(self, device: Optional[Path] = None):
+        self._device = device if device is not None else find_nvidia_pci_device()
+
+    @property
+    def device(self) -> Optional[Path]:
+        return self._device
+
+    @staticmethod
+    def _read(path: Path) -> str:
+        try:
+            return path.read_text().strip()
+        except OSError:
+            return ""
+
+    def runtime_status(self) -> str:
+        """power/runtime_status: active, suspended, suspending, resuming, unsupported."""
+        if self._device is None:
+            return ""
+        return self._read(self._device / "power" / "runtime_status")
+
+    def suspended_time_ms(self) -> int:
+        """power/runtime_suspended_time: runtime PM ile uykuda geçen toplam süre (ms).
+
+        Değer değiştiyse GPU arada uyuyup uyanmıştır (sürücü saat kilitlerini sıfırlar).
+        """
+        if self._device is None:
+            return 0
+        try:
+            return int(self._read(self._device / "power" / "runtime_suspended_time") or 0)
+        except ValueError:
+            return 0
+
+    def power_state(self) -> str:
+        """PCI güç durumu: D0, D3hot, D3cold (eski kernellerde yok)."""
+        if self._device is None:
+            return ""
+        return self._read(self._device / "power_state")
+
+    def is_active(self) -> bool:
+        """GPU uyanık mı? Bilgi yoksa (runtime PM yok) uyanık kabul edilir."""
+        if self._device is None:
+            return True
+        if self.runtime_status() in RUNTIME_PM_SLEEPING:
+            return False
+        return not self.power_state().startswith("D3")
 
 
 class NvidiaGpuController:
     """NVIDIA GPU izleme ve kontrol."""
 
     def __init__(self):
+        self._pm = NvidiaRuntimePm()
         self._available = self._check_available()
+        self._last_status: Optional[NvidiaStatus] = None
         self._graphics_mode_cache: str = "unknown"
         self._graphics_mode_time: float = 0.0
         self._graphics_mode_ttl: float = 30.0  # 30 saniyede bir sorgula
-
-    @staticmethod
-    def _check_available() -> bool:
-        """nvidia-smi mevcut mu kontrol et."""
-        try:
-            result = subprocess.run(
-                ["nvidia-smi", "--query-gpu=name", "--format=csv,noheader"],
-                capture_output=True, text=True, timeout=5,
-            )
-            return result.returncode == 0
-        except (FileNotFoundError, subprocess.SubprocessError):
-            return False
+        # Bu süreçten yazılan saat kilitleri (nvidia-smi ile geri okunamaz).
+        # Sistem uykusu veya runtime PM uyanmasından sonra geçersizdir.
+        self._clock_locks: Dict[str, int] = {}
+        self._clock_locks_epoch: Tuple[float, int] = (0.0, 0)
+
+    def _check_available(self) -> bool:
+        """nvidia-smi mevcut mu kontrol et.
+
+        GPU runtime PM ile uykudaysa nvidia-smi çalıştırılmaz (uyandırır);
+        sürücü bağlıysa ve nvidia-smi kuruluysa kullanılabilir kabul edilir.
+        """
+        caps = get_capability_cache()
+        cached = caps.get("nvidia_available")
+        if cached is not None:
+            # Aynı boot + sürücü sürümü: sonuç değişmez, ilk nvidia-smi
+            # çağrısında doğrulanır (_run_smi)
+            return bool(cached)
+
+        if caps.tool_path(NVIDIA_SMI) is None:
+            available = False
+        elif not self._pm.is_active():
+            driver = self._pm.device / "driver"
+            available = driver.exists() and driver.resolve().name == "nvidia"
+        else:
+            try:
+                result = subprocess.run(
+                    [NVIDIA_SMI, "--query-gpu=name", "--format=csv,noheader"],
+                    capture_output=True, text=True, timeout=5,
+                )
+                available = result.returncode == 0
+            except (FileNotFoundError, subprocess.SubprocessError):
+                available = False
+
+        caps.set("nvidia_available", available)
+        return available
 
     @property
     def available(self) -> bool:
         return self._available
 
+    @property
+    def clock_locks(self) -> Dict[str, int]:
+        """Bu süreçten yazılmış ve hâlâ geçerli saat kilitleri (gpu_clock_max, ...).
+
+        Son yazımdan sonra sistem uyuduysa veya GPU runtime PM ile uyuyup
+        uyandıysa sürücü kilitleri sıfırlamış olabilir: boş döner (bilinmiyor).
+        """
+        self._expire_clock_locks()
+        return dict(self._clock_locks)
+
+    def _expire_clock_locks(self):
+        if not self._clock_locks:
+            return
+        sleep_offset, suspended_ms = self._clock_locks_epoch
+        if (_system_sleep_offset() - sleep_offset > SYSTEM_SLEEP_TOLERANCE
+                or self._pm.suspended_time_ms() != suspended_ms):
+            log.debug("Uyku/uyanma sonrası saat kilitleri bilinmiyor")
+            self._clock_locks.clear()
+
+    def query_power_limit(self) -> Optional[int]:
+        """Güç limitini GPU'dan oku (W). Okunamazsa None.
+
+        GPU uykudaysa uyandırır; yalnızca ardından yazım yapılacaksa kullanın.
+        """
+        value = self._safe_float(self._query("power.limit") or "")
+        return int(round(value)) if value > 0 else None
+
+    @property
+    def last_status(self) -> Optional[NvidiaStatus]:
+        """Son başarılı get_status() sonucu (nvidia-smi çağırmaz; hiç sorgulanmadıysa None)."""
+        return self._last_status
+
     def _run_smi(self, *args) -> Optional[str]:
         """nvidia-smi komutunu çalıştır."""
         if not self._available:
             return None
         try:
             result = subprocess.run(
-                ["nvidia-smi", *args],
+                [NVIDIA_SMI, *args],
                 capture_output=True, text=True, timeout=3,
             )
             if result.returncode == 0:
@@ -88,8 +254,15 @@ class NvidiaGpuController:
                 return None
         except subprocess.TimeoutExpired:
             log.warning("nvidia-smi zaman aşımı (%s)", args)
+            get_metrics().incr(COUNTER_SMI_TIMEOUTS)
+            return None
+        except FileNotFoundError as e:
+            # Cache'teki erişilebilirlik bilgisi geçersiz (nvidia-smi kaldırılmış)
+            log.warning("nvidia-smi bulunamadı, NVIDIA devre dışı: %s", e)
+            self._available = False
+            get_capability_cache().set("nvidia_available", False)
             return None
-        except (subprocess.SubprocessError, FileNotFoundError) as e:
+        except subprocess.SubprocessError as e:
             log.debug("nvidia-smi çalıştırılamadı: %s", e)
             return None
 
@@ -97,14 +270,39 @@ class NvidiaGpuController:
         """nvidia-smi query komutu çalıştır."""
         return self._run_smi(f"--query-gpu={fields}", "--format=csv,noheader,nounits")
 
-    def get_status(self) -> NvidiaStatus:
-        """GPU'nun anlık durumunu oku."""
-        status = NvidiaStatus()
+    @property
+    def suspended(self) -> bool:
+        """dGPU runtime PM ile uykuda mı (sysfs, GPU'yu uyandırmaz)."""
+        return not self._pm.is_active()
+
+    def get_status(self, out: Optional[NvidiaStatus] = None) -> NvidiaStatus:
+        """GPU'nun anlık durumunu oku (`out` verilirse yerinde doldurulur).
+
+        GPU uykudaysa nvidia-smi çağrılmaz; son bilinen değerler
+        suspended=True ile döner. Sorgu yalnızca GPU 'active' iken yapılır.
+        """
+        if out is None:
+            status = NvidiaStatus()
+        else:
+            status = out
+            reset_snapshot(status)
         status.available = self._available
 
         if not self._available:
             return status
 
+        runtime_status = self._pm.runtime_status()
+        if not self._pm.is_active():
+            if self._last_status is not None:
+                copy_snapshot(status, self._last_status)
+            status.suspended = True
+            status.runtime_status = runtime_status
+            status.power_draw = 0.0
+            status.utilization_gpu = 0
+            status.utilization_memory = 0
+            return status
+        status.runtime_status = runtime_status
+
         # Toplu query - tek subprocess çağrısı ile tüm verileri al
         query_fields = (
             "name,temperature.gpu,fan.speed,"
@@ -150,8 +348,65 @@ class NvidiaGpuController:
         # Grafik modu (cache'li)
         status.graphics_mode = self._get_graphics_mode_cached()
 
+        # Çağıranın tamponu sonraki turda değişir; son bilinen değerler ayrı tutulur
+        if self._last_status is None:
+            self._last_status = NvidiaStatus()
+        copy_snapshot(self._last_status, status)
         return status
 
+    def get_process_usage(self) -> Dict[int, Tuple[str, int, int]]:
+        """GPU kullanan süreçler: pid -> (ad, VRAM MiB, SM %; bilinmiyorsa -1).
+
+        GPU uykudaysa sorgu yapılmaz (uyandırmamak için) ve boş döner.
+        """
+        if not self._available or not self._pm.is_active():
+            return {}
+        if HAS_NVML:
+            usage = self._process_usage_nvml()
+            if usage is not None:
+                return usage
+
+        result = self._run_smi("--query-compute-apps=pid,process_name,used_memory",
+                               "--format=csv,noheader,nounits")
+        usage: Dict[int, Tuple[str, int, int]] = {}
+        for line in (result or "").splitlines():
+            parts = [p.strip() for p in line.split(",")]
+            if len(parts) < 3 or not parts[0].isdigit():
+                continue
+            usage[int(parts[0])] = (parts[1].rsplit("/", 1)[-1], self._safe_int(parts[2]), -1)
+        return usage
+
+    @staticmethod
+    def _process_usage_nvml() -> Optional[Dict[int, Tuple[str, int, int]]]:
+        """NVML ile süreç başına VRAM ve SM kullanımı. NVML açılamazsa None."""
+        try:
+            pynvml.nvmlInit()
+        except pynvml.NVMLError:
+            return None
+        usage: Dict[int, Tuple[str, int, int]] = {}
+        try:
+            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            procs = (pynvml.nvmlDeviceGetComputeRunningProcesses(handle)
+                     + pynvml.nvmlDeviceGetGraphicsRunningProcesses(handle))
+            for proc in procs:
+                mem = (proc.usedGpuMemory or 0) // (1024 * 1024)
+                usage[proc.pid] = ("", mem, -1)
+            try:
+                for sample in pynvml.nvmlDeviceGetProcessUtilization(handle, 0):
+                    name, mem, _ = usage.get(sample.pid, ("", 0, -1))
+                    usage[sample.pid] = (name, mem, sample.smUtil)
+            except pynvml.NVMLError:
+                pass  # Süreç başına kullanım örneği yok (sürücü desteklemiyor)
+        except pynvml.NVMLError as e:
+            log.debug("NVML süreç sorgusu başarısız: %s", e)
+            return None
+        finally:
+            try:
+                pynvml.nvmlShutdown()
+            except pynvml.NVMLError:
+                pass
+        return usage
+
     @staticmethod
     def _safe_float(val: str) -> float:
         try:
@@ -192,51 +447,173 @@ class NvidiaGpuController:
 
     # --- Kontrol Metotları (root gerektirir) ---
 
+    def batch(self) -> "NvidiaSettingsBatch":
+        """Birden fazla ayarı tek seferde uygulamak için batch oluştur."""
+        return NvidiaSettingsBatch(self)
+
+    def apply_batch(self, ops: List[BatchOp]) -> Dict[str, bool]:
+        """Sıraya alınmış ayarları uygula, ayar başına başarıyı döndür.
+
+        pynvml varsa tüm ayarlar tek NVML oturumunda (tek sürücü init)
+        uygulanır. nvidia-smi tek çağrıda yalnızca bir ayar işlemi kabul
+        ettiğinden, NVML yoksa her ayar için ayrı nvidia-smi çalıştırılır.
+        """
+        if not ops:
+            return {}
+        if not self._available:
+            return {name: False for name, _ in ops}
+
+        results = self._apply_nvml(ops) if HAS_NVML else None
+        if results is None:
+            results = {name: self._run_smi(*_SMI_ARGS[name](*args)) is not None
+                       for name, args in ops}
+
+        for name, args in ops:
+            if results.get(name):
+                self._record_applied(name, args)
+        return results
+
+    @staticmethod
+    def _apply_nvml(ops: List[BatchOp]) -> Optional[Dict[str, bool]]:
+        """Ayarları tek NVML oturumunda uygula. NVML açılamazsa None."""
+        try:
+            pynvml.nvmlInit()
+        except pynvml.NVMLError as e:
+            log.debug("NVML başlatılamadı, nvidia-smi kullanılacak: %s", e)
+            return None
+
+        results: Dict[str, bool] = {}
+        try:
+            handle = pynvml.nvmlDeviceGetHandleByIndex(0)
+            for name, args in ops:
+                try:
+                    _NVML_OPS[name](handle, *args)
+                    results[name] = True
+                except pynvml.NVMLError as e:
+                    log.error("NVML ayar hatası (%s%s): %s", name, args, e)
+                    results[name] = False
+        except pynvml.NVMLError as e:
+            log.debug("NVML cihazı alınamadı, nvidia-smi kullanılacak: %s", e)
+            return None
+        finally:
+            try:
+                pynvml.nvmlShutdown()
+            except pynvml.NVMLError:
+                pass
+        return results
+
+    def _record_applied(self, name: str, args: tuple):
+        """Başarılı ayarı uygulanan limitlere işle ve logla."""
+        if name == "power_limit":
+            log.info("NVIDIA güç limiti: %dW", args[0])
+            return
+        self._expire_clock_locks()
+        if name == "gpu_clocks":
+            self._clock_locks["gpu_clock_min"] = args[0]
+            self._clock_locks["gpu_clock_max"] = args[1]
+            log.info("NVIDIA GPU clock: %d-%d MHz", *args)
+        elif name == "mem_clocks":
+            self._clock_locks["mem_clock_min"] = args[0]
+            self._clock_locks["mem_clock_max"] = args[1]
+            log.info("NVIDIA Mem clock: %d-%d MHz", *args)
+        elif name == "gpu_clocks_reset":
+            self._clock_locks.pop("gpu_clock_min", None)
+            self._clock_locks.pop("gpu_clock_max", None)
+        elif name == "mem_clocks_reset":
+            self._clock_locks.pop("mem_clock_min", None)
+            self._clock_locks.pop("mem_clock_max", None)
+        self._clock_locks_epoch = (_system_sleep_offset(), self._pm.suspended_time_ms())
+
     def set_power_limit(self, watts: int) -> bool:
         """GPU güç limitini ayarla (Watt)."""
-        watts = max(NVIDIA_POWER_MIN, min(NVIDIA_POWER_MAX, watts))
-        result = self._run_smi("-pl", str(watts))
-        if result is not None:
-            log.info("NVIDIA güç limiti: %dW", watts)
-            return True
-        return False
+        return self.batch().set_power_limit(watts).apply()["power_limit"]
 
     def set_gpu_clocks(self, min_mhz: int, max_mhz: int) -> bool:
         """GPU saat hızı limitleri ayarla."""
-        min_mhz = max(NVIDIA_CLOCK_MIN, min(NVIDIA_CLOCK_MAX, min_mhz))
-        max_mhz = max(NVIDIA_CLOCK_MIN, min(NVIDIA_CLOCK_MAX, max_mhz))
-        if min_mhz > max_mhz:
-            min_mhz, max_mhz = max_mhz, min_mhz
-
-        result = self._run_smi("-lgc", f"{min_mhz},{max_mhz}")
-        if result is not None:
-            log.info("NVIDIA GPU clock: %d-%d MHz", min_mhz, max_mhz)
-            return True
-        return False
+        return self.batch().set_gpu_clocks(min_mhz, max_mhz).apply()["gpu_clocks"]
 
     def set_mem_clocks(self, min_mhz: int, max_mhz: int) -> bool:
         """GPU bellek saat hızı limitleri ayarla."""
-        max_mhz = max(0, min(NVIDIA_MEM_MAX, max_mhz))
-        min_mhz = max(0, min(max_mhz, min_mhz))
-        result = self._run_smi("-lmc", f"{min_mhz},{max_mhz}")
-        if result is not None:
-            log.info("NVIDIA Mem clock: %d-%d MHz", min_mhz, max_mhz)
-            return True
-        return False
+        return self.batch().set_mem_clocks(min_mhz, max_mhz).apply()["mem_clocks"]
 
     def reset_gpu_clocks(self) -> bool:
         """GPU ve bellek saat hızı limitlerini sıfırla."""
-        r1 = self._run_smi("-rgc")
-        r2 = self._run_smi("-rmc")
-        return r1 is not None and r2 is not None
+        return all(self.batch().reset_gpu_clocks().apply().values())
 
     def reset_mem_clocks(self) -> bool:
         """Sadece bellek saat hızı limitlerini sıfırla."""
-        r = self._run_smi("-rmc")
-        return r is not None
+        return self.batch().reset_mem_clocks().apply()["mem_clocks_reset"]
 
     def set_persistence_mode(self, enabled: bool) -> bool:
         """Persistence mode aç/kapa."""
         val = "1" if enabled else "0"
         result = self._run_smi("-pm", val)
         return result is not None
+
+
+class NvidiaSettingsBatch:
+    """NVIDIA ayarlarını sıraya alıp tek seferde uygular.
+
+    Kullanım:
+        results = nvidia.batch().set_power_limit(60).set_gpu_clocks(300, 1500).apply()
+        # {"power_limit": True, "gpu_clocks": True}
+    """
+
+    def __init__(self, controller: NvidiaGpuController):
+        self._controller = controller
+        self._ops: List[BatchOp] = []
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def set_power_limit(self, watts: int) -> "NvidiaSettingsBatch":
+        watts = max(NVIDIA_POWER_MIN, min(NVIDIA_POWER_MAX, int(watts)))
+        self._ops.append(("power_limit", (watts,)))
+        return self
+
+    def set_gpu_clocks(self, min_mhz: int, max_mhz: int) -> "NvidiaSettingsBatch":
+        min_mhz = max(NVIDIA_CLOCK_MIN, min(NVIDIA_CLOCK_MAX, min_mhz))
+        max_mhz = max(NVIDIA_CLOCK_MIN, min(NVIDIA_CLOCK_MAX, max_mhz))
+        if min_mhz > max_mhz:
+            min_mhz, max_mhz = max_mhz, min_mhz
+        self._ops.append(("gpu_clocks", (min_mhz, max_mhz)))
+        return self
+
+    def set_mem_clocks(self, min_mhz: int, max_mhz: int) -> "NvidiaSettingsBatch":
+        max_mhz = max(0, min(NVIDIA_MEM_MAX, max_mhz))
+        min_mhz = max(0, min(max_mhz, min_mhz))
+        self._ops.append(("mem_clocks", (min_mhz, max_mhz)))
+        return self
+
+    def reset_gpu_clocks(self) -> "NvidiaSettingsBatch":
+        """GPU ve bellek saat limitlerini sıfırla."""
+        self._ops.append(("gpu_clocks_reset", ()))
+        self._ops.append(("mem_clocks_reset", ()))
+        return self
+
+    def reset_mem_clocks(self) -> "NvidiaSettingsBatch":
+        self._ops.append(("mem_clocks_reset", ()))
+        return self
+
+    def apply(self) -> Dict[str, bool]:
+        """Sıradaki tüm ayarları uygula; ayar başına başarı döner."""
+        return self._controller.apply_batch(self._ops)
+
+
+# Batch işlemi başına nvidia-smi argümanları
+_SMI_ARGS = {
+    "power_limit": lambda w: ("-pl", str(w)),
+    "gpu_clocks": lambda lo, hi: ("-lgc", f"{lo},{hi}"),
+    "mem_clocks": lambda lo, hi: ("-lmc", f"{lo},{hi}"),
+    "gpu_clocks_reset": lambda: ("-rgc",),
+    "mem_clocks_reset": lambda: ("-rmc",),
+}
+
+# Batch işlemi başına NVML çağrıları (güç limiti mW cinsinden)
+_NVML_OPS = {
+    "power_limit": lambda h, w: pynvml.nvmlDeviceSetPowerManagementLimit(h, w * 1000),
+    "gpu_clocks": lambda h, lo, hi: pynvml.nvmlDeviceSetGpuLockedClocks(h, lo, hi),
+    "mem_clocks": lambda h, lo, hi: pynvml.nvmlDeviceSetMemoryLockedClocks(h, lo, hi),
+    "gpu_clocks_reset": lambda h: pynvml.nvmlDeviceResetGpuLockedClocks(h),
+    "mem_clocks_reset": lambda h: pynvml.nvmlDeviceResetMemoryLockedClocks(h),
+}
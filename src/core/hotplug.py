@@ -0,0 +1,85 @@
+"""
+Monster HW Controller - Hotplug Discovery
+hwmon ve drm uevent'leriyle artımlı cihaz keşfi.
+
+Resume sonrası hwmon numaralarının değişmesi, NVMe takılıp çıkarılması
+veya dGPU'nun açılması tam yeniden tarama gerektirmez: yalnızca olayın
+ilgilendirdiği hwmon dizininin sensörleri eklenir/çıkarılır, iGPU DRM
+card'ı yalnızca card eklenip kaldırıldığında yeniden bulunur. Okuma
+tarafı (TempMonitor.read_all, watchdog pread döngüsü) değişmez; sensör
+kümesi değişince TempMonitor.generation artar.
+
+Tam yeniden tarama (request_rescan) gerektiğinde de okuma tarafında değil
+bu modülün kendi thread'inde yapılır.
+"""
+
+import re
+import threading
+from pathlib import PurePosixPath
+from typing import Optional
+
+from src.core.temp_monitor import HWMON_BASE
+from src.utils.logger import get_logger
+from src.utils.uevent import Uevent, UeventMonitor
+
+log = get_logger("hotplug")
+
+# card0, card1 ... (card0-eDP-1 gibi bağlayıcılar ve renderD* hariç)
+_DRM_CARD_RE = re.compile(r"card\d+")
+
+
+class HotplugDiscovery:
+    """TempMonitor ve IntelGpuController'ı uevent'lerle güncel tutar."""
+
+    def __init__(self, temp_monitor, igpu=None, monitor: Optional[UeventMonitor] = None):
+        self._temp_monitor = temp_monitor
+        self._igpu = igpu
+        self._monitor = monitor
+        self._rescan_lock = threading.Lock()
+        self._rescan_thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Abone ol ve monitörü başlat; uevent alınamıyorsa False."""
+        if self._monitor is None:
+            return False
+        self._monitor.subscribe("hwmon", self._on_hwmon)
+        if self._igpu is not None:
+            self._monitor.subscribe("drm", self._on_drm)
+        if not self._monitor.start():
+            log.warning("Hotplug keşfi kapalı: uevent dinlenemiyor")
+            return False
+        return True
+
+    def request_rescan(self):
+        """hwmon'u arka planda tam yeniden tara (bloklamaz; sürüyorsa yok sayılır).
+
+        Okunamayan sensörler için (ör. sürücü yeniden yüklendi, uevent
+        kaçırıldı) çağrılır; bitince TempMonitor.generation artar.
+        """
+        with self._rescan_lock:
+            if self._rescan_thread is not None and self._rescan_thread.is_alive():
+                return
+            self._rescan_thread = threading.Thread(target=self._rescan, daemon=True,
+                                                   name="hwmon-rescan")
+            self._rescan_thread.start()
+
+    def _rescan(self):
+        try:
+            self._temp_monitor.refresh_hwmon()
+        except Exception as e:
+            log.error("hwmon yeniden taranamadı: %s", e)
+
+    def _on_hwmon(self, event: Uevent):
+        # DEVPATH: /devices/.../hwmon/hwmonN → /sys/class/hwmon/hwmonN
+        hwmon_dir = HWMON_BASE / PurePosixPath(event.devpath).name
+        if event.action == "add":
+            self._temp_monitor.add_hwmon(hwmon_dir)
+        elif event.action == "remove":
+            self._temp_monitor.remove_hwmon(hwmon_dir)
+
+    def _on_drm(self, event: Uevent):
+        if event.action not in ("add", "remove"):
+            return  # "change" bağlayıcı (monitör) olaylarıdır
+        if not _DRM_CARD_RE.fullmatch(PurePosixPath(event.devpath).name):
+            return
+        self._igpu.rediscover()
@@ -8,6 +8,7 @@ import time
 from dataclasses import dataclass, field
 from typing import Dict, Optional
 
+from src.utils.capabilities import get_capability_cache
 from src.utils.logger import get_logger
 
 log = get_logger("notifier")
@@ -52,16 +53,11 @@ class TempNotifier:
         self._notify_available = self._check_notify()
 
     def _check_notify(self) -> bool:
-        """notify-send komutunun mevcut olup olmadığını kontrol et."""
-        try:
-            result = subprocess.run(
-                ["which", "notify-send"],
-                capture_output=True, timeout=3,
-            )
-            return result.returncode == 0
-        except Exception:
+        """notify-send komutunun mevcut olup olmadığını kontrol et (cache'li)."""
+        if get_capability_cache().tool_path("notify-send") is None:
             log.warning("notify-send bulunamadı, bildirimler devre dışı")
             return False
+        return True
 
     @property
     def enabled(self) -> bool:
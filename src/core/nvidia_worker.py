@@ -0,0 +1,81 @@
+"""
+Monster HW Controller - NVIDIA Limit Worker
+Termal koruma ve PID döngüsünün GPU güç limiti yazımlarını ayrı bir
+thread'de yapar.
+
+set_power_limit() nvidia-smi (3 s zaman aşımı) veya NVML oturumu açar;
+güvenlik döngüsünü bloklamaması için istek yalnızca sıraya bırakılır.
+Bekleyen istekler birleşir: en son istenen limit yazılır.
+"""
+
+import threading
+from typing import Callable, Optional
+
+from src.utils.logger import get_logger
+
+log = get_logger("nvidia_worker")
+
+
+class NvidiaLimitWorker:
+    """GPU güç limitini ve durum yenilemesini arka planda uygular."""
+
+    def __init__(self, nvidia):
+        self._nvidia = nvidia
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pending_limit: Optional[int] = None
+        self._pending_refresh = False
+        self._thread: Optional[threading.Thread] = None
+        self._on_status: Optional[Callable] = None
+
+    def set_status_callback(self, callback: Optional[Callable]):
+        """refresh_status() sonucu (NvidiaStatus) işçi thread'inden buna iletilir."""
+        self._on_status = callback
+
+    @property
+    def available(self) -> bool:
+        return self._nvidia.available
+
+    def set_power_limit(self, watts: int) -> bool:
+        """Limiti sıraya al (bloklamaz). GPU yoksa False."""
+        if not self._nvidia.available:
+            return False
+        with self._lock:
+            self._pending_limit = int(watts)
+        self._kick()
+        return True
+
+    def refresh_status(self):
+        """get_status() ile son bilinen durumu (power_limit vb.) arka planda tazele."""
+        if not self._nvidia.available:
+            return
+        with self._lock:
+            self._pending_refresh = True
+        self._kick()
+
+    def _kick(self):
+        # Güvenlik döngüsü ve D-Bus/profil thread'leri aynı anda çağırabilir:
+        # işçi yalnızca bir kez başlatılsın
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name="nvidia-limit-worker")
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                limit, self._pending_limit = self._pending_limit, None
+                refresh, self._pending_refresh = self._pending_refresh, False
+            try:
+                if limit is not None and not self._nvidia.set_power_limit(limit):
+                    log.error("GPU güç limiti uygulanamadı: %dW", limit)
+                if refresh:
+                    status = self._nvidia.get_status()
+                    if self._on_status is not None:
+                        self._on_status(status)
+            except Exception as e:
+                log.error("NVIDIA işçi hatası: %s", e)
@@ -0,0 +1,105 @@
+"""
+Monster HW Controller - Power Supply Watcher
+AC adaptörü takılıp çıkarıldığında milisaniyeler içinde haber veren izleyici.
+
+power_supply uevent'leri (UeventMonitor: pyudev veya netlink) dinlenir;
+zamanlayıcı gerekmez. Netlink açılamazsa /sys/class/power_supply/*/online
+yavaşça yoklanır (sysfs öznitelikleri inotify olayı üretmediğinden
+inotify burada işe yaramaz).
+"""
+
+import threading
+from typing import Callable, Optional
+
+from src.utils.hw_paths import hw_path
+from src.utils.logger import get_logger
+from src.utils.uevent import Uevent, UeventMonitor
+
+log = get_logger("power_supply")
+
+POWER_SUPPLY_BASE = hw_path("/sys/class/power_supply")
+
+# Netlink yoksa yoklama aralığı
+FALLBACK_POLL_SEC = 30.0
+
+
+def read_ac_online() -> Optional[bool]:
+    """Şebeke (Mains) adaptörü bağlı mı? Adaptör bulunamazsa None."""
+    try:
+        entries = list(POWER_SUPPLY_BASE.iterdir())
+    except OSError:
+        return None
+    found = False
+    for supply in entries:
+        try:
+            if (supply / "type").read_text().strip() != "Mains":
+                continue
+            found = True
+            if (supply / "online").read_text().strip() == "1":
+                return True
+        except OSError:
+            continue
+    return False if found else None
+
+
+class PowerSupplyWatcher:
+    """AC durumu değiştiğinde `on_change(online)` çağırır (yalnızca gerçek değişimde)."""
+
+    def __init__(self, on_change: Callable[[bool], None],
+                 monitor: Optional[UeventMonitor] = None,
+                 poll_interval: float = FALLBACK_POLL_SEC):
+        self._on_change = on_change
+        self._monitor = monitor
+        self._poll_interval = max(1.0, float(poll_interval))
+        self._lock = threading.Lock()
+        self._online: Optional[bool] = None
+        self._stop = threading.Event()
+        self._poll_thread: Optional[threading.Thread] = None
+
+    @property
+    def online(self) -> Optional[bool]:
+        return self._online
+
+    def start(self):
+        """Mevcut durumu oku ve olay dinlemeye (veya yoklamaya) başla."""
+        self._online = read_ac_online()
+        log.info("Güç kaynağı: %s", {True: "AC", False: "pil", None: "bilinmiyor"}[self._online])
+        if self._monitor is not None:
+            self._monitor.subscribe("power_supply", self._on_uevent)
+            if self._monitor.start():
+                return
+        log.warning("power_supply uevent'leri alınamıyor, %.0fs aralıkla yoklanacak",
+                    self._poll_interval)
+        self._stop.clear()
+        self._poll_thread = threading.Thread(target=self._poll, daemon=True,
+                                             name="power-supply-poll")
+        self._poll_thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _on_uevent(self, event: Uevent):
+        props = event.properties
+        # Pil olayları (kapasite değişimi) dakikada bir gelir; yalnızca Mains ilgilendirir
+        supply_type = props.get("POWER_SUPPLY_TYPE")
+        if supply_type is not None and supply_type != "Mains":
+            return
+        online = props.get("POWER_SUPPLY_ONLINE")
+        self._update(online == "1" if online in ("0", "1") else read_ac_online())
+
+    def _poll(self):
+        while not self._stop.wait(self._poll_interval):
+            self._update(read_ac_online())
+
+    def _update(self, online: Optional[bool]):
+        if online is None:
+            return
+        with self._lock:
+            if online == self._online:
+                return
+            self._online = online
+        log.info("Güç kaynağı değişti: %s", "AC" if online else "pil")
+        try:
+            self._on_change(online)
+        except Exception as e:
+            log.error("Güç kaynağı işleyici hatası: %s", e)
@@ -0,0 +1,177 @@
+"""
+Monster HW Controller - Process Sampler
+Isıya hangi süreçlerin yol açtığını göstermek için süreç başına CPU ve
+NVIDIA GPU kullanımı.
+
+CPU: /proc/[pid]/stat içindeki utime+stime (tick) farkları; dosya ham bayt
+olarak tek read() ile okunur, psutil gerekmez. Yüzde `top` gibi tek
+çekirdeğe göredir (4 çekirdeği dolduran süreç %400).
+GPU: NvidiaGpuController.get_process_usage() (NVML veya
+nvidia-smi --query-compute-apps); maliyetli olduğundan `gpu_interval`
+saniyede bir sorgulanır ve GPU uykudaysa hiç sorgulanmaz.
+
+Örnekleyici yalnızca çağrıldığında çalışır; çağıran taraf onu yalnızca
+panel görünürken veya termal seviye ≥1 iken çağırır.
+"""
+
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+log = get_logger("process_sampler")
+
+PROC_DIR = "/proc"
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+# Bu kadar süre çağrılmazsa geçmiş atılır (eski farklar yanıltıcı olur)
+STALE_AFTER_SEC = 10.0
+
+
+@dataclass
+class ProcessUsage:
+    """Tek bir sürecin kaynak kullanımı."""
+    pid: int
+    name: str
+    cpu_pct: float = 0.0       # Tek çekirdeğe göre %
+    gpu_mem_mib: int = 0
+    gpu_sm_pct: int = -1       # -1 = bilinmiyor (nvidia-smi yolu)
+
+
+@dataclass
+class ProcessSnapshot:
+    """En çok kaynak kullanan süreçler."""
+    timestamp: float = 0.0
+    interval_sec: float = 0.0  # CPU farkının ölçüldüğü süre (0 = ilk örnek)
+    cpu: List[ProcessUsage] = field(default_factory=list)
+    gpu: List[ProcessUsage] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _read_stat(pid: str) -> Optional[Tuple[str, int]]:
+    """(comm, utime+stime) — süreç kaybolduysa None."""
+    try:
+        fd = os.open(f"{PROC_DIR}/{pid}/stat", os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        data = os.read(fd, 1024)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    # comm parantez içinde ve boşluk/parantez içerebilir: son ')' sonrası alanlar
+    lparen = data.find(b"(")
+    rparen = data.rfind(b")")
+    if lparen < 0 or rparen < 0:
+        return None
+    fields = data[rparen + 2:].split(b" ", 13)
+    try:
+        ticks = int(fields[11]) + int(fields[12])  # utime + stime
+    except (IndexError, ValueError):
+        return None
+    return data[lparen + 1:rparen].decode("utf-8", "replace"), ticks
+
+
+def _read_comm(pid: int) -> str:
+    try:
+        with open(f"{PROC_DIR}/{pid}/comm", "rb") as f:
+            return f.read().strip().decode("utf-8", "replace")
+    except OSError:
+        return str(pid)
+
+
+class ProcessSampler:
+    """Süreç başına CPU tick farkı ve GPU kullanımı ile top-N listesi."""
+
+    def __init__(self, nvidia=None, top_n: int = 5, gpu_interval: float = 5.0):
+        self._nvidia = nvidia
+        self._top_n = max(1, int(top_n))
+        self._gpu_interval = float(gpu_interval)
+        self._lock = threading.Lock()
+        self._prev_ticks: Dict[str, int] = {}
+        self._prev_time: Optional[float] = None
+        self._gpu_cache: Dict[int, Tuple[str, int, int]] = {}
+        self._gpu_time: Optional[float] = None
+        self._last = ProcessSnapshot()
+
+    @property
+    def last(self) -> ProcessSnapshot:
+        return self._last
+
+    def reset(self):
+        """Geçmişi at (örnekleyici pasifken)."""
+        with self._lock:
+            self._prev_ticks = {}
+            self._prev_time = None
+            self._gpu_cache = {}
+            self._gpu_time = None
+            self._last = ProcessSnapshot()
+
+    def sample(self, now: Optional[float] = None) -> ProcessSnapshot:
+        """Bir örnek al; CPU yüzdeleri önceki çağrıya göre hesaplanır."""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if self._prev_time is not None and now - self._prev_time > STALE_AFTER_SEC:
+                self._prev_ticks = {}
+                self._prev_time = None
+            snap = ProcessSnapshot(timestamp=time.time())
+            snap.cpu = self._sample_cpu(now, snap)
+            snap.gpu = self._sample_gpu(now)
+            self._last = snap
+            return snap
+
+    def _sample_cpu(self, now: float, snap: ProcessSnapshot) -> List[ProcessUsage]:
+        ticks: Dict[str, int] = {}
+        names: Dict[str, str] = {}
+        try:
+            entries = os.listdir(PROC_DIR)
+        except OSError as e:
+            log.debug("/proc okunamadı: %s", e)
+            return []
+        for pid in entries:
+            if not pid.isdigit():
+                continue
+            stat = _read_stat(pid)
+            if stat is not None:
+                names[pid], ticks[pid] = stat
+
+        prev, prev_time = self._prev_ticks, self._prev_time
+        self._prev_ticks, self._prev_time = ticks, now
+        if prev_time is None or now <= prev_time:
+            return []
+
+        elapsed = now - prev_time
+        snap.interval_sec = round(elapsed, 3)
+        scale = 100.0 / (CLK_TCK * elapsed)
+        deltas = []
+        for pid, total in ticks.items():
+            delta = total - prev.get(pid, total)
+            if delta > 0:
+                deltas.append((delta, pid))
+        deltas.sort(reverse=True)
+        return [ProcessUsage(pid=int(pid), name=names[pid], cpu_pct=round(delta * scale, 1))
+                for delta, pid in deltas[:self._top_n]]
+
+    def _sample_gpu(self, now: float) -> List[ProcessUsage]:
+        if self._nvidia is None or not self._nvidia.available:
+            return []
+        if self._gpu_time is None or now - self._gpu_time >= self._gpu_interval:
+            self._gpu_time = now
+            try:
+                self._gpu_cache = self._nvidia.get_process_usage()
+            except Exception as e:
+                log.debug("GPU süreç sorgusu başarısız: %s", e)
+                self._gpu_cache = {}
+        usage = [
+            ProcessUsage(pid=pid, name=name or _read_comm(pid), gpu_mem_mib=mem, gpu_sm_pct=sm)
+            for pid, (name, mem, sm) in self._gpu_cache.items()
+        ]
+        usage.sort(key=lambda u: (u.gpu_sm_pct, u.gpu_mem_mib), reverse=True)
+        return usage[:self._top_n]
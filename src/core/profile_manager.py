@@ -5,8 +5,9 @@ Güç profillerini yönetir. CPU, GPU, fan ayarlarını tek bir profilde birleş
 
 import subprocess
 from dataclasses import asdict, dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+from src.core.apply_engine import ApplyReport, ApplyTransaction
 from src.core.cpu_controller import CpuController
 from src.core.fan_controller import FanController, FanCurvePoint
 from src.core.gpu_intel import IntelGpuController
@@ -159,6 +160,15 @@ DEFAULT_PROFILES = {
     },
 }
 
+# Profil bölümleri arasında diff'lenen (geri okunabilir) bölümler
+DIFF_SECTIONS = ("cpu", "nvidia", "igpu")
+
+# Birlikte yazılması gereken ayar grupları
+LINKED_SETTINGS = {
+    "cpu": (("min_freq_khz", "max_freq_khz"),),
+    "igpu": (("min_freq_mhz", "max_freq_mhz"),),
+}
+
 
 class ProfileManager:
     """Güç profil yönetimi."""
@@ -177,6 +187,8 @@ class ProfileManager:
         self._igpu = igpu
         self._fan = fan
         self._active_profile: Optional[str] = None
+        self._applied_fan: Optional[Dict[str, Any]] = None  # Son uygulanan fan ayarları
+        self._last_report: Optional[ApplyReport] = None
         self._init_default_profiles()
 
     def _init_default_profiles(self):
@@ -210,85 +222,226 @@ class ProfileManager:
             return False
         return self._config.delete_profile(name)
 
-    def _capture_current_state(self) -> dict:
-        """Profil uygulamadan önce mevcut durumu yakala (rollback için)."""
+    def _capture_current_state(self, profile: Optional[Dict[str, Any]] = None) -> dict:
+        """Mevcut donanım durumunu profil şemasında yakala (diff ve rollback için).
+
+        profile verilirse yalnızca profilde bulunan bölümler okunur; böylece
+        NVIDIA ayarı içermeyen bir profil için nvidia-smi çalıştırılmaz.
+        """
+        sections = set(profile) if profile is not None else {"cpu", "igpu", "nvidia"}
+        state: Dict[str, Dict[str, Any]] = {}
         try:
-            cpu_st = self._cpu.get_status()
-            igpu_st = self._igpu.get_status()
-            state = {
-                "cpu": {
+            if "cpu" in sections:
+                cpu_st = self._cpu.get_status()
+                state["cpu"] = {
                     "governor": cpu_st.governor,
                     "epp": cpu_st.epp,
                     "turbo": cpu_st.turbo_enabled,
                     "max_freq_khz": cpu_st.max_freq_khz,
                     "min_freq_khz": cpu_st.min_freq_khz,
                     "max_perf_pct": cpu_st.max_perf_pct,
-                },
-                "igpu": {
+                }
+            if "igpu" in sections and self._igpu.available:
+                igpu_st = self._igpu.get_status()
+                state["igpu"] = {
                     "min_freq_mhz": igpu_st.min_freq_mhz,
                     "max_freq_mhz": igpu_st.max_freq_mhz,
-                },
-            }
-            # NVIDIA güç limiti
-            if self._nvidia.available:
-                try:
-                    nv_st = self._nvidia.get_status()
-                    state["nvidia"] = {
-                        "power_limit": int(nv_st.power_limit),
-                    }
-                except Exception:
-                    pass
-            return state
+                }
         except Exception as e:
             log.warning("Durum yakalama hatası (rollback devre dışı): %s", e)
             return {}
 
-    def _rollback(self, state: dict):
-        """Önceki duruma geri dön."""
-        if not state:
-            return
-        log.warning("Profil uygulaması kısmi başarısızlık — rollback başlıyor")
-
-        cpu = state.get("cpu", {})
-        if cpu:
+        # NVIDIA: güç limiti her seferinde GPU'dan okunur. Saat kilitleri geri
+        # okunamaz; yalnızca bu süreç son uyku/uyanmadan beri yazdıysa bilinir,
+        # aksi halde durumda yer almaz ve profil uygulanırken her zaman yazılır.
+        if "nvidia" in sections and self._nvidia.available:
+            locks = self._nvidia.clock_locks
+            nv_state = {key: locks[key] for key in ("gpu_clock_max", "mem_clock_max")
+                        if key in locks}
             try:
-                if "governor" in cpu:
-                    self._cpu.set_governor(cpu["governor"])
-                if "epp" in cpu:
-                    self._cpu.set_epp(cpu["epp"])
-                if "turbo" in cpu:
-                    self._cpu.set_turbo(cpu["turbo"])
-                if "max_perf_pct" in cpu:
-                    self._cpu.set_max_perf_pct(cpu["max_perf_pct"])
-                if "min_freq_khz" in cpu and "max_freq_khz" in cpu:
-                    self._cpu.set_freq_range(cpu["min_freq_khz"], cpu["max_freq_khz"])
-            except Exception as e:
-                log.error("CPU rollback hatası: %s", e)
-
-        igpu = state.get("igpu", {})
-        if igpu and self._igpu.available:
-            try:
-                self._igpu.set_freq_range(
-                    igpu.get("min_freq_mhz", 350),
-                    igpu.get("max_freq_mhz", 1150),
-                )
-            except Exception as e:
-                log.error("iGPU rollback hatası: %s", e)
-
-        # NVIDIA saat limitleri ve güç limiti geri yükle
-        if self._nvidia.available:
-            try:
-                self._nvidia.reset_gpu_clocks()
-                nv = state.get("nvidia", {})
-                if "power_limit" in nv:
-                    self._nvidia.set_power_limit(nv["power_limit"])
+                power_limit = self._nvidia.query_power_limit()
             except Exception:
-                pass
+                power_limit = None
+            if power_limit is not None:
+                nv_state["power_limit"] = power_limit
+            state["nvidia"] = nv_state
+
+        return state
 
-        log.info("Rollback tamamlandı")
+    @staticmethod
+    def _diff_profile(profile: Dict[str, Any], current: dict) -> Dict[str, Dict[str, Any]]:
+        """Profil ile mevcut durum arasındaki farkı döndür.
+
+        Sadece değişmesi gereken ayarlar döner. Birlikte yazılan ayarlardan
+        (ör. min/max frekans) biri değişirse grubun tamamı dahil edilir.
+        """
+        changes: Dict[str, Dict[str, Any]] = {}
+        for section in DIFF_SECTIONS:
+            target = profile.get(section) or {}
+            if not target:
+                continue
+            cur = current.get(section, {})
+            diff = {k: v for k, v in target.items() if cur.get(k) != v}
+            for group in LINKED_SETTINGS.get(section, ()):
+                if any(k in diff for k in group):
+                    diff.update({k: target[k] for k in group if k in target})
+            if diff:
+                changes[section] = diff
+        return changes
+
+    def _fan_unchanged(self, fan_settings: Dict[str, Any]) -> bool:
+        """Fan ayarları son uygulanan ile aynı ve fan hâlâ o modda mı?"""
+        if self._applied_fan is None or fan_settings != self._applied_fan:
+            return False
+        return self._fan.mode == fan_settings.get("mode", "auto")
+
+    # --- Alt sistem yazma setleri ---
+
+    def _apply_cpu(self, cpu_settings: Dict[str, Any]) -> bool:
+        """CPU ayarlarını uygula (intel_pstate + cpufreq sysfs)."""
+        cpu_ok = True
+        if "governor" in cpu_settings:
+            if not self._cpu.set_governor(cpu_settings["governor"]):
+                cpu_ok = False
+        if "epp" in cpu_settings:
+            if not self._cpu.set_epp(cpu_settings["epp"]):
+                cpu_ok = False
+        if "turbo" in cpu_settings:
+            if not self._cpu.set_turbo(cpu_settings["turbo"]):
+                cpu_ok = False
+        if "max_perf_pct" in cpu_settings:
+            if not self._cpu.set_max_perf_pct(cpu_settings["max_perf_pct"]):
+                cpu_ok = False
+        if "max_freq_khz" in cpu_settings and "min_freq_khz" in cpu_settings:
+            if not self._cpu.set_freq_range(
+                cpu_settings["min_freq_khz"], cpu_settings["max_freq_khz"]
+            ):
+                cpu_ok = False
+        return cpu_ok
+
+    def _apply_nvidia(self, nvidia_settings: Dict[str, Any]) -> bool:
+        """NVIDIA ayarlarını tek batch'te uygula (tek NVML oturumu)."""
+        batch = self._nvidia.batch()
+        if "power_limit" in nvidia_settings:
+            batch.set_power_limit(nvidia_settings["power_limit"])
+        if "gpu_clock_max" in nvidia_settings:
+            batch.set_gpu_clocks(300, nvidia_settings["gpu_clock_max"])
+        if "mem_clock_max" in nvidia_settings:
+            batch.set_mem_clocks(405, nvidia_settings["mem_clock_max"])
+        results = batch.apply()
+        failed = [name for name, ok in results.items() if not ok]
+        if failed:
+            log.error("NVIDIA ayarları uygulanamadı: %s", ", ".join(failed))
+        return not failed
+
+    def _apply_igpu(self, igpu_settings: Dict[str, Any]) -> bool:
+        """iGPU frekans aralığını uygula (i915 sysfs)."""
+        min_f = igpu_settings.get("min_freq_mhz", 350)
+        max_f = igpu_settings.get("max_freq_mhz", 1150)
+        return self._igpu.set_freq_range(min_f, max_f)
+
+    def _apply_fan(self, fan_settings: Dict[str, Any], temp_callback=None) -> bool:
+        """Fan ayarlarını uygula (EC). EC yazımı başarısızsa False."""
+        fan_mode = fan_settings.get("mode", "auto")
+        ok = True
+        if fan_mode == "auto":
+            ok = self._fan.set_auto_mode()
+        elif fan_mode == "manual":
+            duty = fan_settings.get("duty_pct", 50)
+            ok = self._fan.set_both_fans(duty)
+        elif fan_mode == "curve":
+            curve_data = fan_settings.get("curve", [])
+            if curve_data:
+                curve = [FanCurvePoint(**p) for p in curve_data]
+                self._fan.set_fan_curve(curve)
+                if temp_callback:
+                    ok = self._fan.start_auto_curve(temp_callback)
+        if not ok:
+            log.error("Fan ayarları uygulanamadı (mod: %s)", fan_mode)
+            return False
+        self._applied_fan = dict(fan_settings)
+        return True
+
+    def _capture_fan_state(self) -> Dict[str, Any]:
+        """Rollback için fan modu, EC'deki duty değerleri ve eğri."""
+        status = self._fan.get_status()
+        return {
+            "mode": self._fan.mode,
+            "cpu_duty_pct": status.cpu_fan_duty_pct,
+            "gpu_duty_pct": status.gpu_fan_duty_pct,
+            "curve": [FanCurvePoint(p.temp, p.duty_pct) for p in self._fan.fan_curve],
+        }
+
+    # --- Alt sistem rollback'leri ---
+
+    def _rollback_cpu(self, cpu: Dict[str, Any]) -> bool:
+        success = True
+        if "governor" in cpu:
+            success &= self._cpu.set_governor(cpu["governor"])
+        if "epp" in cpu:
+            success &= self._cpu.set_epp(cpu["epp"])
+        if "turbo" in cpu:
+            success &= self._cpu.set_turbo(cpu["turbo"])
+        if "max_perf_pct" in cpu:
+            success &= self._cpu.set_max_perf_pct(cpu["max_perf_pct"])
+        if "min_freq_khz" in cpu and "max_freq_khz" in cpu:
+            success &= self._cpu.set_freq_range(cpu["min_freq_khz"], cpu["max_freq_khz"])
+        return success
+
+    def _rollback_igpu(self, igpu: Dict[str, Any]) -> bool:
+        return self._igpu.set_freq_range(
+            igpu.get("min_freq_mhz", 350),
+            igpu.get("max_freq_mhz", 1150),
+        )
+
+    def _rollback_nvidia(self, nv: Dict[str, Any]) -> bool:
+        # NVIDIA saat limitleri ve güç limiti geri yükle (tek batch)
+        batch = self._nvidia.batch()
+        if "gpu_clock_max" in nv or "mem_clock_max" in nv:
+            batch.reset_gpu_clocks()
+        if "power_limit" in nv:
+            batch.set_power_limit(nv["power_limit"])
+        return all(batch.apply().values())
+
+    def _rollback_fan(self, fan: Dict[str, Any], temp_callback=None) -> bool:
+        # Eğriyi geri koy, sonra önceki modu (ve manuelde duty'leri) geri yükle
+        self._fan.set_fan_curve(list(fan["curve"]))
+        mode = fan["mode"]
+        if mode == "manual":
+            success = self._fan.set_cpu_fan(fan["cpu_duty_pct"])
+            success &= self._fan.set_gpu_fan(fan["gpu_duty_pct"])
+        elif mode == "curve" and temp_callback:
+            success = self._fan.start_auto_curve(temp_callback)
+        else:
+            success = self._fan.set_auto_mode()
+        self._applied_fan = None
+        return success
+
+    def _rollback_steps(self, state: dict,
+                        temp_callback=None) -> Dict[str, Callable[[], bool]]:
+        """Önceki durum (yalnızca değiştirilen ayarlar) için rollback adımları."""
+        steps: Dict[str, Callable[[], bool]] = {}
+        if state.get("cpu"):
+            steps["cpu"] = lambda: self._rollback_cpu(state["cpu"])
+        if state.get("igpu") and self._igpu.available:
+            steps["igpu"] = lambda: self._rollback_igpu(state["igpu"])
+        if state.get("nvidia") and self._nvidia.available:
+            steps["nvidia"] = lambda: self._rollback_nvidia(state["nvidia"])
+        if state.get("fan") and self._fan.available:
+            steps["fan"] = lambda: self._rollback_fan(state["fan"], temp_callback)
+        return steps
+
+    @property
+    def last_apply_report(self) -> Optional[ApplyReport]:
+        """Son profil uygulamasının alt sistem süreleri ve sonuçları."""
+        return self._last_report
 
     def apply_profile(self, name: str, temp_callback=None) -> bool:
-        """Bir profili uygula."""
+        """Bir profili uygula.
+
+        Yalnızca farklı olan ayarlar yazılır. CPU, NVIDIA, iGPU ve fan yazma
+        setleri paralel çalışır; biri başarısız olursa hepsi geri alınır.
+        """
         profile = self._config.load_profile(name)
         if not profile:
             log.error("Profil bulunamadı: %s", name)
@@ -296,81 +449,49 @@ class ProfileManager:
 
         log.info("Profil uygulanıyor: %s", profile.get("name", name))
 
-        # Rollback için mevcut durumu yakala
-        prev_state = self._capture_current_state()
-        success = True
-        failed_components = []
-
-        # CPU ayarları
-        cpu_settings = profile.get("cpu", {})
-        if cpu_settings:
-            cpu_ok = True
-            if "governor" in cpu_settings:
-                if not self._cpu.set_governor(cpu_settings["governor"]):
-                    cpu_ok = False
-            if "epp" in cpu_settings:
-                if not self._cpu.set_epp(cpu_settings["epp"]):
-                    cpu_ok = False
-            if "turbo" in cpu_settings:
-                if not self._cpu.set_turbo(cpu_settings["turbo"]):
-                    cpu_ok = False
-            if "max_perf_pct" in cpu_settings:
-                if not self._cpu.set_max_perf_pct(cpu_settings["max_perf_pct"]):
-                    cpu_ok = False
-            if "max_freq_khz" in cpu_settings and "min_freq_khz" in cpu_settings:
-                if not self._cpu.set_freq_range(
-                    cpu_settings["min_freq_khz"], cpu_settings["max_freq_khz"]
-                ):
-                    cpu_ok = False
-            if not cpu_ok:
-                success = False
-                failed_components.append("CPU")
-
-        # NVIDIA GPU ayarları
-        nvidia_settings = profile.get("nvidia", {})
-        if nvidia_settings and self._nvidia.available:
-            nv_ok = True
-            if "power_limit" in nvidia_settings:
-                if not self._nvidia.set_power_limit(nvidia_settings["power_limit"]):
-                    nv_ok = False
-            if "gpu_clock_max" in nvidia_settings:
-                if not self._nvidia.set_gpu_clocks(300, nvidia_settings["gpu_clock_max"]):
-                    nv_ok = False
-            if "mem_clock_max" in nvidia_settings:
-                if not self._nvidia.set_mem_clocks(405, nvidia_settings["mem_clock_max"]):
-                    nv_ok = False
-            if not nv_ok:
-                failed_components.append("NVIDIA")
-
-        # Intel iGPU ayarları
-        igpu_settings = profile.get("igpu", {})
-        if igpu_settings and self._igpu.available:
-            min_f = igpu_settings.get("min_freq_mhz", 350)
-            max_f = igpu_settings.get("max_freq_mhz", 1150)
-            if not self._igpu.set_freq_range(min_f, max_f):
-                failed_components.append("iGPU")
-
-        # Fan ayarları
+        # Mevcut durumu yakala ve profille farkını çıkar
+        current = self._capture_current_state(profile)
+        changes = self._diff_profile(profile, current)
+
+        # Rollback için yalnızca değişecek ayarların önceki değerleri
+        prev_state = {
+            section: {k: current[section][k] for k in diff if k in current.get(section, {})}
+            for section, diff in changes.items()
+        }
+        # Önceki saat kilidi bilinmese de rollback'te sıfırlanabilmesi için işaretle
+        for key in ("gpu_clock_max", "mem_clock_max"):
+            if key in changes.get("nvidia", {}):
+                prev_state["nvidia"].setdefault(key, None)
+        prev_state = {section: vals for section, vals in prev_state.items() if vals}
+
+        total = sum(len(profile.get(sec) or {}) for sec in DIFF_SECTIONS)
+        changed = sum(len(diff) for diff in changes.values())
+        log.info("Profil farkı: %d/%d ayar değişecek", changed, total)
+
+        # Alt sistem yazma setleri
+        steps: Dict[str, Callable[[], bool]] = {}
+        if changes.get("cpu"):
+            steps["cpu"] = lambda: self._apply_cpu(changes["cpu"])
+        if changes.get("nvidia") and self._nvidia.available:
+            steps["nvidia"] = lambda: self._apply_nvidia(changes["nvidia"])
+        if "igpu" in changes and self._igpu.available:
+            steps["igpu"] = lambda: self._apply_igpu(profile.get("igpu", {}))
         fan_settings = profile.get("fan", {})
-        if fan_settings and self._fan.available:
-            fan_mode = fan_settings.get("mode", "auto")
-            if fan_mode == "auto":
-                self._fan.set_auto_mode()
-            elif fan_mode == "manual":
-                duty = fan_settings.get("duty_pct", 50)
-                self._fan.set_both_fans(duty)
-            elif fan_mode == "curve":
-                curve_data = fan_settings.get("curve", [])
-                if curve_data:
-                    curve = [FanCurvePoint(**p) for p in curve_data]
-                    self._fan.set_fan_curve(curve)
-                    if temp_callback:
-                        self._fan.start_auto_curve(temp_callback)
-
-        # Kısmi başarısızlıkta rollback
-        if failed_components:
-            log.warning("Profil kısmi başarısızlık: %s", ", ".join(failed_components))
-            self._rollback(prev_state)
+        if fan_settings and self._fan.available and not self._fan_unchanged(fan_settings):
+            prev_state["fan"] = self._capture_fan_state()
+            steps["fan"] = lambda: self._apply_fan(fan_settings, temp_callback)
+
+        report = ApplyTransaction(
+            steps, self._rollback_steps(prev_state, temp_callback)).run()
+        self._last_report = report
+        if report.results:
+            log.info("Profil alt sistem süreleri: %s (toplam %.0fms)",
+                     report.summary(), report.elapsed_ms)
+
+        # Kısmi başarısızlıkta rollback yapıldı
+        if not report.success:
+            log.warning("Profil kısmi başarısızlık: %s", ", ".join(report.failed))
+            self._applied_fan = None
             return False
 
         self._active_profile = name
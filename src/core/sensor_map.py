@@ -0,0 +1,142 @@
+"""
+Monster HW Controller - Sensor Role Mapping
+hwmon sensörlerini (çip adı + etiket) TempReading alanlarına eşleyen
+bildirimsel kurallar.
+
+Kurallar yalnızca keşifte (başlangıç, hotplug, yeniden tarama) bir kez
+uygulanır ve sonuç indeks dizilerine derlenir (SensorLayout). read_all()
+her turda yalnızca "sensör i'yi oku, j alanına yaz" yapar; çip adı veya
+etiket karşılaştırması yoktur.
+
+Kural sırası önceliktir: bir sensör ilk eşleşen kurala atanır; tekil
+rollerde (ör. cpu_package) birden çok aday varsa önce gelen kural, eşitse
+önce keşfedilen sensör kazanır. Hazır paketler birbirinden bağımsız çip
+adları kullandığından varsayılan olarak hepsi birlikte etkindir; ayarlardaki
+`sensor_map.rules` paketlerden önce değerlendirilir.
+"""
+
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence, Tuple
+
+from src.utils.logger import get_logger
+
+log = get_logger("sensor_map")
+
+# Tekil roller: TempReading'de aynı adlı float alan
+SCALAR_ROLES = ("cpu_package", "pch", "nvme", "wifi", "gpu_amd")
+# Çoklu roller: TempReading'deki tampon alanı
+ARRAY_ROLES = {"cpu_core": "cpu_cores", "acpi": "acpi"}
+
+MAPPING_PACKS: Dict[str, List[Dict[str, str]]] = {
+    # Clevo / Tongfang Intel kasalar (Monster Tulpar/Abra, XMG, Tuxedo, Schenker ...)
+    "intel-clevo-tongfang": [
+        {"role": "cpu_package", "chip": "coretemp", "label": r"^Package id"},
+        {"role": "cpu_core", "chip": "coretemp", "label": r"^Core"},
+        {"role": "pch", "chip": r"pch_\w+"},
+        {"role": "wifi", "chip": r"iwlwifi(_\d+)?"},
+    ],
+    # AMD Ryzen kasalar (Tongfang/Clevo AMD, k10temp/zenpower + amdgpu)
+    "amd-k10temp": [
+        {"role": "cpu_package", "chip": "k10temp|zenpower", "label": r"^Tdie$"},
+        {"role": "cpu_package", "chip": "k10temp|zenpower", "label": r"^Tctl$"},
+        {"role": "cpu_core", "chip": "k10temp|zenpower", "label": r"^Tccd\d+$"},
+        {"role": "gpu_amd", "chip": "amdgpu", "label": r"^edge$"},
+        {"role": "wifi", "chip": r"mt79\w+|ath1\dk\w*"},
+    ],
+    # Platformdan bağımsız
+    "common": [
+        {"role": "nvme", "chip": "nvme", "label": r"^Composite$"},
+        {"role": "nvme", "chip": "nvme"},
+        {"role": "acpi", "chip": "acpitz"},
+    ],
+}
+
+DEFAULT_PACKS = ("intel-clevo-tongfang", "amd-k10temp", "common")
+
+
+@dataclass
+class SensorRule:
+    """Çip adı (tam eşleşme) ve isteğe bağlı etiket (arama) regex'i → rol."""
+    role: str
+    chip: str
+    label: str = ""
+    _chip_re: Pattern = field(init=False, repr=False, compare=False)
+    _label_re: Optional[Pattern] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.role not in SCALAR_ROLES and self.role not in ARRAY_ROLES:
+            raise ValueError(f"Bilinmeyen sensör rolü: {self.role}")
+        self._chip_re = re.compile(self.chip)
+        self._label_re = re.compile(self.label) if self.label else None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SensorRule":
+        return cls(role=data["role"], chip=data["chip"], label=data.get("label", ""))
+
+    def matches(self, chip: str, label: str) -> bool:
+        if not self._chip_re.fullmatch(chip):
+            return False
+        return self._label_re is None or self._label_re.search(label) is not None
+
+
+@dataclass(frozen=True)
+class SensorLayout:
+    """Derlenmiş eşleme: sensör listesi ve her rolün sensör indeksleri."""
+    sensors: Sequence[Any] = ()
+    scalars: Tuple[Tuple[str, int], ...] = ()          # (TempReading alanı, sensör indeksi)
+    arrays: Tuple[Tuple[str, array], ...] = ()         # (TempReading tampon alanı, indeksler)
+
+    def index_of(self, role: str) -> Optional[int]:
+        for name, idx in self.scalars:
+            if name == role:
+                return idx
+        return None
+
+
+class SensorMapper:
+    """Kural listesini tutar ve sensör listelerini SensorLayout'a derler."""
+
+    def __init__(self, rules: List[SensorRule]):
+        self._rules = rules
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> "SensorMapper":
+        """`sensor_map` ayarından: önce özel kurallar, sonra seçili paketler."""
+        settings = settings or {}
+        rules: List[SensorRule] = []
+        for data in settings.get("rules") or []:
+            try:
+                rules.append(SensorRule.from_dict(data))
+            except (KeyError, TypeError, ValueError, re.error) as e:
+                log.error("Geçersiz sensör eşleme kuralı %s: %s", data, e)
+        for pack in settings.get("packs") or DEFAULT_PACKS:
+            if pack not in MAPPING_PACKS:
+                log.warning("Bilinmeyen sensör eşleme paketi: %s", pack)
+                continue
+            rules.extend(SensorRule.from_dict(d) for d in MAPPING_PACKS[pack])
+        return cls(rules)
+
+    def compile(self, sensors: Iterable[Any]) -> SensorLayout:
+        """Her sensörü ilk eşleşen kurala ata ve indeks dizilerini oluştur."""
+        sensors = list(sensors)
+        best: Dict[str, Tuple[int, int]] = {}   # tekil rol → (kural no, sensör indeksi)
+        multi: Dict[str, array] = {role: array("i") for role in ARRAY_ROLES}
+        for idx, sensor in enumerate(sensors):
+            for rule_no, rule in enumerate(self._rules):
+                if not rule.matches(sensor.name, sensor.label):
+                    continue
+                if rule.role in ARRAY_ROLES:
+                    multi[rule.role].append(idx)
+                elif rule.role not in best or (rule_no, idx) < best[rule.role]:
+                    best[rule.role] = (rule_no, idx)
+                break
+        layout = SensorLayout(
+            sensors=sensors,
+            scalars=tuple((role, best[role][1]) for role in SCALAR_ROLES if role in best),
+            arrays=tuple((ARRAY_ROLES[role], idx) for role, idx in multi.items()),
+        )
+        log.debug("Sensör eşlemesi: %s",
+                  {role: sensors[i].label for role, i in layout.scalars})
+        return layout
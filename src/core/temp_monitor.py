@@ -6,27 +6,41 @@ hwmon numaraları yeniden başlatmada değişebileceğinden isme göre eşleşti
 
 import os
 import subprocess
+import threading
+import time
+from array import array
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.core.gpu_nvidia import NVIDIA_SMI, NvidiaRuntimePm
+from src.core.sensor_map import SensorLayout, SensorMapper
+from src.utils.capabilities import get_capability_cache
+from src.utils.hw_paths import hw_path
 from src.utils.logger import get_logger
+from src.utils.metrics import COUNTER_SMI_TIMEOUTS, get_metrics
+from src.utils.snapshot import fit_array, reset_snapshot, snapshot_to_dict
 
 log = get_logger("temp_monitor")
 
-HWMON_BASE = Path("/sys/class/hwmon")
+HWMON_BASE = hw_path("/sys/class/hwmon")
 
 # Bilinen hwmon sensör isimleri ve açıklamaları
 KNOWN_HWMON = {
     "coretemp": "CPU",
+    "k10temp": "CPU",
+    "zenpower": "CPU",
     "pch_cometlake": "PCH",
+    "pch_cannonlake": "PCH",
+    "pch_tigerlake": "PCH",
     "acpitz": "ACPI",
     "nvme": "NVMe SSD",
     "iwlwifi_1": "WiFi",
+    "amdgpu": "AMD GPU",
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class TempSensor:
     """Tek bir sıcaklık sensörünü temsil eder."""
     name: str           # Sensör grubu adı (ör: coretemp)
@@ -38,86 +52,176 @@ class TempSensor:
     category: str = ""  # CPU, GPU, NVMe vb.
 
 
-@dataclass
+@dataclass(slots=True)
 class TempReading:
-    """Tüm sensörlerin anlık okuması."""
+    """Tüm sensörlerin anlık okuması (yeniden kullanılabilir; bkz. read_all(out))."""
     cpu_package: float = 0.0
-    cpu_cores: List[float] = field(default_factory=list)
+    cpu_cores: array = field(default_factory=lambda: array("f"))
     gpu_nvidia: float = 0.0
     pch: float = 0.0
     nvme: float = 0.0
     wifi: float = 0.0
-    acpi: List[float] = field(default_factory=list)
+    gpu_amd: float = 0.0
+    acpi: array = field(default_factory=lambda: array("f"))
+    # TempMonitor'un sensör listesi (kopya değil; liste yerinde değiştirilmez)
     sensors: List[TempSensor] = field(default_factory=list)
 
+    def to_dict(self) -> Dict[str, Any]:
+        return snapshot_to_dict(self)
+
 
 class TempMonitor:
     """Sistem sıcaklık sensörlerini yönetir."""
 
-    def __init__(self):
-        self._hwmon_map: Dict[str, Path] = {}  # name -> hwmon path
+    def __init__(self, sensor_map: Optional[Dict[str, Any]] = None):
+        # hwmon dizini -> (çip adı, cihaz yolu). Aynı çipten birden çok cihaz
+        # (ör. iki NVMe) olabildiğinden ad değil dizin/cihaz anahtardır.
+        self._hwmon_map: Dict[Path, Tuple[str, str]] = {}
         self._sensors: List[TempSensor] = []
+        # Rol eşlemesi keşifte derlenir; read_all yalnızca indeksleri izler
+        self._mapper = SensorMapper.from_settings(sensor_map)
+        self._layout = SensorLayout()
         self._last_nvidia_temp: float = 0.0
-        self._discover_hwmon()
-        self._discover_sensors()
+        self._last_nvidia_temp_at: float = 0.0  # set_nvidia_temp zamanı (monotonic)
+        self._nvidia_pm = NvidiaRuntimePm()
+        self._caps = get_capability_cache()
+        self._validated = True
+        # Keşif (tam tarama veya hotplug) yazarlarını sıralar; okuyucular kilitsizdir:
+        # sensör listesi yerinde değiştirilmez, yenisi oluşturulup atanır.
+        self._discover_lock = threading.RLock()
+        self._generation = 0
+        if not self._load_cached_sensors():
+            self._discover_hwmon()
+            self._discover_sensors()
+
+    def _load_cached_sensors(self) -> bool:
+        """hwmon eşleşmesini ve sensörleri yetenek cache'inden yükle.
+        Doğrulama ilk read_all() çağrısına ertelenir.
+        """
+        hwmon = self._caps.get("hwmon")
+        sensors = self._caps.get("hwmon_sensors")
+        if not hwmon or not sensors:
+            return False
+        try:
+            self._hwmon_map = {Path(path): (name, device)
+                               for path, (name, device) in hwmon.items()}
+            self._set_sensors([TempSensor(**s) for s in sensors])
+        except (TypeError, ValueError):
+            self._caps.invalidate("hwmon_sensors")
+            return False
+        self._validated = False
+        log.info("Toplam %d sıcaklık sensörü cache'ten yüklendi", len(self._sensors))
+        return True
+
+    def _validate_cached_sensors(self):
+        """Cache'ten gelen hwmon eşleşmesi hâlâ geçerli mi? Değilse yeniden keşfet."""
+        self._validated = True
+        for hwmon_path, (name, _) in self._hwmon_map.items():
+            try:
+                if (hwmon_path / "name").read_text().strip() != name:
+                    break
+            except OSError:
+                break
+        else:
+            if all(os.path.exists(s.path) for s in self._sensors):
+                return
+        log.info("hwmon cache'i güncel değil, sensörler yeniden keşfediliyor")
+        self.refresh_hwmon()
 
     def _discover_hwmon(self):
-        """hwmon cihazlarını isme göre keşfet ve eşleştir."""
-        self._hwmon_map.clear()
+        """hwmon cihazlarını keşfet (dizin -> çip adı, cihaz)."""
+        hwmon_map: Dict[Path, Tuple[str, str]] = {}
         if not HWMON_BASE.exists():
             log.warning("hwmon dizini bulunamadı: %s", HWMON_BASE)
+            self._hwmon_map = hwmon_map
             return
 
         for hwmon_dir in sorted(HWMON_BASE.iterdir()):
-            name_file = hwmon_dir / "name"
-            if name_file.exists():
-                try:
-                    name = name_file.read_text().strip()
-                    self._hwmon_map[name] = hwmon_dir
-                    log.debug("hwmon keşfedildi: %s -> %s", name, hwmon_dir)
-                except IOError:
-                    pass
+            name = self._read_hwmon_name(hwmon_dir)
+            if name:
+                hwmon_map[hwmon_dir] = (name, self._hwmon_device(hwmon_dir))
+                log.debug("hwmon keşfedildi: %s -> %s", name, hwmon_dir)
 
+        self._hwmon_map = hwmon_map
         log.info("Keşfedilen hwmon cihazları: %s",
-                 {k: str(v) for k, v in self._hwmon_map.items()})
+                 {str(k): name for k, (name, _) in self._hwmon_map.items()})
+
+    @staticmethod
+    def _read_hwmon_name(hwmon_dir: Path) -> str:
+        try:
+            return (hwmon_dir / "name").read_text().strip()
+        except (IOError, OSError):
+            return ""
+
+    @staticmethod
+    def _hwmon_device(hwmon_dir: Path) -> str:
+        """hwmon dizininin bağlı olduğu cihaz (device bağlantısı; yoksa dizinin kendisi).
+
+        hwmonN numarası resume/yeniden yüklemede değişebilir, cihaz yolu değişmez.
+        """
+        try:
+            return os.path.realpath(hwmon_dir / "device", strict=True)
+        except OSError:
+            return os.path.realpath(hwmon_dir)
 
     def _discover_sensors(self):
         """Tüm sıcaklık sensörlerini keşfet."""
-        self._sensors.clear()
-
-        for name, hwmon_path in self._hwmon_map.items():
-            category = KNOWN_HWMON.get(name, name)
-
-            # temp*_input dosyalarını bul
-            for temp_file in sorted(hwmon_path.glob("temp*_input")):
-                idx = temp_file.name.replace("temp", "").replace("_input", "")
-
-                # Etiket dosyasını oku
-                label_file = hwmon_path / f"temp{idx}_label"
-                label = ""
-                if label_file.exists():
-                    try:
-                        label = label_file.read_text().strip()
-                    except IOError:
-                        label = f"{category} #{idx}"
-                else:
-                    label = f"{category} #{idx}"
+        sensors: List[TempSensor] = []
+        for hwmon_path, (name, _) in self._hwmon_map.items():
+            sensors.extend(self._scan_hwmon(name, hwmon_path))
+        self._set_sensors(sensors)
+
+        log.info("Toplam %d sıcaklık sensörü keşfedildi", len(self._sensors))
+        self._store_cache()
 
-                # Max ve crit değerleri
-                temp_max = self._read_temp_file(hwmon_path / f"temp{idx}_max")
-                temp_crit = self._read_temp_file(hwmon_path / f"temp{idx}_crit")
+    def _scan_hwmon(self, name: str, hwmon_path: Path) -> List[TempSensor]:
+        """Tek bir hwmon dizinindeki temp*_input sensörleri."""
+        category = KNOWN_HWMON.get(name, name)
+        sensors = []
 
-                sensor = TempSensor(
-                    name=name,
-                    label=label,
-                    path=str(temp_file),
-                    temp_max=temp_max,
-                    temp_crit=temp_crit,
-                    category=category,
-                )
-                self._sensors.append(sensor)
+        # temp*_input dosyalarını bul
+        for temp_file in sorted(hwmon_path.glob("temp*_input")):
+            idx = temp_file.name.replace("temp", "").replace("_input", "")
 
-        log.info("Toplam %d sıcaklık sensörü keşfedildi", len(self._sensors))
+            # Etiket dosyasını oku
+            label_file = hwmon_path / f"temp{idx}_label"
+            label = ""
+            if label_file.exists():
+                try:
+                    label = label_file.read_text().strip()
+                except IOError:
+                    label = f"{category} #{idx}"
+            else:
+                label = f"{category} #{idx}"
+
+            # Max ve crit değerleri
+            temp_max = self._read_temp_file(hwmon_path / f"temp{idx}_max")
+            temp_crit = self._read_temp_file(hwmon_path / f"temp{idx}_crit")
+
+            sensors.append(TempSensor(
+                name=name,
+                label=label,
+                path=str(temp_file),
+                temp_max=temp_max,
+                temp_crit=temp_crit,
+                category=category,
+            ))
+        return sensors
+
+    def _set_sensors(self, sensors: List[TempSensor]):
+        """Sensör listesini ve derlenmiş rol eşlemesini birlikte değiştir."""
+        layout = self._mapper.compile(sensors)
+        self._layout = layout
+        self._sensors = layout.sensors
+        self._generation += 1
+
+    def _store_cache(self):
+        self._caps.set("hwmon", {str(k): list(v) for k, v in self._hwmon_map.items()})
+        self._caps.set("hwmon_sensors", [
+            {"name": s.name, "label": s.label, "path": s.path,
+             "temp_max": s.temp_max, "temp_crit": s.temp_crit, "category": s.category}
+            for s in self._sensors
+        ])
 
     @staticmethod
     def _read_temp_file(path: Path) -> float:
@@ -130,42 +234,66 @@ class TempMonitor:
             pass
         return 0.0
 
-    @staticmethod
-    def _read_nvidia_temp() -> float:
-        """NVIDIA GPU sıcaklığını nvidia-smi ile oku."""
+    def _read_nvidia_temp(self) -> float:
+        """NVIDIA GPU sıcaklığını nvidia-smi ile oku.
+        GPU runtime PM ile uykudaysa nvidia-smi çağrılmaz (GPU'yu uyandırır).
+        """
+        if not self._nvidia_pm.is_active():
+            return 0.0
         try:
             result = subprocess.run(
-                ["nvidia-smi", "--query-gpu=temperature.gpu", "--format=csv,noheader"],
+                [NVIDIA_SMI, "--query-gpu=temperature.gpu", "--format=csv,noheader"],
                 capture_output=True, text=True, timeout=3,
             )
             if result.returncode == 0 and result.stdout.strip():
                 return float(result.stdout.strip())
+        except subprocess.TimeoutExpired:
+            get_metrics().incr(COUNTER_SMI_TIMEOUTS)
         except (subprocess.SubprocessError, ValueError, FileNotFoundError):
             pass
         return 0.0
 
-    def read_all(self) -> TempReading:
-        """Tüm sensörlerin anlık değerlerini oku."""
-        reading = TempReading()
-
-        # hwmon sensörlerini oku
-        for sensor in self._sensors:
-            sensor.temp = self._read_temp_file(Path(sensor.path))
-
-            if sensor.name == "coretemp":
-                if "Package" in sensor.label:
-                    reading.cpu_package = sensor.temp
-                elif "Core" in sensor.label:
-                    reading.cpu_cores.append(sensor.temp)
-            elif sensor.name == "pch_cometlake":
-                reading.pch = sensor.temp
-            elif sensor.name == "nvme":
-                if reading.nvme == 0.0:  # İlk sıcaklık (composite)
-                    reading.nvme = sensor.temp
-            elif sensor.name == "iwlwifi_1":
-                reading.wifi = sensor.temp
-            elif sensor.name == "acpitz":
-                reading.acpi.append(sensor.temp)
+    @staticmethod
+    def _read_temp_input(path: str) -> float:
+        """temp*_input dosyasını oku (Path nesnesi ve exists() çağrısı olmadan)."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return 0.0
+        try:
+            return int(os.read(fd, 16)) / 1000.0
+        except (OSError, ValueError):
+            return 0.0
+        finally:
+            os.close(fd)
+
+    def read_all(self, out: Optional[TempReading] = None) -> TempReading:
+        """Tüm sensörlerin anlık değerlerini oku.
+        `out` verilirse yeni nesne oluşturulmaz; çekirdek/ACPI tamponları
+        sensör sayısı değişmedikçe yeniden boyutlanmaz.
+        """
+        if not self._validated:
+            self._validate_cached_sensors()
+
+        if out is None:
+            reading = TempReading()
+        else:
+            reading = out
+            reset_snapshot(reading)
+
+        # hwmon sensörlerini oku, ardından derlenmiş eşlemeyle alanlara dağıt
+        layout = self._layout
+        sensors = layout.sensors
+        read = self._read_temp_input
+        for sensor in sensors:
+            sensor.temp = read(sensor.path)
+        for name, i in layout.scalars:
+            setattr(reading, name, sensors[i].temp)
+        for name, indices in layout.arrays:
+            buf = getattr(reading, name)
+            fit_array(buf, len(indices))
+            for j, i in enumerate(indices):
+                buf[j] = sensors[i].temp
 
         # NVIDIA GPU sıcaklığı — öncelikle cache'den, yoksa subprocess
         if self._last_nvidia_temp > 0:
@@ -173,7 +301,7 @@ class TempMonitor:
         else:
             reading.gpu_nvidia = self._read_nvidia_temp()
 
-        reading.sensors = list(self._sensors)
+        reading.sensors = sensors
         return reading
 
     def set_nvidia_temp(self, temp: float):
@@ -181,12 +309,83 @@ class TempMonitor:
         NvidiaGpuController zaten nvidia-smi çağırıyorsa, sonucu buraya iletin.
         """
         self._last_nvidia_temp = temp
+        self._last_nvidia_temp_at = time.monotonic()
+
+    @property
+    def cached_nvidia_temp(self) -> float:
+        """Son iletilen NVIDIA sıcaklığı (nvidia-smi çağırmaz; yoksa 0)."""
+        return self._last_nvidia_temp
+
+    def nvidia_temp_age(self, now: Optional[float] = None) -> float:
+        """cached_nvidia_temp'in yaşı (s); hiç iletilmediyse sonsuz."""
+        if not self._last_nvidia_temp_at:
+            return float("inf")
+        return (time.monotonic() if now is None else now) - self._last_nvidia_temp_at
 
     def get_sensor_list(self) -> List[TempSensor]:
         """Keşfedilen tüm sensörlerin listesini döndür."""
         return list(self._sensors)
 
+    @property
+    def generation(self) -> int:
+        """Sensör kümesi her değiştiğinde artar (fd önbellekleri yeniden açılsın diye)."""
+        return self._generation
+
+    def sensor_device(self, sensor: TempSensor) -> str:
+        """Sensörün hwmon cihazının kısa adı (ör. nvme0, coretemp.0).
+
+        Aynı çipten birden çok cihaz (iki NVMe) ayrıştırılsın diye; hwmonN
+        numarasının aksine resume sonrası değişmez.
+        """
+        entry = self._hwmon_map.get(Path(sensor.path).parent)
+        return os.path.basename(entry[1]) if entry else Path(sensor.path).parent.name
+
+    def role_path(self, role: str) -> Optional[str]:
+        """Bir tekil role (ör. cpu_package) eşlenen sensörün dosya yolu."""
+        layout = self._layout
+        idx = layout.index_of(role)
+        return None if idx is None else layout.sensors[idx].path
+
     def refresh_hwmon(self):
         """hwmon eşleştirmesini yeniden yap (hot-plug durumları için)."""
-        self._discover_hwmon()
-        self._discover_sensors()
+        with self._discover_lock:
+            self._discover_hwmon()
+            self._discover_sensors()
+
+    def add_hwmon(self, hwmon_dir: Path) -> bool:
+        """Yeni görünen tek bir hwmon cihazının sensörlerini ekle (tam tarama yapmadan)."""
+        name = self._read_hwmon_name(hwmon_dir)
+        if not name:
+            return False
+        device = self._hwmon_device(hwmon_dir)
+        with self._discover_lock:
+            added = self._scan_hwmon(name, hwmon_dir)
+            # Yalnızca aynı cihazın eski kaydı (ör. resume sonrası numarası
+            # değişen) yerine geçer; aynı adlı başka cihazlar (ikinci NVMe) kalır
+            stale = {str(p) for p, (_, dev) in self._hwmon_map.items()
+                     if dev == device or p == hwmon_dir}
+            self._replace_hwmon(stale, {hwmon_dir: (name, device)}, added)
+        log.info("hwmon eklendi: %s -> %s (%d sensör)", name, hwmon_dir, len(added))
+        return True
+
+    def remove_hwmon(self, hwmon_dir: Path) -> bool:
+        """Kaybolan bir hwmon cihazının sensörlerini çıkar."""
+        with self._discover_lock:
+            entry = next(((p, name) for p, (name, _) in self._hwmon_map.items()
+                          if p.name == hwmon_dir.name), None)
+            if entry is None:
+                return False
+            path, name = entry
+            self._replace_hwmon({str(path)}, {}, [])
+        log.info("hwmon kaldırıldı: %s (%s)", name, hwmon_dir)
+        return True
+
+    def _replace_hwmon(self, stale: set, entries: Dict[Path, Tuple[str, str]],
+                       sensors: List[TempSensor]):
+        """`stale` dizinlerinin kayıt ve sensörlerini yenileriyle değiştir (kilit altında)."""
+        hwmon_map = {p: v for p, v in self._hwmon_map.items() if str(p) not in stale}
+        hwmon_map.update(entries)
+        self._hwmon_map = hwmon_map
+        self._set_sensors([s for s in self._sensors
+                           if os.path.dirname(s.path) not in stale] + sensors)
+        self._store_cache()
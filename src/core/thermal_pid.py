@@ -0,0 +1,266 @@
+"""
+Monster HW Controller - Closed-loop Power Controller
+Sabit termal seviyeler (max_perf_pct 70/55/40, GPU 45W/10W) arasında
+gidip gelmek yerine, hedef sıcaklığı (ör. 82°C) tutacak şekilde CPU
+max_perf_pct ve NVIDIA güç limitini sürekli ayarlayan PI(D) denetleyici.
+
+Çıkış bir "kısma oranı"dır (0 = tavan değer, 1 = taban değer). İntegral
+terimi doyumdayken hatayı büyütecek yönde birikmez (anti-windup).
+ThermalProtection seviyeleri sert güvenlik sınırı olarak kalır: seviye
+`backstop_level` ve üstünde sabit kısıtlamalar devreye girer.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Optional
+
+from src.utils.logger import get_logger
+
+log = get_logger("thermal_pid")
+
+
+@dataclass
+class PidConfig:
+    """PI(D) parametreleri (config: "thermal_pid")."""
+    enabled: bool = False
+    target_temp: float = 82.0      # °C — tutulacak sıcaklık
+    kp: float = 0.08               # 1/°C
+    ki: float = 0.02               # 1/(°C·s)
+    kd: float = 0.0                # s/°C — ölçüm türevi (varsayılan kapalı)
+    cpu_min_pct: int = 40          # CPU max_perf_pct tabanı
+    gpu_min_watts: int = 35        # NVIDIA güç limiti tabanı (donanım minimumu ile sınırlı)
+    cpu_step_pct: int = 2          # Bundan küçük değişiklikler yazılmaz
+    gpu_step_watts: int = 3
+    max_dt: float = 5.0            # Uzun boşluklarda integral sıçramasın
+    backstop_level: int = 3        # Bu seviye ve üstünde sabit kısıtlamalar
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "PidConfig":
+        """Ayar sözlüğünden oluştur; bilinmeyen anahtarlar yok sayılır."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in known})
+
+
+class PiController:
+    """Koşullu integrasyonlu (anti-windup) PI(D); çıkış [0, 1]."""
+
+    def __init__(self, config: PidConfig):
+        self._config = config
+        self._integral = 0.0
+        self._last_temp: Optional[float] = None
+        self._last_time: Optional[float] = None
+        self.output = 0.0
+
+    def reset(self):
+        self._integral = 0.0
+        self._last_temp = None
+        self._last_time = None
+        self.output = 0.0
+
+    def saturate(self):
+        """İntegrali tam kısma (çıkış 1) verecek değere ayarla."""
+        if self._config.ki > 0:
+            self._integral = 1.0 / self._config.ki
+        self._last_temp = None
+        self._last_time = None
+        self.output = 1.0
+
+    def update(self, temp: float, now: float) -> float:
+        """Yeni ölçümle çıkışı güncelle ve döndür."""
+        cfg = self._config
+        error = temp - cfg.target_temp
+        dt = 0.0
+        if self._last_time is not None:
+            dt = min(max(now - self._last_time, 0.0), cfg.max_dt)
+
+        derivative = 0.0
+        if dt > 0 and self._last_temp is not None:
+            derivative = (temp - self._last_temp) / dt
+
+        integral = self._integral + error * dt
+        raw = cfg.kp * error + cfg.ki * integral + cfg.kd * derivative
+        output = min(1.0, max(0.0, raw))
+
+        # Anti-windup: doyumda hatayı büyütecek yönde integrasyonu dondur
+        saturated_high = raw > 1.0 and error > 0
+        saturated_low = raw < 0.0 and error < 0
+        if not (saturated_high or saturated_low):
+            self._integral = integral
+
+        self._last_temp = temp
+        self._last_time = now
+        self.output = output
+        return output
+
+
+class PowerLimitController:
+    """CPU ve NVIDIA GPU için bağımsız iki PI döngüsü.
+
+    Tavan değerler (profilin ayarladığı max_perf_pct ve güç limiti) döngü
+    devreye girdiğinde okunur ve çıkış sıfıra döndüğünde geri yazılır.
+    `gpu_writer` (NvidiaLimitWorker) verilirse GPU limitleri bloklamadan
+    yazılır ve GPU tavanı yalnızca önbellekteki son durumdan okunur.
+    """
+
+    def __init__(self, cpu_controller, nvidia_controller, config: Optional[PidConfig] = None,
+                 gpu_writer=None):
+        self._cpu = cpu_controller
+        self._nvidia = nvidia_controller
+        self._gpu_writer = gpu_writer
+        self._set_gpu_limit = (gpu_writer or nvidia_controller).set_power_limit
+        self._config = config or PidConfig()
+        self._cpu_loop = PiController(self._config)
+        self._gpu_loop = PiController(self._config)
+
+        # Devreye girişte okunan tavanlar (None = döngü pasif)
+        self._cpu_ceiling: Optional[int] = None
+        self._gpu_ceiling: Optional[int] = None
+        self._gpu_floor = self._config.gpu_min_watts
+        self._cpu_applied: Optional[int] = None
+        self._gpu_applied: Optional[int] = None
+
+    @property
+    def config(self) -> PidConfig:
+        return self._config
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    @property
+    def engaged(self) -> bool:
+        """Döngülerden biri şu anda kısıtlama uyguluyor mu?"""
+        return self._cpu_ceiling is not None or self._gpu_ceiling is not None
+
+    @property
+    def cpu_ceiling(self) -> Optional[int]:
+        return self._cpu_ceiling
+
+    @property
+    def gpu_ceiling(self) -> Optional[int]:
+        return self._gpu_ceiling
+
+    def status(self) -> Dict[str, Any]:
+        """Dashboard/D-Bus için özet."""
+        return {
+            "target_temp": self._config.target_temp,
+            "cpu_output": round(self._cpu_loop.output, 3),
+            "gpu_output": round(self._gpu_loop.output, 3),
+            "cpu_max_perf_pct": self._cpu_applied,
+            "gpu_power_limit": self._gpu_applied,
+        }
+
+    def update(self, temps: Dict[str, float], now: float) -> str:
+        """Döngüleri bir adım ilerlet; yapılan değişikliğin özetini döndür."""
+        parts = []
+        cpu_temp = temps.get("cpu")
+        if cpu_temp and cpu_temp > 0:
+            pct = self._update_cpu(cpu_temp, now)
+            if pct is not None:
+                parts.append(f"CPU %{pct}")
+        if self._nvidia.available:
+            gpu_temp = temps.get("gpu_nvidia")
+            if gpu_temp and gpu_temp > 0:
+                watts = self._update_gpu(gpu_temp, now)
+                if watts is not None:
+                    parts.append(f"GPU {watts}W")
+        return ", ".join(parts)
+
+    def _update_cpu(self, temp: float, now: float) -> Optional[int]:
+        output = self._cpu_loop.update(temp, now)
+        if output <= 0.0:
+            if self._cpu_ceiling is not None:
+                self._cpu.set_max_perf_pct(self._cpu_ceiling)
+                log.info("PID: CPU kısıtlaması kalktı (max_perf_pct %d%%)", self._cpu_ceiling)
+                self._cpu_ceiling = None
+                self._cpu_applied = None
+            return None
+
+        if self._cpu_ceiling is None:
+            try:
+                self._cpu_ceiling = self._cpu.get_status().max_perf_pct or 100
+            except Exception:
+                self._cpu_ceiling = 100
+            self._cpu_applied = self._cpu_ceiling
+
+        floor = min(self._config.cpu_min_pct, self._cpu_ceiling)
+        pct = round(self._cpu_ceiling - output * (self._cpu_ceiling - floor))
+        if self._cpu_applied is None or abs(pct - self._cpu_applied) >= self._config.cpu_step_pct \
+                or pct == floor and self._cpu_applied != floor:
+            if self._cpu.set_max_perf_pct(pct):
+                self._cpu_applied = pct
+        return self._cpu_applied
+
+    def _update_gpu(self, temp: float, now: float) -> Optional[int]:
+        output = self._gpu_loop.update(temp, now)
+        if output <= 0.0:
+            if self._gpu_ceiling is not None:
+                self._set_gpu_limit(self._gpu_ceiling)
+                log.info("PID: GPU kısıtlaması kalktı (%dW)", self._gpu_ceiling)
+                self._gpu_ceiling = None
+                self._gpu_applied = None
+            return None
+
+        if self._gpu_ceiling is None:
+            try:
+                if self._gpu_writer is not None:
+                    st = self._nvidia.last_status
+                    if st is None or st.suspended:
+                        self._gpu_writer.refresh_status()  # Sonraki adımda hazır olur
+                        return None
+                else:
+                    st = self._nvidia.get_status()
+                self._gpu_ceiling = int(st.power_limit)
+                self._gpu_floor = max(int(st.power_min_limit), self._config.gpu_min_watts)
+            except Exception:
+                return None
+            self._gpu_applied = self._gpu_ceiling
+
+        floor = min(self._gpu_floor, self._gpu_ceiling)
+        watts = round(self._gpu_ceiling - output * (self._gpu_ceiling - floor))
+        if self._gpu_applied is None or abs(watts - self._gpu_applied) >= self._config.gpu_step_watts \
+                or watts == floor and self._gpu_applied != floor:
+            if self._set_gpu_limit(watts):
+                self._gpu_applied = watts
+        return self._gpu_applied
+
+    def suspend(self, cpu_ceiling: Optional[int] = None, gpu_ceiling: Optional[int] = None):
+        """Sert seviye devraldı: döngüleri tabana doyur (bumpless dönüş).
+
+        Sabit kısıtlamalar yazıldığı için son uygulanan değer geçersizdir;
+        döngü geri döndüğünde tabandan başlayıp kademeli olarak gevşer.
+        Döngü henüz devrede değilse tavanlar ThermalProtection'ın sakladığı
+        orijinal değerlerden alınır (kısıtlanmış değer tavan sanılmasın).
+        """
+        if self._cpu_ceiling is None and cpu_ceiling is not None:
+            self._cpu_ceiling = int(cpu_ceiling)
+        if self._gpu_ceiling is None and gpu_ceiling is not None:
+            self._gpu_ceiling = int(gpu_ceiling)
+            self._gpu_floor = self._config.gpu_min_watts
+        self._cpu_loop.saturate()
+        self._gpu_loop.saturate()
+        self.invalidate()
+
+    def invalidate(self):
+        """Değerler dışarıdan değişti; sonraki adımda yeniden yaz."""
+        self._cpu_applied = None
+        self._gpu_applied = None
+
+    def rebase(self):
+        """Tavanlar dışarıdan (profil/setter) değişti: sonraki adımda yeniden
+        okunur ve çıkış yeniden yazılır (döngü durumu korunur)."""
+        self._cpu_ceiling = None
+        self._gpu_ceiling = None
+        self.invalidate()
+
+    def release(self):
+        """Tüm kısıtlamaları kaldır ve tavanları geri yaz."""
+        if self._cpu_ceiling is not None:
+            self._cpu.set_max_perf_pct(self._cpu_ceiling)
+        if self._gpu_ceiling is not None and self._nvidia.available:
+            self._set_gpu_limit(self._gpu_ceiling)
+        self._cpu_ceiling = None
+        self._gpu_ceiling = None
+        self._cpu_applied = None
+        self._gpu_applied = None
+        self._cpu_loop.reset()
+        self._gpu_loop.reset()
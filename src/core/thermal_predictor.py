@@ -0,0 +1,112 @@
+"""
+Monster HW Controller - Thermal Predictor
+Sensör başına kısa bir zaman penceresinde sıcaklık eğimini (°C/s, en küçük
+kareler) tahmin eder ve `horizon_sec` saniye sonraki sıcaklığı öngörür.
+ThermalProtection, öngörülen sıcaklık bir seviye eşiğini geçtiğinde
+sensör/aktüatör gecikmesini telafi etmek için erken müdahale eder.
+
+Zaman damgaları dışarıdan verilebildiği için sentetik izlerle test edilebilir:
+
+    p = ThermalPredictor(PredictorConfig(horizon_sec=4))
+    for t, temp in enumerate([70, 72, 74, 76]):
+        p.observe({"cpu": temp}, now=float(t))
+    p.predict_hottest()   # -> Prediction(sensor="cpu", temp=76.0, slope=2.0, projected=84.0)
+"""
+
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+log = get_logger("thermal_predictor")
+
+
+@dataclass
+class PredictorConfig:
+    """Öngörü parametreleri (config: "thermal_prediction")."""
+    enabled: bool = True
+    window_sec: float = 6.0        # Eğim için kullanılan geçmiş
+    horizon_sec: float = 4.0       # Ne kadar ileri bakılacak
+    min_samples: int = 3           # Eğim hesaplamak için en az örnek
+    min_slope: float = 0.3         # °C/s — bunun altındaki artışlar yok sayılır
+    max_level: int = 3             # Öngörü en fazla bu seviyeye yükseltir (4 = yalnızca gerçek)
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "PredictorConfig":
+        """Ayar sözlüğünden oluştur; bilinmeyen anahtarlar yok sayılır."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in known})
+
+
+@dataclass
+class Prediction:
+    """Bir sensör için öngörü."""
+    sensor: str
+    temp: float          # Son ölçülen
+    slope: float         # °C/s
+    projected: float     # horizon_sec sonrası
+
+
+class ThermalPredictor:
+    """Sensör başına kayan pencere ve doğrusal regresyon ile eğim tahmini."""
+
+    def __init__(self, config: Optional[PredictorConfig] = None):
+        self._config = config or PredictorConfig()
+        self._windows: Dict[str, Deque[Tuple[float, float]]] = {}
+
+    @property
+    def config(self) -> PredictorConfig:
+        return self._config
+
+    def reset(self):
+        self._windows.clear()
+
+    def observe(self, temps: Dict[str, float], now: float):
+        """Yeni ölçümleri pencereye ekle. Geçersiz (≤0) okuma pencereyi sıfırlar."""
+        horizon_start = now - self._config.window_sec
+        for sensor, temp in temps.items():
+            if temp is None or temp <= 0:
+                self._windows.pop(sensor, None)
+                continue
+            window = self._windows.setdefault(sensor, deque())
+            window.append((now, float(temp)))
+            while window and window[0][0] < horizon_start:
+                window.popleft()
+
+    @staticmethod
+    def _slope(window: Deque[Tuple[float, float]]) -> float:
+        """En küçük kareler eğimi (°C/s)."""
+        n = len(window)
+        mean_t = sum(t for t, _ in window) / n
+        mean_y = sum(y for _, y in window) / n
+        var_t = sum((t - mean_t) ** 2 for t, _ in window)
+        if var_t <= 0:
+            return 0.0
+        cov = sum((t - mean_t) * (y - mean_y) for t, y in window)
+        return cov / var_t
+
+    def predict(self, sensor: str) -> Optional[Prediction]:
+        """Sensör için öngörü; yeterli örnek yoksa None."""
+        window = self._windows.get(sensor)
+        if not window or len(window) < self._config.min_samples:
+            return None
+        slope = self._slope(window)
+        temp = window[-1][1]
+        projected = temp
+        if slope >= self._config.min_slope:
+            projected = temp + slope * self._config.horizon_sec
+        return Prediction(sensor=sensor, temp=temp, slope=slope, projected=projected)
+
+    def predict_hottest(self) -> Optional[Prediction]:
+        """Öngörülen sıcaklığı en yüksek olan yükselen sensör (yoksa None)."""
+        if not self._config.enabled:
+            return None
+        best: Optional[Prediction] = None
+        for sensor in self._windows:
+            pred = self.predict(sensor)
+            if pred is None or pred.projected <= pred.temp:
+                continue
+            if best is None or pred.projected > best.projected:
+                best = pred
+        return best
@@ -9,12 +9,27 @@ Koruma seviyeleri (her bileşen için bağımsız):
   Seviye 2 (≥80°C):  Agresif — fanlar %80, CPU max_perf_pct düşür
   Seviye 3 (≥84°C):  Kritik — fanlar %100, turbo kapat, GPU güç limiti düşür
   Seviye 4 (≥87°C):  ACİL — max_perf_pct=%40, GPU güç=%10W
+
+PID modunda ("thermal_pid.enabled") CPU/GPU güç sınırlarını kapalı döngü
+denetleyici (thermal_pid.PowerLimitController) sürekli ayarlar; seviye
+1-2 yalnızca fanları yönetir, `backstop_level` ve üstü sabit kısıtlamalar
+sert güvenlik sınırı olarak aynen kalır.
+
+Eylemler yalnızca seviye değiştiğinde uygulanır (aynı seviyede her turda
+sysfs/EC yazılmaz). Profil veya setter ayarları dışarıdan değiştirdiğinde
+çağıran invalidate() ile bildirir: etkin seviye bir sonraki turda yeniden
+uygulanır. GPU güç limiti nvidia-smi/NVML gerektirdiğinden
+NvidiaLimitWorker üzerinden bloklamadan yazılır; çağıran döngü yalnızca
+sıcaklık okur ve EC/sysfs'e yazar.
 """
 
 import time
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 
+from src.core.nvidia_worker import NvidiaLimitWorker
+from src.core.thermal_pid import PidConfig, PowerLimitController
+from src.core.thermal_predictor import PredictorConfig, ThermalPredictor
 from src.utils.logger import get_logger
 
 log = get_logger("thermal_protection")
@@ -31,6 +46,22 @@ TEMP_LEVEL_4 = 87   # ACİL — maksimum kısıtlama
 # Histerez: Seviye düşüşü için sıcaklık farkı
 HYSTERESIS_DEG = 2.0
 
+# Müdahale öncesi GPU güç limiti bilinmiyorsa geri yüklenecek değer (W)
+DEFAULT_GPU_POWER = 90
+
+
+def level_for_temp(temp: float) -> int:
+    """Sıcaklığın karşılık geldiği koruma seviyesi (histerezsiz)."""
+    if temp >= TEMP_LEVEL_4:
+        return 4
+    if temp >= TEMP_LEVEL_3:
+        return 3
+    if temp >= TEMP_LEVEL_2:
+        return 2
+    if temp >= TEMP_LEVEL_1:
+        return 1
+    return 0
+
 
 @dataclass
 class ThermalState:
@@ -40,6 +71,8 @@ class ThermalState:
     hottest_sensor: str = ""
     hottest_temp: float = 0.0
     action_taken: str = ""
+    predicted: bool = False        # Seviye öngörü ile yükseltildi
+    predicted_temp: float = 0.0    # Öngörülen en yüksek sıcaklık
 
 
 class ThermalProtection:
@@ -49,7 +82,8 @@ class ThermalProtection:
     Hiçbir profil veya kullanıcı eylemi bu korumayı devre dışı bırakamaz.
     """
 
-    def __init__(self, cpu_controller, nvidia_controller, fan_controller):
+    def __init__(self, cpu_controller, nvidia_controller, fan_controller,
+                 prediction: Optional[Dict] = None, pid: Optional[Dict] = None):
         self._cpu = cpu_controller
         self._nvidia = nvidia_controller
         self._fan = fan_controller
@@ -64,6 +98,24 @@ class ThermalProtection:
         self._original_gpu_power: Optional[float] = None
 
         self._enabled = True  # Her zaman True — devre dışı bırakılamaz
+        self._fans_held = False  # Watchdog failsafe fanları %100'de tutuyor
+        self._level_action = ""  # Son uygulanan seviye eyleminin özeti
+        self._reapply = False    # Seviye değişmese de eylemi bir kez yeniden uygula
+        self._external_change = False  # Ayarlar dışarıdan değişti (bkz. invalidate)
+        self._gpu_worker = NvidiaLimitWorker(nvidia_controller)
+
+        # Opsiyonel olay kaydedici ve ek örnek (frekans, fan, GPU güç) sağlayıcısı
+        self._recorder = None
+        self._sample_provider: Optional[Callable[[], Dict[str, float]]] = None
+
+        # Eğim tabanlı öngörü: eşik geçilmeden önce erken müdahale
+        self._predictor = ThermalPredictor(PredictorConfig.from_dict(prediction))
+
+        # Kapalı döngü güç denetimi (opsiyonel); seviyeler güvenlik sınırı olarak kalır
+        self._pid = PowerLimitController(cpu_controller, nvidia_controller,
+                                         PidConfig.from_dict(pid), self._gpu_worker)
+        if self._pid.enabled:
+            log.info("PID güç denetimi aktif — hedef: %.0f°C", self._pid.config.target_temp)
 
         log.info("Termal koruma sistemi aktif — sert limit: %d°C", TEMP_ABSOLUTE_MAX)
 
@@ -76,11 +128,48 @@ class ThermalProtection:
         """Koruma şu anda müdahale mi ediyor?"""
         return self._state.level > 0
 
-    def check(self, temps: Dict[str, float]) -> ThermalState:
+    @property
+    def predictor(self) -> ThermalPredictor:
+        return self._predictor
+
+    @property
+    def pid(self) -> PowerLimitController:
+        return self._pid
+
+    @property
+    def gpu_worker(self) -> NvidiaLimitWorker:
+        return self._gpu_worker
+
+    def attach_recorder(self, recorder,
+                        sample_provider: Optional[Callable[[], Dict[str, float]]] = None):
+        """Her check() örneğini kaydediciye ilet; seviye değişimlerinde tetikle."""
+        self._recorder = recorder
+        self._sample_provider = sample_provider
+
+    def hold_fans(self, held: bool):
+        """Fanlar dışarıdan (failsafe) tam hızda tutuluyorsa seviyeler fanlara dokunmaz."""
+        if self._fans_held and not held:
+            self._reapply = True  # Seviyenin fan ayarı bir sonraki turda geri yazılsın
+        self._fans_held = held
+
+    def invalidate(self):
+        """Ayarlar dışarıdan (profil, D-Bus/GUI setter) değişti.
+
+        Herhangi bir thread'den çağrılabilir; işlem bir sonraki check()'te
+        yapılır: müdahale sürüyorsa yeni değerler geri yüklenecek orijinal
+        durum olarak saklanır ve seviye eylemi yeniden uygulanır, PID
+        tavanları yeniden okunur.
+        """
+        self._external_change = True
+        if self._last_level > 0:
+            self._gpu_worker.refresh_status()  # Yeni GPU limiti last_status'a yansısın
+
+    def check(self, temps: Dict[str, float], now: Optional[float] = None) -> ThermalState:
         """Tüm sıcaklıkları kontrol et ve gerekirse önlem al.
 
         Args:
             temps: {"cpu": 82.0, "gpu_nvidia": 75.0, "pch": 60.0, ...}
+            now:   Ölçüm zamanı (monotonic, s); sentetik izler için verilebilir
 
         Returns:
             ThermalState — mevcut koruma durumu
@@ -97,16 +186,7 @@ class ThermalProtection:
                 hottest_sensor = sensor
 
         # Seviye belirle (yükseliş anında normal eşikler, düşüşte histerez)
-        if hottest_temp >= TEMP_LEVEL_4:
-            level = 4
-        elif hottest_temp >= TEMP_LEVEL_3:
-            level = 3
-        elif hottest_temp >= TEMP_LEVEL_2:
-            level = 2
-        elif hottest_temp >= TEMP_LEVEL_1:
-            level = 1
-        else:
-            level = 0
+        level = level_for_temp(hottest_temp)
 
         # Histerez: Seviye düşüşünde, sıcaklık bir alt seviyenin eşiğinden
         # HYSTERESIS_DEG kadar düşmedikçe seviye düşürülmez
@@ -116,6 +196,26 @@ class ThermalProtection:
             if hottest_temp > current_threshold - HYSTERESIS_DEG:
                 level = self._last_level  # Henüz yeterince soğumadı
 
+        # Öngörü: eğim sürerse horizon_sec içinde geçilecek eşik için erken önlem
+        if now is None:
+            now = time.monotonic()
+        self._predictor.observe(temps, now)
+        prediction = self._predictor.predict_hottest()
+        predicted = False
+        if prediction is not None:
+            predicted_level = min(level_for_temp(prediction.projected),
+                                  self._predictor.config.max_level)
+            if predicted_level > level:
+                if predicted_level > self._last_level:
+                    log.warning(
+                        "TERMAL ÖNGÖRÜ: %s %.1f°C, %+.2f°C/s → %.0fs içinde %.1f°C (seviye %d)",
+                        prediction.sensor, prediction.temp, prediction.slope,
+                        self._predictor.config.horizon_sec, prediction.projected,
+                        predicted_level,
+                    )
+                level = predicted_level
+                predicted = True
+
         # Seviye değişimi logla
         if level != self._last_level:
             if level > self._last_level:
@@ -129,18 +229,40 @@ class ThermalProtection:
                     self._last_level, level, hottest_sensor, hottest_temp,
                 )
 
+        # Dışarıdan yazılan değerler koruma eylemlerini geri almış olabilir
+        if self._external_change:
+            self._external_change = False
+            self._pid.rebase()
+            if self._last_level > 0:
+                # Müdahale bitince eski değil, yeni uygulanan ayarlara dönülsün
+                self._save_original_state()
+                self._reapply = True
+
         # Orijinal değerleri kaydet (ilk yükseliş anında)
         if level > 0 and self._last_level == 0:
             self._save_original_state()
 
-        # Eylemi uygula
-        action = self._apply_level(level, hottest_sensor, hottest_temp)
+        # Eylemi yalnızca seviye değiştiğinde uygula (her turda sysfs/EC/GPU yazma)
+        if level != self._last_level or self._reapply:
+            self._reapply = False
+            self._level_action = self._apply_level(level, hottest_sensor, hottest_temp)
+        action = self._level_action
+
+        # PID: sert seviyenin altında güç sınırlarını sürekli ayarla
+        if self._pid.enabled:
+            if level >= self._pid.config.backstop_level:
+                self._pid.suspend(self._original_max_perf_pct, self._original_gpu_power)
+            else:
+                pid_action = self._pid.update(temps, now)
+                if pid_action:
+                    action = f"{action}, PID: {pid_action}" if action else f"PID: {pid_action}"
 
         # Seviye 0'a düştüyse orijinal durumu geri yükle
         if level == 0 and self._last_level > 0:
             self._restore_original_state()
             action = "Normal — koruma kalkıyor"
 
+        previous_level = self._last_level
         self._last_level = level
         self._state = ThermalState(
             active=level > 0,
@@ -148,9 +270,27 @@ class ThermalProtection:
             hottest_sensor=hottest_sensor,
             hottest_temp=hottest_temp,
             action_taken=action,
+            predicted=predicted,
+            predicted_temp=prediction.projected if prediction else hottest_temp,
         )
+        if self._recorder is not None:
+            self._record_sample(now, temps, previous_level)
         return self._state
 
+    def _record_sample(self, now: float, temps: Dict[str, float], previous_level: int):
+        s = self._state
+        if s.level != previous_level:
+            self._recorder.trigger(now, previous_level, s.level, s.hottest_sensor, s.hottest_temp)
+        values = dict(temps)
+        values["level"] = s.level
+        values["predicted_temp"] = s.predicted_temp
+        if self._sample_provider is not None:
+            try:
+                values.update(self._sample_provider())
+            except Exception as e:
+                log.debug("Kayıt örneği alınamadı: %s", e)
+        self._recorder.record(now, values, s.action_taken)
+
     def _save_original_state(self):
         """Müdahale öncesi ayarları sakla."""
         try:
@@ -161,12 +301,20 @@ class ThermalProtection:
             self._original_max_perf_pct = 100
             self._original_turbo = True
 
-        try:
-            if self._nvidia.available:
-                nv_st = self._nvidia.get_status()
+        # nvidia-smi çağrılmaz: son bilinen durum kullanılır
+        if self._nvidia.available:
+            nv_st = self._nvidia.last_status
+            if nv_st is not None:
                 self._original_gpu_power = nv_st.power_limit
-        except Exception:
-            self._original_gpu_power = 90
+            else:
+                self._original_gpu_power = DEFAULT_GPU_POWER
+                self._gpu_worker.refresh_status()
+
+        # PID zaten kısıyorsa okunan değerler değil, döngünün tavanları asıl değerdir
+        if self._pid.cpu_ceiling is not None:
+            self._original_max_perf_pct = self._pid.cpu_ceiling
+        if self._pid.gpu_ceiling is not None:
+            self._original_gpu_power = self._pid.gpu_ceiling
 
         log.info(
             "Orijinal durum kaydedildi — CPU perf: %s%%, turbo: %s, GPU: %sW",
@@ -178,13 +326,18 @@ class ThermalProtection:
     def _restore_original_state(self):
         """Müdahale öncesi ayarlara geri dön."""
         log.info("Orijinal durum geri yükleniyor...")
+        # PID hâlâ kısıyorsa güç sınırları döngüye kalır; bir sonraki adımda yazılır
+        pid_owns_limits = self._pid.enabled and self._pid.engaged
         try:
-            if self._original_max_perf_pct is not None:
+            if self._original_max_perf_pct is not None and not pid_owns_limits:
                 self._cpu.set_max_perf_pct(self._original_max_perf_pct)
             if self._original_turbo is not None:
                 self._cpu.set_turbo(self._original_turbo)
-            if self._original_gpu_power is not None and self._nvidia.available:
-                self._nvidia.set_power_limit(int(self._original_gpu_power))
+            if self._original_gpu_power is not None and self._nvidia.available \
+                    and not pid_owns_limits:
+                self._gpu_worker.set_power_limit(int(self._original_gpu_power))
+            if pid_owns_limits:
+                self._pid.invalidate()
         except Exception as e:
             log.error("Durum geri yükleme hatası: %s", e)
 
@@ -204,35 +357,35 @@ class ThermalProtection:
 
         # --- Seviye 1: Fan boost ---
         if level == 1:
-            if self._fan.available and self._fan.mode != "curve":
+            if self._fan.available and not self._fans_held and self._fan.mode != "curve":
                 self._fan.set_both_fans(60)
             return f"Fan boost (%60) — {sensor_label}: {temp:.0f}°C"
 
         # --- Seviye 2: Agresif soğutma + CPU kısıtlama ---
         if level == 2:
-            if self._fan.available:
+            if self._fan.available and not self._fans_held:
                 self._fan.set_both_fans(80)
+            if self._pid.enabled and level < self._pid.config.backstop_level:
+                return f"Fan %80 — {sensor_label}: {temp:.0f}°C"
             self._cpu.set_max_perf_pct(70)
             return f"Fan %80, CPU max %70 — {sensor_label}: {temp:.0f}°C"
 
         # --- Seviye 3: Kritik — turbo kapat, full fan, GPU kıs ---
         if level == 3:
-            if self._fan.available:
+            if self._fan.available and not self._fans_held:
                 self._fan.set_both_fans(100)
             self._cpu.set_turbo(False)
             self._cpu.set_max_perf_pct(55)
-            if self._nvidia.available:
-                self._nvidia.set_power_limit(45)
+            self._gpu_worker.set_power_limit(45)
             return f"ACİL: Fan %100, turbo OFF, CPU %55, GPU 45W — {sensor_label}: {temp:.0f}°C"
 
         # --- Seviye 4: EMERGENCY — maksimum kısıtlama ---
         if level >= 4:
-            if self._fan.available:
+            if self._fan.available and not self._fans_held:
                 self._fan.set_both_fans(100)
             self._cpu.set_turbo(False)
             self._cpu.set_max_perf_pct(40)
-            if self._nvidia.available:
-                self._nvidia.set_power_limit(10)
+            self._gpu_worker.set_power_limit(10)
             log.critical(
                 "!!! ACİL TERMAL KORUMA !!! %s: %.0f°C — 88°C LİMİTİNE YAKIN!",
                 sensor_label, temp,
@@ -249,4 +402,5 @@ class ThermalProtection:
 
         level_icons = {1: "⚠️", 2: "🔶", 3: "🔴", 4: "🚨"}
         icon = level_icons.get(s.level, "")
-        return f"{icon} Termal Koruma Seviye {s.level} — {s.action_taken}"
+        suffix = f" (öngörü {s.predicted_temp:.0f}°C)" if s.predicted else ""
+        return f"{icon} Termal Koruma Seviye {s.level}{suffix} — {s.action_taken}"
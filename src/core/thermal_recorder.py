@@ -0,0 +1,203 @@
+"""
+Monster HW Controller - Thermal Event Recorder
+Termal koruma seviyesi 2 veya üstüne çıktığında/değiştiğinde olay öncesi
+`pre_sec` ve sonrası `post_sec` saniyelik tam sensör görüntüsünü
+CONFIG_DIR/events altına CSV olarak yazan "uçuş kaydedici".
+
+Örnekler önceden ayrılmış sütun dizilerinden (array('d')) oluşan bir
+halka tamponda tutulur; tampon büyümez ve örnek başına liste/dict
+oluşturulmaz. Dosya
+yazımı ayrı bir thread'de yapılır, çağıran döngü beklemez.
+"""
+
+import array
+import csv
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.config import CONFIG_DIR
+from src.utils.logger import get_logger
+
+log = get_logger("thermal_recorder")
+
+EVENTS_DIR = CONFIG_DIR / "events"
+
+# Kaydedilen sayısal sütunlar (eksik değerler NaN, CSV'de boş)
+RECORD_FIELDS = (
+    "level", "cpu", "gpu_nvidia", "pch", "nvme", "predicted_temp",
+    "cpu_freq_avg_mhz", "cpu_freq_max_mhz", "cpu_max_perf_pct", "cpu_turbo",
+    "cpu_fan_duty", "cpu_fan_rpm", "gpu_fan_duty", "gpu_fan_rpm",
+    "nv_power_draw", "nv_power_limit", "nv_clock_gr",
+)
+
+# Bu seviye ve üstündeki değişimler kaydı tetikler
+TRIGGER_LEVEL = 2
+
+_NAN = float("nan")
+
+
+def sample_from_status(cpu_status=None, fan_status=None, nvidia_status=None) -> Dict[str, float]:
+    """CpuStatus/FanStatus/NvidiaStatus nesnelerinden kayıt sütunları."""
+    values: Dict[str, float] = {}
+    if cpu_status is not None:
+        freqs = cpu_status.cur_freqs_khz
+        if freqs:
+            values["cpu_freq_avg_mhz"] = sum(freqs) / len(freqs) / 1000
+            values["cpu_freq_max_mhz"] = max(freqs) / 1000
+        values["cpu_max_perf_pct"] = cpu_status.max_perf_pct
+        values["cpu_turbo"] = 1.0 if cpu_status.turbo_enabled else 0.0
+    if fan_status is not None and fan_status.ec_available:
+        values["cpu_fan_duty"] = fan_status.cpu_fan_duty_pct
+        values["cpu_fan_rpm"] = fan_status.cpu_fan_rpm
+        values["gpu_fan_duty"] = fan_status.gpu_fan_duty_pct
+        values["gpu_fan_rpm"] = fan_status.gpu_fan_rpm
+    if nvidia_status is not None and nvidia_status.available and not nvidia_status.suspended:
+        values["nv_power_draw"] = nvidia_status.power_draw
+        values["nv_power_limit"] = nvidia_status.power_limit
+        values["nv_clock_gr"] = nvidia_status.clock_graphics
+    return values
+
+
+class ThermalRecorder:
+    """Ön/son tetik pencereli halka tampon kaydedici (thread-safe)."""
+
+    def __init__(self, events_dir: Path = EVENTS_DIR, pre_sec: float = 60.0,
+                 post_sec: float = 30.0, capacity: int = 240, max_files: int = 50):
+        self._dir = Path(events_dir)
+        self._pre_sec = float(pre_sec)
+        self._post_sec = float(post_sec)
+        self._capacity = max(16, int(capacity))
+        self._max_files = max(1, int(max_files))
+        self._lock = threading.Lock()
+
+        # Önceden ayrılmış halka tampon: örnek i → sütun[i]
+        self._mono = array.array("d", [_NAN]) * self._capacity
+        self._wall = array.array("d", [_NAN]) * self._capacity
+        self._cols = {name: array.array("d", [_NAN]) * self._capacity for name in RECORD_FIELDS}
+        self._actions: List[str] = [""] * self._capacity
+        self._head = 0     # Bir sonraki yazılacak indeks
+        self._count = 0
+
+        # Açık yakalama: tetik zamanı, bitiş zamanı ve başlık
+        self._trigger_at: Optional[float] = None
+        self._trigger_wall = 0.0
+        self._capture_until = 0.0
+        self._trigger_desc = ""
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> Optional["ThermalRecorder"]:
+        """Ayar sözlüğünden oluştur; kapalıysa None."""
+        settings = settings or {}
+        if not settings.get("enabled", True):
+            return None
+        return cls(
+            pre_sec=settings.get("pre_sec", 60.0),
+            post_sec=settings.get("post_sec", 30.0),
+            capacity=settings.get("capacity", 240),
+            max_files=settings.get("max_files", 50),
+        )
+
+    @property
+    def capturing(self) -> bool:
+        return self._trigger_at is not None
+
+    def record(self, now: float, values: Dict[str, float], action: str = ""):
+        """Bir örnek ekle; açık yakalamanın süresi dolduysa dosyaya yaz."""
+        with self._lock:
+            i = self._head
+            self._mono[i] = now
+            self._wall[i] = time.time()
+            for name, col in self._cols.items():
+                value = values.get(name)
+                col[i] = _NAN if value is None else float(value)
+            self._actions[i] = action
+            self._head = (i + 1) % self._capacity
+            self._count = min(self._count + 1, self._capacity)
+
+            if self._trigger_at is None or now < self._capture_until:
+                return
+            rows, header = self._collect_locked()
+            self._trigger_at = None
+        self._write_async(rows, header)
+
+    def trigger(self, now: float, old_level: int, new_level: int,
+                sensor: str = "", temp: float = 0.0):
+        """Seviye değişimini bildir; TRIGGER_LEVEL ve üstüyse yakalama başlat/uzat."""
+        if max(old_level, new_level) < TRIGGER_LEVEL:
+            return
+        with self._lock:
+            desc = f"seviye {old_level}->{new_level} ({sensor} {temp:.1f}C)"
+            if self._trigger_at is None:
+                self._trigger_at = now
+                self._trigger_wall = time.time()
+                self._trigger_desc = desc
+                log.info("Termal olay kaydı başladı: %s", desc)
+            else:
+                self._trigger_desc += f"; {desc}"
+            # Olay sürüyorsa pencere son değişimden itibaren uzar
+            self._capture_until = now + self._post_sec
+
+    def flush(self):
+        """Açık yakalamayı beklemeden yaz (kapanışta)."""
+        with self._lock:
+            if self._trigger_at is None:
+                return
+            rows, header = self._collect_locked()
+            self._trigger_at = None
+        self._write(rows, header)
+
+    def _collect_locked(self):
+        """Tetikten pre_sec öncesinden bugüne kadar olan örnekleri sırayla topla."""
+        start = self._trigger_at - self._pre_sec
+        first = (self._head - self._count) % self._capacity
+        rows = []
+        for k in range(self._count):
+            i = (first + k) % self._capacity
+            if self._mono[i] < start:
+                continue
+            row = [f"{self._wall[i]:.3f}", f"{self._mono[i] - self._trigger_at:+.2f}"]
+            for col in self._cols.values():
+                value = col[i]
+                row.append("" if math.isnan(value) else f"{value:g}")
+            row.append(self._actions[i])
+            rows.append(row)
+        header = {
+            "trigger": self._trigger_desc,
+            "trigger_time": time.strftime("%Y-%m-%dT%H:%M:%S",
+                                          time.localtime(self._trigger_wall)),
+            "pre_sec": self._pre_sec,
+            "post_sec": self._post_sec,
+        }
+        return rows, header
+
+    def _write_async(self, rows, header):
+        threading.Thread(target=self._write, args=(rows, header), daemon=True,
+                         name="thermal-recorder").start()
+
+    def _write(self, rows, header):
+        try:
+            self._dir.mkdir(parents=True, exist_ok=True)
+            stamp = header["trigger_time"].replace(":", "").replace("-", "")
+            path = self._dir / f"thermal-{stamp}.csv"
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                for key, value in header.items():
+                    f.write(f"# {key}: {value}\n")
+                writer = csv.writer(f)
+                writer.writerow(("time", "rel_sec") + RECORD_FIELDS + ("action",))
+                writer.writerows(rows)
+            log.info("Termal olay kaydı yazıldı: %s (%d örnek)", path, len(rows))
+            self._prune()
+        except OSError as e:
+            log.error("Termal olay kaydı yazılamadı: %s", e)
+
+    def _prune(self):
+        """En eski kayıtları sil, en fazla max_files kalsın."""
+        files = sorted(self._dir.glob("thermal-*.csv"))
+        for old in files[:-self._max_files]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
@@ -137,6 +137,21 @@ INTROSPECTION_XML = f"""
     <method name="GetActiveProfile">
       <arg direction="out" type="s" name="name"/>
     </method>
+
+    <!-- Gecikme histogramları ve sayaçlar -->
+    <method name="GetMetrics">
+      <arg direction="out" type="s" name="json_data"/>
+    </method>
+
+    <!-- En çok CPU/GPU kullanan süreçler (CPU yüzdesi önceki çağrıya göre) -->
+    <method name="GetTopProcesses">
+      <arg direction="out" type="s" name="json_data"/>
+    </method>
+
+    <!-- Watchdog termal koruma durumu (watchdog kapalıysa yalnızca "watchdog": false) -->
+    <method name="GetThermalState">
+      <arg direction="out" type="s" name="json_data"/>
+    </method>
   </interface>
 </node>
 """
@@ -8,6 +8,7 @@ import json
 import os
 import signal
 import sys
+import threading
 from dataclasses import asdict
 from pathlib import Path
 
@@ -16,24 +17,76 @@ PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from src.core.auto_profile import AutoProfileEngine
 from src.core.cpu_controller import CpuController
 from src.core.ec_access import EcAccess
 from src.core.fan_controller import FanController, FanCurvePoint
 from src.core.gpu_intel import IntelGpuController
 from src.core.gpu_nvidia import NvidiaGpuController
+from src.core.hotplug import HotplugDiscovery
+from src.core.power_supply import PowerSupplyWatcher
+from src.core.process_sampler import ProcessSampler
 from src.core.profile_manager import ProfileManager
 from src.core.temp_monitor import TempMonitor
+from src.core.thermal_recorder import ThermalRecorder
 from src.daemon.dbus_interface import (
     DBUS_INTERFACE,
     DBUS_PATH,
     DBUS_SERVICE,
     INTROSPECTION_XML,
 )
-from src.utils.config import ConfigManager
+from src.daemon.metrics_exporter import MetricsExporter, TelemetrySampler
+from src.daemon.setter_coalescer import DEFAULT_MAX_RATE_HZ, SetterCoalescer
+from src.daemon.thermal_watchdog import ThermalWatchdog
+from src.utils.config import DEFAULT_SETTINGS, ConfigManager
 from src.utils.logger import get_logger, setup_logger
+from src.utils.metrics import STAGE_DBUS_CALL, get_metrics
+from src.utils.uevent import get_uevent_monitor
 
 log = get_logger("hw_daemon")
 
+# Güvenlik: D-Bus üzerinden yalnızca bu metotlar çağrılabilir
+ALLOWED_METHODS = frozenset({
+    "GetTemperatures", "GetCpuStatus", "SetCpuGovernor",
+    "SetCpuEpp", "SetCpuTurbo", "SetCpuMaxPerfPct",
+    "SetCpuMinPerfPct", "SetCpuFreqRange",
+    "GetNvidiaStatus", "SetNvidiaPowerLimit",
+    "SetNvidiaGpuClocks", "ResetNvidiaClocks",
+    "GetIntelGpuStatus", "SetIntelGpuFreqRange",
+    "GetFanStatus", "SetFanAutoMode", "SetFanManualMode",
+    "SetCpuFan", "SetGpuFan", "SetFanCurve", "StartFanCurve",
+    "ListProfiles", "GetProfile", "ApplyProfile",
+    "SaveProfile", "DeleteProfile",
+    "CreateProfileFromCurrent", "GetActiveProfile",
+    "GetMetrics", "GetTopProcesses", "GetThermalState",
+})
+
+# Donanım ayarı yazan metotlar (termal koruma sonrasında yeniden uygulanır)
+MUTATING_PREFIXES = ("Set", "Reset", "Start")
+
+# Sürükleme sırasında hızlı tekrarlanan setter'lar → yazdıkları donanım hedefi.
+# Aynı hedefteki çağrılar tek işçide gönderim sırasıyla uygulanır; art arda
+# gelen aynı metot en son değere birleştirilir.
+COALESCED_METHODS = {
+    "SetCpuMaxPerfPct": "cpu_pstate",
+    "SetCpuMinPerfPct": "cpu_pstate",
+    "SetCpuFreqRange": "cpu_pstate",
+    "SetNvidiaPowerLimit": "nvidia_pl",
+    "SetNvidiaGpuClocks": "nvidia_clocks",
+    "SetIntelGpuFreqRange": "igpu_freq",
+    "SetFanManualMode": "fan",
+    "SetCpuFan": "fan",
+    "SetGpuFan": "fan",
+}
+
+# Birleştirilmeyen ama aynı hedefin bekleyen yazmalarının arkasına sıralanan
+# setter'lar (ör. sürüklemeden hemen sonra seçilen otomatik fan modu)
+ORDERED_METHODS = {
+    "SetFanAutoMode": "fan",
+    "StartFanCurve": "fan",
+    "ResetNvidiaClocks": "nvidia_clocks",
+}
+
 
 class HwControllerService:
     """D-Bus üzerinden donanım kontrol servisi."""
@@ -44,7 +97,7 @@ class HwControllerService:
 
         # Core bileşenler
         self._config = ConfigManager()
-        self._temp_monitor = TempMonitor()
+        self._temp_monitor = TempMonitor(self._config.get("sensor_map"))
         self._cpu = CpuController()
         self._nvidia = NvidiaGpuController()
         self._igpu = IntelGpuController()
@@ -53,33 +106,173 @@ class HwControllerService:
         self._profile_manager = ProfileManager(
             self._config, self._cpu, self._nvidia, self._igpu, self._fan
         )
+        self._metrics = get_metrics()
+        self._coalescer = SetterCoalescer(
+            self._dispatch_setter,
+            self._config.get("setter_max_rate_hz", DEFAULT_MAX_RATE_HZ),
+        )
+
+        proc_settings = self._config.get("process_sampler") or {}
+        self._proc_sampler = ProcessSampler(
+            self._nvidia, top_n=proc_settings.get("top_n", 5),
+            gpu_interval=proc_settings.get("gpu_interval_sec", 5.0),
+        )
+
+        # D-Bus ve otomatik profil motoru profilleri aynı anda uygulamasın
+        self._profile_lock = threading.Lock()
+        self._auto_profile = AutoProfileEngine.from_settings(
+            self._config.get("auto_profile") or {},
+            self._apply_profile_locked,
+            lambda: self._profile_manager.active_profile,
+        )
+        self._power_watcher = self._create_power_watcher()
+        self._hotplug = HotplugDiscovery(self._temp_monitor, self._igpu, get_uevent_monitor())
+
+        self._watchdog = self._create_watchdog()
+        self._exporter = self._create_exporter()
 
         log.info("Daemon bileşenleri hazır. EC: %s, NVIDIA: %s, iGPU: %s",
                  self._ec.available, self._nvidia.available, self._igpu.available)
 
+    def _create_watchdog(self):
+        """GUI'den bağımsız termal koruma döngüsünü oluştur."""
+        settings = dict(DEFAULT_SETTINGS["thermal_watchdog"])
+        settings.update(self._config.get("thermal_watchdog") or {})
+        if not settings.get("enabled"):
+            log.warning("Termal watchdog ayarlardan kapatılmış — koruma yalnızca GUI açıkken çalışır")
+            return None
+        self._temp_monitor.read_all()  # Cache'ten gelen sensör yollarını doğrula
+        return ThermalWatchdog(
+            self._temp_monitor, self._cpu, self._nvidia, self._fan,
+            interval=settings.get("interval_sec", 1.0),
+            deadline=settings.get("deadline_ms", 500) / 1000.0,
+            prediction=self._config.get("thermal_prediction"),
+            pid=self._config.get("thermal_pid"),
+            curve_temp_callback=self._get_cpu_temp,
+            recorder=ThermalRecorder.from_settings(self._config.get("thermal_recorder")),
+            rescan_callback=self._hotplug.request_rescan,
+        )
+
+    def _create_power_watcher(self):
+        """AC/pil değişiminde profil uygulayan uevent izleyicisini oluştur."""
+        settings = dict(DEFAULT_SETTINGS["power_profiles"])
+        settings.update(self._config.get("power_profiles") or {})
+        if not settings.get("enabled") and self._auto_profile is None:
+            return None
+        return PowerSupplyWatcher(
+            lambda online: self._on_power_change(online, settings),
+            monitor=get_uevent_monitor(),
+            poll_interval=settings.get("poll_interval_sec", 30.0),
+        )
+
+    def _on_power_change(self, online: bool, settings: dict):
+        """Uevent thread'inden çağrılır: AC ise ac_profile, pilde battery_profile."""
+        if self._auto_profile is not None:
+            # Kurallar motorun kendi turunda (debounce/dwell ile) yeniden değerlendirilir
+            self._auto_profile.set_ac_online(online)
+        if not settings.get("enabled"):
+            return
+        name = settings.get("ac_profile" if online else "battery_profile")
+        if name and name != self._profile_manager.active_profile:
+            log.info("Güç kaynağı değişti, profil uygulanıyor: %s", name)
+            self._apply_profile_locked(name)
+
+    def _create_exporter(self):
+        """Ayarlarda etkinse OpenMetrics exporter'ı oluştur."""
+        settings = dict(DEFAULT_SETTINGS["metrics_exporter"])
+        settings.update(self._config.get("metrics_exporter") or {})
+        if not settings.get("enabled"):
+            return None
+        sampler = TelemetrySampler(
+            self._temp_monitor, self._cpu, self._nvidia, self._fan,
+            self._profile_manager, interval=settings.get("interval_sec", 5.0),
+            thermal=self._watchdog.thermal if self._watchdog else None,
+            process_sampler=self._proc_sampler,
+        )
+        return MetricsExporter(sampler, settings.get("unix_socket", ""),
+                               int(settings.get("port", 0)))
+
+    def start_background(self):
+        """Mainloop'tan bağımsız arka plan bileşenlerini başlat."""
+        if self._watchdog is not None:
+            self._watchdog.start()
+        if self._exporter is not None:
+            self._exporter.start()
+        if self._auto_profile is not None:
+            self._auto_profile.start()
+        if self._power_watcher is not None:
+            self._power_watcher.start()
+        self._hotplug.start()
+
+    def stop_background(self):
+        if self._power_watcher is not None:
+            self._power_watcher.stop()
+        get_uevent_monitor().stop()
+        if self._auto_profile is not None:
+            self._auto_profile.stop()
+        if self._exporter is not None:
+            self._exporter.stop()
+        if self._watchdog is not None:
+            self._watchdog.stop()
+
+    def _apply_profile_locked(self, name: str) -> bool:
+        with self._profile_lock:
+            try:
+                return self._profile_manager.apply_profile(name, self._get_cpu_temp)
+            finally:
+                self._invalidate_thermal()
+
+    def _invalidate_thermal(self):
+        """Profil/setter donanım ayarlarını değiştirdi: watchdog korumayı yeniden uygulasın."""
+        if self._watchdog is not None:
+            self._watchdog.thermal.invalidate()
+
     def _get_cpu_temp(self) -> float:
         """Fan eğrisi için CPU sıcaklığı callback'i."""
         reading = self._temp_monitor.read_all()
         return reading.cpu_package
 
+    def dispatch(self, method_name: str, args) -> object:
+        """Beyaz listedeki bir metodu senkron çağır (GVariant dönüşümü hariç)."""
+        if method_name not in ALLOWED_METHODS:
+            raise ValueError(f"Bilinmeyen veya yasaklı metot: {method_name}")
+        with self._metrics.time(STAGE_DBUS_CALL):
+            try:
+                return getattr(self, method_name)(*args)
+            finally:
+                if method_name.startswith(MUTATING_PREFIXES):
+                    self._invalidate_thermal()
+
+    def submit_setter(self, method_name: str, args: tuple, on_done):
+        """Setter çağrısını hedefinin kuyruğu üzerinden uygula (bloklamaz)."""
+        merge = method_name in COALESCED_METHODS
+        target = COALESCED_METHODS[method_name] if merge else ORDERED_METHODS[method_name]
+        self._coalescer.submit(target, method_name, tuple(args), on_done, merge)
+
+    def _dispatch_setter(self, method_name: str, args: tuple) -> object:
+        # Birleştirici işçisinden: profil uygulamasıyla araya girmesin
+        with self._profile_lock:
+            return self.dispatch(method_name, args)
+
     # --- D-Bus method implementations ---
 
     def GetTemperatures(self) -> str:
         reading = self._temp_monitor.read_all()
         data = {
             "cpu_package": reading.cpu_package,
-            "cpu_cores": reading.cpu_cores,
+            "cpu_cores": reading.cpu_cores.tolist(),
             "gpu_nvidia": reading.gpu_nvidia,
             "pch": reading.pch,
             "nvme": reading.nvme,
             "wifi": reading.wifi,
-            "acpi": reading.acpi,
+            "gpu_amd": reading.gpu_amd,
+            "acpi": reading.acpi.tolist(),
         }
         return json.dumps(data)
 
     def GetCpuStatus(self) -> str:
         status = self._cpu.get_status()
-        return json.dumps(asdict(status))
+        return json.dumps(status.to_dict())
 
     def SetCpuGovernor(self, governor: str) -> bool:
         return self._cpu.set_governor(governor)
@@ -101,7 +294,9 @@ class HwControllerService:
 
     def GetNvidiaStatus(self) -> str:
         status = self._nvidia.get_status()
-        return json.dumps(asdict(status))
+        # Watchdog nvidia-smi çağırmaz; GPU sıcaklığını buradan beslenir
+        self._temp_monitor.set_nvidia_temp(0.0 if status.suspended else status.temp)
+        return json.dumps(status.to_dict())
 
     def SetNvidiaPowerLimit(self, watts: int) -> bool:
         return self._nvidia.set_power_limit(watts)
@@ -114,14 +309,14 @@ class HwControllerService:
 
     def GetIntelGpuStatus(self) -> str:
         status = self._igpu.get_status()
-        return json.dumps(asdict(status))
+        return json.dumps(status.to_dict())
 
     def SetIntelGpuFreqRange(self, min_mhz: int, max_mhz: int) -> bool:
         return self._igpu.set_freq_range(min_mhz, max_mhz)
 
     def GetFanStatus(self) -> str:
         status = self._fan.get_status()
-        return json.dumps(asdict(status))
+        return json.dumps(status.to_dict())
 
     def SetFanAutoMode(self) -> bool:
         return self._fan.set_auto_mode()
@@ -146,8 +341,7 @@ class HwControllerService:
             return False
 
     def StartFanCurve(self) -> bool:
-        self._fan.start_auto_curve(self._get_cpu_temp)
-        return True
+        return self._fan.start_auto_curve(self._get_cpu_temp)
 
     def ListProfiles(self) -> str:
         profiles = self._profile_manager.list_profiles()
@@ -158,7 +352,7 @@ class HwControllerService:
         return json.dumps(profile) if profile else "{}"
 
     def ApplyProfile(self, name: str) -> bool:
-        return self._profile_manager.apply_profile(name, self._get_cpu_temp)
+        return self._apply_profile_locked(name)
 
     def SaveProfile(self, name: str, json_data: str) -> bool:
         try:
@@ -178,6 +372,23 @@ class HwControllerService:
     def GetActiveProfile(self) -> str:
         return self._profile_manager.active_profile or ""
 
+    # --- Metrikler ---
+
+    def GetMetrics(self) -> str:
+        return json.dumps(self._metrics.snapshot())
+
+    def GetTopProcesses(self) -> str:
+        # İstemci (panel) görünürken periyodik çağırır; ilk çağrıda CPU listesi boştur
+        return json.dumps(self._proc_sampler.sample().to_dict())
+
+    def GetThermalState(self) -> str:
+        # GUI watchdog çalışıyorsa kendi korumasını kapatıp bu durumu gösterir
+        if self._watchdog is None:
+            return json.dumps({"watchdog": False})
+        state = asdict(self._watchdog.thermal.state)
+        state.update(watchdog=True, failsafe=self._watchdog.failsafe_active)
+        return json.dumps(state)
+
 
 def run_daemon():
     """Daemon'u GLib mainloop ile başlat."""
@@ -192,6 +403,7 @@ def run_daemon():
         sys.exit(1)
 
     service = HwControllerService()
+    service.start_background()
     loop = GLib.MainLoop()
 
     def on_bus_acquired(connection, name):
@@ -200,24 +412,29 @@ def run_daemon():
         node_info = Gio.DBusNodeInfo.new_for_xml(INTROSPECTION_XML)
         interface_info = node_info.interfaces[0]
 
+        def return_result(invocation, method_name, result):
+            """Metot sonucunu GVariant olarak paketleyip çağırana döndür."""
+            if isinstance(result, Exception):
+                log.error("D-Bus metot hatası (%s): %s", method_name, result)
+                invocation.return_error_literal(
+                    Gio.dbus_error_quark(), Gio.DBusError.FAILED, str(result)
+                )
+                return
+
+            if isinstance(result, bool):
+                ret = GLib.Variant("(b)", (result,))
+            elif isinstance(result, str):
+                ret = GLib.Variant("(s)", (result,))
+            elif isinstance(result, int):
+                ret = GLib.Variant("(i)", (result,))
+            else:
+                ret = GLib.Variant("(s)", (str(result),))
+
+            invocation.return_value(ret)
+
         def on_method_call(connection, sender, object_path, interface_name,
                           method_name, parameters, invocation):
             """D-Bus metot çağrılarını işle (güvenlik beyaz listesi ile)."""
-            # Güvenlik: Sadece izin verilen metotlar çağrılabilir
-            ALLOWED_METHODS = {
-                "GetTemperatures", "GetCpuStatus", "SetCpuGovernor",
-                "SetCpuEpp", "SetCpuTurbo", "SetCpuMaxPerfPct",
-                "SetCpuMinPerfPct", "SetCpuFreqRange",
-                "GetNvidiaStatus", "SetNvidiaPowerLimit",
-                "SetNvidiaGpuClocks", "ResetNvidiaClocks",
-                "GetIntelGpuStatus", "SetIntelGpuFreqRange",
-                "GetFanStatus", "SetFanAutoMode", "SetFanManualMode",
-                "SetCpuFan", "SetGpuFan", "SetFanCurve", "StartFanCurve",
-                "ListProfiles", "GetProfile", "ApplyProfile",
-                "SaveProfile", "DeleteProfile",
-                "CreateProfileFromCurrent", "GetActiveProfile",
-            }
-
             try:
                 if method_name not in ALLOWED_METHODS:
                     log.warning("Reddedilen D-Bus çağrısı: %s (gönderen: %s)",
@@ -228,8 +445,6 @@ def run_daemon():
                     )
                     return
 
-                method = getattr(service, method_name)
-
                 # Parametreleri unpack et
                 args = []
                 if parameters:
@@ -246,19 +461,15 @@ def run_daemon():
                         elif vtype == "d":
                             args.append(child.get_double())
 
-                result = method(*args)
-
-                # Sonucu GVariant olarak paketle
-                if isinstance(result, bool):
-                    ret = GLib.Variant("(b)", (result,))
-                elif isinstance(result, str):
-                    ret = GLib.Variant("(s)", (result,))
-                elif isinstance(result, int):
-                    ret = GLib.Variant("(i)", (result,))
-                else:
-                    ret = GLib.Variant("(s)", (str(result),))
+                if method_name in COALESCED_METHODS or method_name in ORDERED_METHODS:
+                    # Sonuç, birleştirilen yazma uygulandığında döner
+                    service.submit_setter(
+                        method_name, args,
+                        lambda result: return_result(invocation, method_name, result),
+                    )
+                    return
 
-                invocation.return_value(ret)
+                return_result(invocation, method_name, service.dispatch(method_name, args))
 
             except Exception as e:
                 log.error("D-Bus metot hatası (%s): %s", method_name, e)
@@ -293,6 +504,7 @@ def run_daemon():
     # SIGTERM/SIGINT ile düzgün kapatma
     def shutdown(signum, frame):
         log.info("Daemon kapatılıyor (sinyal: %d)...", signum)
+        service.stop_background()  # Watchdog önce dursun, fanlara yazmasın
         service._fan.set_auto_mode()  # Kapanırken fanları otomatiğe al
         loop.quit()
 
@@ -303,6 +515,7 @@ def run_daemon():
     try:
         loop.run()
     except KeyboardInterrupt:
+        service.stop_background()
         service._fan.set_auto_mode()
         log.info("Daemon durduruldu.")
 
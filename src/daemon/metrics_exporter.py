@@ -0,0 +1,359 @@
+"""
+Monster HW Controller - OpenMetrics Exporter
+Daemon içinde isteğe bağlı Prometheus/OpenMetrics metin exporter'ı.
+
+Arka plan örnekleyici donanımı sabit aralıkla okuyup anlık görüntüyü (snapshot)
+önbelleğe alır; scrape istekleri yalnızca bu görüntüden yanıtlanır, yani
+scrape asla sysfs/EC/nvidia-smi okuması tetiklemez. Unix soket veya yalnızca
+127.0.0.1 üzerindeki bir TCP portundan HTTP ile sunulur:
+
+    curl --unix-socket /run/monster-hw-ctrl/metrics.sock http://localhost/metrics
+"""
+
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.cpu_controller import CpuStatus
+from src.core.fan_controller import FanStatus
+from src.core.gpu_nvidia import NvidiaStatus
+from src.core.temp_monitor import TempReading
+from src.core.thermal_protection import level_for_temp
+from src.utils.logger import get_logger
+from src.utils.metrics import get_metrics
+
+log = get_logger("metrics_exporter")
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+@dataclass
+class TelemetrySnapshot:
+    """Son örneklenen donanım durumu (scrape'ler yalnızca bunu okur)."""
+    timestamp: float = 0.0
+    sample_ms: float = 0.0
+    temps: List[Tuple[str, str, str, float]] = field(default_factory=list)  # (chip, device, label, °C)
+    gpu_temp: float = 0.0
+    fans: Dict[str, Dict[str, float]] = field(default_factory=dict)    # cpu/gpu -> rpm, duty
+    fan_manual: bool = False
+    cpu_freqs_khz: List[int] = field(default_factory=list)
+    cpu_max_perf_pct: int = 0
+    cpu_turbo: bool = True
+    nvidia: Dict[str, float] = field(default_factory=dict)
+    nvidia_suspended: bool = False
+    thermal_level: int = 0
+    active_profile: str = ""
+    top_processes: List[Tuple[int, str, float]] = field(default_factory=list)  # (pid, ad, CPU %)
+
+
+class TelemetrySampler:
+    """Donanımı `interval` saniyede bir okuyup snapshot'ı güncelleyen thread."""
+
+    def __init__(self, temp_monitor, cpu, nvidia, fan, profile_manager,
+                 interval: float = 5.0, thermal=None, process_sampler=None):
+        self._temp = temp_monitor
+        self._cpu = cpu
+        self._nvidia = nvidia
+        self._fan = fan
+        self._pm = profile_manager
+        self._thermal = thermal
+        self._process_sampler = process_sampler
+        self._interval = max(1.0, float(interval))
+        self._snapshot = TelemetrySnapshot()
+        # Okuma nesneleri her örnekte yerinde doldurulur (değerler snapshot'a kopyalanır)
+        self._reading = TempReading()
+        self._cpu_status = CpuStatus()
+        self._nvidia_status = NvidiaStatus()
+        self._fan_status = FanStatus()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> TelemetrySnapshot:
+        with self._lock:
+            return self._snapshot
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="telemetry-sampler")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                snap = self.sample()
+                with self._lock:
+                    self._snapshot = snap
+            except Exception as e:
+                log.error("Telemetri örnekleme hatası: %s", e)
+            self._stop.wait(self._interval)
+
+    def sample(self) -> TelemetrySnapshot:
+        """Tüm kaynakları bir kez oku."""
+        start = time.perf_counter()
+        snap = TelemetrySnapshot(timestamp=time.time())
+
+        nv = self._nvidia.get_status(self._nvidia_status)
+        if nv.suspended:
+            self._temp.set_nvidia_temp(0.0)
+        elif nv.available and nv.temp > 0:
+            self._temp.set_nvidia_temp(nv.temp)
+        if nv.available:
+            snap.nvidia_suspended = nv.suspended
+            snap.nvidia = {
+                "power_draw_watts": nv.power_draw,
+                "power_limit_watts": nv.power_limit,
+                "clock_graphics_hertz": nv.clock_graphics * 1_000_000,
+                "clock_memory_hertz": nv.clock_memory * 1_000_000,
+                "utilization_gpu_ratio": nv.utilization_gpu / 100,
+            }
+
+        reading = self._temp.read_all(self._reading)
+        snap.temps = [(s.name, self._temp.sensor_device(s), s.label, s.temp)
+                      for s in reading.sensors]
+        snap.gpu_temp = reading.gpu_nvidia
+
+        if self._fan.available:
+            fan = self._fan.get_status(self._fan_status)
+            snap.fan_manual = fan.mode != "auto"
+            snap.fans = {
+                "cpu": {"rpm": fan.cpu_fan_rpm, "duty": fan.cpu_fan_duty_pct / 100},
+                "gpu": {"rpm": fan.gpu_fan_rpm, "duty": fan.gpu_fan_duty_pct / 100},
+            }
+
+        cpu = self._cpu.get_status(self._cpu_status)
+        snap.cpu_freqs_khz = list(cpu.cur_freqs_khz)
+        snap.cpu_max_perf_pct = cpu.max_perf_pct
+        snap.cpu_turbo = cpu.turbo_enabled
+
+        if self._thermal is not None:
+            snap.thermal_level = self._thermal.state.level
+        else:
+            hottest = max([t for *_, t in snap.temps] + [snap.gpu_temp], default=0.0)
+            snap.thermal_level = level_for_temp(hottest)
+        snap.active_profile = self._pm.active_profile or ""
+
+        # Süreç örneklemesi yalnızca koruma devredeyken (ek yük sıfıra yakın kalsın)
+        if self._process_sampler is not None and snap.thermal_level >= 1:
+            procs = self._process_sampler.sample()
+            snap.top_processes = [(p.pid, p.name, p.cpu_pct) for p in procs.cpu]
+
+        snap.sample_ms = (time.perf_counter() - start) * 1000
+        return snap
+
+
+# --- OpenMetrics metin biçimi ---
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, mtype: str, help_text: str, unit: str = ""):
+        self.lines.append(f"# TYPE {name} {mtype}")
+        if unit:
+            self.lines.append(f"# UNIT {name} {unit}")
+        self.lines.append(f"# HELP {name} {help_text}")
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        self.lines.append(f"{name}{_fmt_labels(labels or {})} {_fmt_value(value)}")
+
+
+def render_openmetrics(snap: TelemetrySnapshot, metrics: Dict[str, Any]) -> str:
+    """Snapshot + iç sayaç/histogramları OpenMetrics metnine dönüştür."""
+    w = _Writer()
+
+    w.family("monster_snapshot_timestamp_seconds", "gauge",
+             "Son donanım örneklemesinin zamanı", "seconds")
+    w.sample("monster_snapshot_timestamp_seconds", snap.timestamp)
+    w.family("monster_snapshot_duration_seconds", "gauge",
+             "Son örneklemenin süresi", "seconds")
+    w.sample("monster_snapshot_duration_seconds", snap.sample_ms / 1000)
+
+    w.family("monster_temperature_celsius", "gauge", "hwmon sıcaklık sensörleri", "celsius")
+    for chip, device, label, temp in snap.temps:
+        w.sample("monster_temperature_celsius", temp,
+                 {"chip": chip, "device": device, "sensor": label})
+    if snap.gpu_temp > 0:
+        w.sample("monster_temperature_celsius", snap.gpu_temp,
+                 {"chip": "nvidia", "device": "nvidia", "sensor": "gpu"})
+
+    if snap.fans:
+        w.family("monster_fan_rpm", "gauge", "Fan devri (EC)")
+        for fan, vals in snap.fans.items():
+            w.sample("monster_fan_rpm", vals["rpm"], {"fan": fan})
+        w.family("monster_fan_duty_ratio", "gauge", "Fan duty (0-1)", "ratio")
+        for fan, vals in snap.fans.items():
+            w.sample("monster_fan_duty_ratio", vals["duty"], {"fan": fan})
+        w.family("monster_fan_manual", "gauge", "Fan EC otomatik modunda değil (1/0)")
+        w.sample("monster_fan_manual", snap.fan_manual)
+
+    w.family("monster_cpu_frequency_hertz", "gauge", "Çekirdek başına anlık frekans", "hertz")
+    for cpu, khz in enumerate(snap.cpu_freqs_khz):
+        w.sample("monster_cpu_frequency_hertz", khz * 1000, {"cpu": str(cpu)})
+    w.family("monster_cpu_max_perf_ratio", "gauge", "intel_pstate max_perf_pct (0-1)", "ratio")
+    w.sample("monster_cpu_max_perf_ratio", snap.cpu_max_perf_pct / 100)
+    w.family("monster_cpu_turbo_enabled", "gauge", "Turbo boost açık (1/0)")
+    w.sample("monster_cpu_turbo_enabled", snap.cpu_turbo)
+
+    if snap.nvidia:
+        w.family("monster_nvidia_suspended", "gauge", "dGPU runtime PM ile uykuda (1/0)")
+        w.sample("monster_nvidia_suspended", snap.nvidia_suspended)
+        for key, value in snap.nvidia.items():
+            name = f"monster_nvidia_{key}"
+            w.family(name, "gauge", f"NVIDIA {key}", key.rsplit("_", 1)[-1])
+            w.sample(name, value)
+
+    w.family("monster_thermal_level", "gauge", "Termal koruma seviyesi (0-4)")
+    w.sample("monster_thermal_level", snap.thermal_level)
+
+    if snap.top_processes:
+        w.family("monster_process_cpu_percent", "gauge",
+                 "Termal olay sırasında en çok CPU kullanan süreçler (tek çekirdek = 100)")
+        for rank, (pid, name, pct) in enumerate(snap.top_processes, 1):
+            w.sample("monster_process_cpu_percent", pct,
+                     {"rank": str(rank), "pid": str(pid), "comm": name})
+
+    w.family("monster_active_profile", "info", "Etkin güç profili")
+    w.sample("monster_active_profile_info", 1, {"profile": snap.active_profile})
+
+    # İç sayaçlar ve aşama gecikme histogramları
+    for name, value in sorted(metrics.get("counters", {}).items()):
+        family = f"monster_{name}"
+        w.family(family, "counter", f"İç sayaç: {name}")
+        w.sample(f"{family}_total", value)
+
+    stages = metrics.get("stages", {})
+    if stages:
+        bounds = metrics.get("bucket_bounds_ms", [])
+        family = "monster_stage_latency_seconds"
+        w.family(family, "histogram", "Döngü aşaması gecikmesi", "seconds")
+        for stage, hist in sorted(stages.items()):
+            cumulative = 0
+            for bound, count in zip(bounds + ["+Inf"], hist["buckets"]):
+                cumulative += count
+                le = "+Inf" if bound == "+Inf" else repr(bound / 1000)
+                w.sample(f"{family}_bucket", cumulative, {"stage": stage, "le": le})
+            w.sample(f"{family}_count", hist["count"], {"stage": stage})
+            w.sample(f"{family}_sum", hist["sum_ms"] / 1000, {"stage": stage})
+
+    w.lines.append("# EOF")
+    return "\n".join(w.lines) + "\n"
+
+
+# --- HTTP sunucu ---
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics — yalnızca önbellekteki snapshot'tan yanıt verir."""
+
+    sampler: TelemetrySampler = None
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_openmetrics(self.sampler.snapshot, get_metrics().snapshot()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix soketinde client_address boş string'dir
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, fmt, *args):
+        log.debug("scrape: " + fmt, *args)
+
+
+class _UnixHTTPServer(ThreadingHTTPServer):
+    address_family = socket.AF_UNIX
+
+    def server_bind(self):
+        # HTTPServer.server_bind host:port ayrıştırır; Unix soketinde atla
+        self.socket.bind(self.server_address)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+    def get_request(self):
+        conn, _ = self.socket.accept()
+        return conn, ("",)
+
+
+class MetricsExporter:
+    """Örnekleyici + HTTP sunucu(lar)ı yöneten daemon bileşeni."""
+
+    def __init__(self, sampler: TelemetrySampler, unix_socket: str = "", port: int = 0):
+        self._sampler = sampler
+        self._unix_socket = unix_socket
+        self._port = port
+        self._servers: List[ThreadingHTTPServer] = []
+
+    def start(self) -> bool:
+        handler = type("MetricsHandler", (_MetricsHandler,), {"sampler": self._sampler})
+        if self._unix_socket:
+            try:
+                path = Path(self._unix_socket)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if path.exists():
+                    path.unlink()
+                server = _UnixHTTPServer(str(path), handler)
+                os.chmod(path, 0o666)  # Salt okunur metrikler, herkes scrape edebilir
+                self._servers.append(server)
+                log.info("OpenMetrics exporter: unix:%s", path)
+            except OSError as e:
+                log.error("Metrik soketi açılamadı (%s): %s", self._unix_socket, e)
+        if self._port > 0:
+            try:
+                self._servers.append(ThreadingHTTPServer(("127.0.0.1", self._port), handler))
+                log.info("OpenMetrics exporter: http://127.0.0.1:%d/metrics", self._port)
+            except OSError as e:
+                log.error("Metrik portu açılamadı (%d): %s", self._port, e)
+
+        if not self._servers:
+            return False
+        self._sampler.start()
+        for server in self._servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True,
+                             name="metrics-exporter").start()
+        return True
+
+    def stop(self):
+        self._sampler.stop()
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        if self._unix_socket:
+            try:
+                os.unlink(self._unix_socket)
+            except OSError:
+                pass
+        self._servers.clear()
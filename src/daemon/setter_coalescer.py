@@ -0,0 +1,121 @@
+"""
+Monster HW Controller - Setter Coalescer
+Daemon setter çağrılarını donanım hedefi başına birleştirir ve hız sınırlar.
+
+GUI kaydırıcıları sürüklenirken saniyede onlarca SetCpuFan / SetNvidiaPowerLimit
+çağrısı gelebilir. Çağrılar metot adına göre değil, yazdıkları donanım hedefine
+göre ("fan", "cpu_pstate", "nvidia_pl", ...) kuyruklanır: aynı hedefe art arda
+gelen aynı metot tek yazmaya indirilir (en son değer), farklı metotlar geliş
+sırasıyla kalır. Hedef başına saniyede en fazla N kez kuyruk boşaltılır ve
+sonuç birleştirilen tüm çağıranlara döner.
+
+Tüm yazmalar tek bir işçi thread'inde uygulanır; aynı hedefe gönderilen
+çağrılar gönderim sırasıyla donanıma ulaşır.
+"""
+
+import heapq
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.logger import get_logger
+
+log = get_logger("setter_coalescer")
+
+DEFAULT_MAX_RATE_HZ = 4.0  # Hedef başına saniyede maksimum yazma
+
+
+@dataclass
+class _PendingWrite:
+    """Bir hedef kuyruğunda bekleyen (henüz uygulanmamış) çağrı."""
+    name: str
+    args: Tuple[Any, ...]
+    merge: bool
+    waiters: List[Callable[[Any], None]] = field(default_factory=list)
+
+
+class SetterCoalescer:
+    """Hedef başına yazma birleştirici ve hız sınırlayıcı.
+
+    submit() bloklamaz; sonuç (veya yakalanan exception) hazır olduğunda
+    her çağıranın on_done callback'i işçi thread'inden çağrılır. Çağrılar
+    `apply(name, args)` ile uygulanır.
+    """
+
+    def __init__(self, apply: Callable[[str, Tuple[Any, ...]], Any],
+                 max_rate_hz: float = DEFAULT_MAX_RATE_HZ):
+        self._apply = apply
+        self._min_interval = 1.0 / max_rate_hz if max_rate_hz > 0 else 0.0
+        self._cond = threading.Condition()
+        self._queues: Dict[str, List[_PendingWrite]] = {}
+        self._last_apply: Dict[str, float] = {}
+        self._schedule: List[Tuple[float, int, str]] = []  # (zaman, sıra, hedef)
+        self._seq = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, target: str, name: str, args: Tuple[Any, ...],
+               on_done: Callable[[Any], None], merge: bool = True):
+        """Bir setter çağrısını hedefin kuyruğuna al.
+
+        merge=True ise ve kuyruğun sonunda aynı metot bekliyorsa argümanlar
+        en son değerle değiştirilir ve çağıran aynı sonucu bekleyenlere eklenir.
+        merge=False çağrılar (ör. SetFanAutoMode) birleştirilmez, yalnızca
+        hedefin bekleyen yazmalarından sonra sıraya girer.
+        """
+        with self._cond:
+            queue = self._queues.get(target)
+            if queue is None:
+                queue = self._queues[target] = []
+                last = self._last_apply.get(target, 0.0)
+                due = max(time.monotonic(), last + self._min_interval)
+                self._seq += 1
+                heapq.heappush(self._schedule, (due, self._seq, target))
+                self._cond.notify()
+
+            tail = queue[-1] if queue else None
+            if merge and tail is not None and tail.merge and tail.name == name:
+                tail.args = args
+                tail.waiters.append(on_done)
+                log.debug("Setter birleştirildi: %s %s%s (%d bekleyen)",
+                          target, name, args, len(tail.waiters))
+            else:
+                queue.append(_PendingWrite(name, args, merge, [on_done]))
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True,
+                                                name="setter-worker")
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._schedule and self._schedule[0][0] <= now:
+                        break
+                    timeout = self._schedule[0][0] - now if self._schedule else None
+                    self._cond.wait(timeout)
+                _, _, target = heapq.heappop(self._schedule)
+                writes = self._queues.pop(target, [])
+                self._last_apply[target] = now
+            for write in writes:
+                self._flush(target, write)
+
+    def _flush(self, target: str, write: _PendingWrite):
+        """Çağrıyı uygula ve birleştirilen tüm çağıranlara sonucu ilet."""
+        try:
+            result = self._apply(write.name, write.args)
+        except Exception as e:
+            log.error("Setter hatası (%s %s): %s", target, write.name, e)
+            result = e
+
+        if len(write.waiters) > 1:
+            log.debug("Setter uygulandı: %s %s%s — %d çağrı birleştirildi",
+                      target, write.name, write.args, len(write.waiters))
+
+        for on_done in write.waiters:
+            try:
+                on_done(result)
+            except Exception as e:
+                log.error("Setter sonuç callback hatası (%s): %s", target, e)
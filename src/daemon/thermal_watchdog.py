@@ -0,0 +1,286 @@
+"""
+Monster HW Controller - Thermal Watchdog
+88°C korumasını GUI'den bağımsız olarak daemon içinde çalıştırır.
+
+Güvenlik döngüsü kendi thread'inde, kendi ThermalProtection örneğiyle
+çalışır ve UI/D-Bus işleriyle gecikme paylaşmaz:
+  - Sıcaklıklar açık tutulan hwmon dosya tanımlayıcılarından os.pread ile
+    okunur (subprocess, glob, Path nesnesi yok).
+  - NVIDIA sıcaklığı nvidia-smi çağrılmadan TempMonitor önbelleğinden alınır;
+    değer birkaç tur boyunca tazelenmezse GPU bilinmiyor sayılır ve yenileme
+    işçi thread'ine bırakılır. GPU güç limiti yazımları da bu işçiye gider.
+  - Okunamayan sensörler için hwmon yeniden taraması döngüde değil, hotplug
+    tarafının thread'inde yapılır; döngü yalnızca fd'leri yeniden açar.
+  - Ayrı bir deadline izleyicisi, döngü `deadline` içinde tamamlanmazsa
+    (ör. EC veya sysfs yazımı takıldıysa) fanları %100'e, olmazsa EC
+    otomatik moduna alır. Döngü sağlıklı tur atmaya başlayınca önceki fan
+    modu geri yüklenir.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.thermal_protection import ThermalProtection
+from src.utils.logger import get_logger
+from src.utils.metrics import COUNTER_WATCHDOG_FAILSAFE, STAGE_WATCHDOG_TICK, get_metrics
+
+log = get_logger("thermal_watchdog")
+
+# Bu kadar ardışık sağlıklı turdan sonra failsafe kaldırılır
+RECOVERY_CYCLES = 5
+
+# Okunamayan sensörler için hwmon yeniden keşfi en fazla bu sıklıkta
+REDISCOVER_INTERVAL_SEC = 30.0
+
+# Önbellekteki NVIDIA sıcaklığı bu kadar turdan eskiyse bayat sayılır
+NVIDIA_TEMP_STALE_CYCLES = 3
+
+# (ThermalProtection sensör adı, sensör eşleme rolü)
+WATCHDOG_ROLES = (("cpu", "cpu_package"), ("pch", "pch"), ("nvme", "nvme"))
+
+# Güvenlik thread'i için nice değeri (root gerektirir; başarısızsa yok sayılır)
+WATCHDOG_NICE = -10
+
+
+class HwmonFdReader:
+    """Sensör rollerini açık dosya tanımlayıcılarından okur.
+
+    Roller TempMonitor'un derlenmiş sensör eşlemesinden alınır:
+    cpu (cpu_package), pch, nvme (composite).
+    """
+
+    def __init__(self, temp_monitor):
+        self._temp_monitor = temp_monitor
+        self._fds: List[Tuple[str, int]] = []
+        self.generation = -1  # fd'lerin açıldığı TempMonitor.generation
+        self.open()
+
+    def open(self):
+        """Sensör listesinden fd'leri (yeniden) aç."""
+        self.close()
+        self.generation = self._temp_monitor.generation
+        for role, sensor_role in WATCHDOG_ROLES:
+            path = self._temp_monitor.role_path(sensor_role)
+            if path is None:
+                continue
+            try:
+                self._fds.append((role, os.open(path, os.O_RDONLY | os.O_CLOEXEC)))
+            except OSError as e:
+                log.warning("Watchdog sensörü açılamadı (%s): %s", path, e)
+        log.info("Watchdog sensörleri: %s", ", ".join(r for r, _ in self._fds) or "yok")
+
+    def close(self):
+        for _, fd in self._fds:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = []
+
+    @property
+    def roles(self) -> List[str]:
+        return [role for role, _ in self._fds]
+
+    def read(self) -> Tuple[Dict[str, float], bool]:
+        """Sıcaklıkları (°C) ve tüm okumaların başarılı olup olmadığını döndür."""
+        temps: Dict[str, float] = {}
+        ok = True
+        for role, fd in self._fds:
+            try:
+                temps[role] = int(os.pread(fd, 16, 0)) / 1000.0
+            except (OSError, ValueError):
+                temps[role] = 0.0
+                ok = False
+        return temps, ok
+
+
+class ThermalWatchdog:
+    """Daemon içindeki bağımsız termal koruma döngüsü."""
+
+    def __init__(self, temp_monitor, cpu, nvidia, fan,
+                 interval: float = 1.0, deadline: float = 0.5,
+                 prediction: Optional[Dict] = None, pid: Optional[Dict] = None,
+                 curve_temp_callback: Optional[Callable[[], float]] = None,
+                 recorder=None, rescan_callback: Optional[Callable[[], None]] = None):
+        self._temp_monitor = temp_monitor
+        self._nvidia = nvidia
+        self._rescan_callback = rescan_callback
+        self._fan = fan
+        self._interval = max(0.2, float(interval))
+        self._deadline = max(0.05, float(deadline))
+        self._curve_temp_callback = curve_temp_callback
+        self._thermal = ThermalProtection(cpu, nvidia, fan, prediction, pid)
+        # İşçinin get_status() sonucu watchdog'un GPU sıcaklığını da besler
+        self._thermal.gpu_worker.set_status_callback(self._on_nvidia_status)
+        self._reader = HwmonFdReader(temp_monitor)
+        self._recorder = recorder
+        if recorder is not None:
+            # Güvenlik döngüsü ek donanım okuması yapmaz; yalnızca PID'in yazdığı sınırlar
+            self._thermal.attach_recorder(recorder, self._recorder_sample)
+        self._metrics = get_metrics()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._monitor: Optional[threading.Thread] = None
+
+        # Deadline izleyicisi için: mevcut turun başlangıcı (None = tur dışında)
+        self._cycle_started: Optional[float] = None
+        self._last_cycle_end = time.monotonic()
+        self._failsafe_lock = threading.Lock()
+        self._failsafe_active = False
+        self._failsafe_prev_mode = ""
+        self._healthy_cycles = 0
+        self._last_rediscover = 0.0
+        self._nvidia_stale = False
+
+    @property
+    def thermal(self) -> ThermalProtection:
+        return self._thermal
+
+    @property
+    def failsafe_active(self) -> bool:
+        return self._failsafe_active
+
+    def _recorder_sample(self) -> Dict[str, float]:
+        if not self._thermal.pid.enabled:
+            return {}
+        status = self._thermal.pid.status()
+        return {"cpu_max_perf_pct": status["cpu_max_perf_pct"],
+                "nv_power_limit": status["gpu_power_limit"]}
+
+    def start(self):
+        self._stop.clear()
+        # Müdahale öncesi GPU limiti güvenlik thread'inde nvidia-smi'siz okunabilsin
+        self._thermal.gpu_worker.refresh_status()
+        self._last_cycle_end = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="thermal-watchdog")
+        self._monitor = threading.Thread(target=self._run_monitor, daemon=True,
+                                         name="thermal-deadline")
+        self._thread.start()
+        self._monitor.start()
+        log.info("Termal watchdog başladı (aralık %.1fs, deadline %.0fms)",
+                 self._interval, self._deadline * 1000)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._interval + self._deadline)
+        self._reader.close()
+        if self._recorder is not None:
+            self._recorder.flush()
+
+    # --- Güvenlik döngüsü ---
+
+    def _run(self):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WATCHDOG_NICE)
+        except (OSError, AttributeError) as e:
+            log.debug("Watchdog önceliği yükseltilemedi: %s", e)
+
+        next_tick = time.monotonic()
+        while not self._stop.is_set():
+            start = time.monotonic()
+            self._cycle_started = start
+            try:
+                self._tick(start)
+            except Exception as e:
+                log.error("Termal watchdog hatası: %s", e)
+            end = time.monotonic()
+            self._cycle_started = None
+            self._last_cycle_end = end
+            elapsed = end - start
+            self._metrics.observe(STAGE_WATCHDOG_TICK, elapsed * 1000)
+
+            if elapsed > self._deadline:
+                self._enter_failsafe(f"tur {elapsed * 1000:.0f}ms sürdü")
+                self._healthy_cycles = 0
+            elif self._failsafe_active:
+                self._healthy_cycles += 1
+                if self._healthy_cycles >= RECOVERY_CYCLES:
+                    self._leave_failsafe()
+
+            next_tick += self._interval
+            if next_tick < end:
+                next_tick = end + self._interval  # Kaçırılan turlar telafi edilmez
+            self._stop.wait(next_tick - end)
+
+    def _tick(self, now: float):
+        if self._reader.generation != self._temp_monitor.generation:
+            self._reader.open()  # Hotplug: sensör kümesi değişti
+        temps, ok = self._reader.read()
+        if not ok and self._rescan_callback is not None \
+                and now - self._last_rediscover >= REDISCOVER_INTERVAL_SEC:
+            # hwmon numaraları değişmiş olabilir (sürücü yeniden yüklendi);
+            # tarama bitince generation artar ve fd'ler sonraki turda açılır
+            self._last_rediscover = now
+            self._rescan_callback()
+        temps["gpu_nvidia"] = self._nvidia_temp(now)
+        self._thermal.check(temps, now)
+
+    def _nvidia_temp(self, now: float) -> float:
+        """Önbellekteki GPU sıcaklığı; bayatsa 0 (bilinmiyor) ve yenileme iste."""
+        if not self._nvidia.available:
+            return 0.0
+        age = self._temp_monitor.nvidia_temp_age(now)
+        if age <= NVIDIA_TEMP_STALE_CYCLES * self._interval:
+            if self._nvidia_stale:
+                self._nvidia_stale = False
+                log.info("NVIDIA sıcaklığı yeniden güncel")
+            return self._temp_monitor.cached_nvidia_temp
+        if not self._nvidia_stale:
+            self._nvidia_stale = True
+            log.warning("NVIDIA sıcaklığı %d turdur tazelenmedi — GPU bilinmiyor "
+                        "sayılıyor, yenileniyor", NVIDIA_TEMP_STALE_CYCLES)
+        self._thermal.gpu_worker.refresh_status()
+        return 0.0
+
+    def _on_nvidia_status(self, status):
+        """NvidiaLimitWorker thread'inden: yenilenen durumu önbelleğe yaz."""
+        self._temp_monitor.set_nvidia_temp(0.0 if status.suspended else status.temp)
+
+    # --- Deadline izleyicisi ---
+
+    def _run_monitor(self):
+        """Döngü takıldıysa (tur deadline'ı aştı veya hiç başlamadı) failsafe."""
+        check_every = min(self._deadline / 2, 0.25)
+        while not self._stop.wait(check_every):
+            now = time.monotonic()
+            started = self._cycle_started
+            if started is not None and now - started > self._deadline:
+                self._enter_failsafe(f"tur {(now - started) * 1000:.0f}ms'dir sürüyor")
+            elif started is None and now - self._last_cycle_end > self._interval + self._deadline:
+                self._enter_failsafe("döngü zamanında başlamadı")
+
+    def _enter_failsafe(self, reason: str):
+        with self._failsafe_lock:
+            if self._failsafe_active:
+                return
+            self._failsafe_active = True
+            self._healthy_cycles = 0
+            self._failsafe_prev_mode = self._fan.mode
+        self._metrics.incr(COUNTER_WATCHDOG_FAILSAFE)
+        self._thermal.hold_fans(True)
+        log.critical("TERMAL WATCHDOG FAILSAFE: %s — fanlar tam hıza alınıyor", reason)
+        if not self._fan.available or not self._fan.set_both_fans(100):
+            if not self._fan.set_auto_mode():
+                log.critical("Fan failsafe uygulanamadı (EC erişimi yok)")
+            else:
+                log.warning("Fanlar tam hıza alınamadı, EC otomatik moduna geçildi")
+
+    def _leave_failsafe(self):
+        with self._failsafe_lock:
+            if not self._failsafe_active:
+                return
+            self._failsafe_active = False
+            prev_mode = self._failsafe_prev_mode
+        self._thermal.hold_fans(False)
+        log.warning("Termal watchdog normale döndü — fan modu geri yükleniyor (%s)",
+                    prev_mode or "?")
+        if prev_mode == "auto":
+            self._fan.set_auto_mode()
+        elif prev_mode == "curve" and self._curve_temp_callback is not None:
+            self._fan.start_auto_curve(self._curve_temp_callback)
+        # Manuel modda fanlar güvenli tarafta (%100) kalır
@@ -0,0 +1,119 @@
+"""
+Monster HW Controller - Daemon Thermal Client
+Daemon'un termal watchdog'u çalışıyorsa GUI kendi ThermalProtection'ını
+(seviyeler + PID) çalıştırmaz; iki süreç aynı CPU/GPU/fan limitlerini
+birbirinin üstüne yazmasın diye koruma daemon'da kalır ve GUI yalnızca
+GetThermalState ile durumu gösterir.
+
+Daemon yoksa, watchdog kapalıysa veya çağrı başarısız olursa GUI yerel
+korumaya geri döner. Çağrılar asenkrondur; yenileme turunu bloklamaz.
+"""
+
+import json
+import time
+from typing import Optional
+
+import gi
+gi.require_version("Gio", "2.0")
+from gi.repository import Gio, GLib
+
+from src.core.thermal_protection import ThermalState
+from src.daemon.dbus_interface import DBUS_INTERFACE, DBUS_PATH, DBUS_SERVICE
+from src.utils.logger import get_logger
+
+log = get_logger("daemon_thermal")
+
+CALL_TIMEOUT_MS = 1000
+# Daemon/watchdog yokken yeniden deneme aralığı (s)
+PROBE_INTERVAL = 30.0
+
+_STATE_FIELDS = ("active", "level", "hottest_sensor", "hottest_temp",
+                 "action_taken", "predicted", "predicted_temp")
+
+
+class DaemonThermalClient:
+    """Daemon watchdog'unun ThermalState'ini D-Bus üzerinden izler."""
+
+    def __init__(self):
+        self._bus: Optional[Gio.DBusConnection] = None
+        self._state = ThermalState()
+        self._watchdog = False
+        self._failsafe = False
+        self._pending = False
+        self._last_probe = 0.0
+
+    @property
+    def active(self) -> bool:
+        """Daemon watchdog'u korumayı yürütüyor mu?"""
+        return self._watchdog
+
+    @property
+    def failsafe(self) -> bool:
+        return self._failsafe
+
+    @property
+    def state(self) -> ThermalState:
+        return self._state
+
+    def probe(self) -> bool:
+        """Başlangıçta senkron yokla (kısa zaman aşımı). Watchdog varsa True."""
+        self._last_probe = time.monotonic()
+        try:
+            bus = self._get_bus()
+            reply = bus.call_sync(
+                DBUS_SERVICE, DBUS_PATH, DBUS_INTERFACE, "GetThermalState", None,
+                GLib.VariantType("(s)"), Gio.DBusCallFlags.NONE, CALL_TIMEOUT_MS, None,
+            )
+            self._update(reply.unpack()[0])
+        except Exception as e:  # bus yok veya daemon çalışmıyor
+            log.debug("Daemon termal durumu alınamadı: %s", e)
+            self._watchdog = False
+        if self._watchdog:
+            log.info("Termal koruma daemon watchdog'unda — GUI yalnızca durumu gösterir")
+        return self._watchdog
+
+    def poll(self):
+        """Durumu arka planda tazele; watchdog yokken PROBE_INTERVAL'de bir dener."""
+        if self._pending:
+            return
+        now = time.monotonic()
+        if not self._watchdog and now - self._last_probe < PROBE_INTERVAL:
+            return
+        self._last_probe = now
+        try:
+            bus = self._get_bus()
+        except GLib.Error as e:
+            log.debug("Sistem bus'ına bağlanılamadı: %s", e)
+            return
+        self._pending = True
+        bus.call(
+            DBUS_SERVICE, DBUS_PATH, DBUS_INTERFACE, "GetThermalState", None,
+            GLib.VariantType("(s)"), Gio.DBusCallFlags.NONE, CALL_TIMEOUT_MS, None,
+            self._on_reply,
+        )
+
+    def _get_bus(self) -> Gio.DBusConnection:
+        if self._bus is None:
+            self._bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        return self._bus
+
+    def _on_reply(self, bus, result):
+        self._pending = False
+        was_active = self._watchdog
+        try:
+            self._update(bus.call_finish(result).unpack()[0])
+        except GLib.Error as e:
+            log.debug("GetThermalState başarısız: %s", e)
+            self._watchdog = False
+        if was_active != self._watchdog:
+            if self._watchdog:
+                log.info("Daemon watchdog'u bulundu — GUI termal koruması devre dışı")
+            else:
+                log.warning("Daemon watchdog'una ulaşılamıyor — GUI termal koruması devrede")
+
+    def _update(self, payload: str):
+        data = json.loads(payload)
+        self._watchdog = bool(data.get("watchdog"))
+        self._failsafe = bool(data.get("failsafe"))
+        if self._watchdog:
+            self._state = ThermalState(**{k: data[k] for k in _STATE_FIELDS if k in data})
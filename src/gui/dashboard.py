@@ -237,6 +237,24 @@ class DashboardPanel(Gtk.Box):
         cores_frame.add(self._cores_box)
         self.pack_start(cores_frame, False, False, 0)
 
+        # --- En çok kaynak kullanan süreçler ---
+        proc_frame = Gtk.Frame(label=" Süreçler (CPU / GPU) ")
+        proc_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=16)
+        proc_box.set_margin_start(8)
+        proc_box.set_margin_end(8)
+        proc_box.set_margin_top(4)
+        proc_box.set_margin_bottom(6)
+        self._proc_cpu_label = Gtk.Label()
+        self._proc_gpu_label = Gtk.Label()
+        for lbl in (self._proc_cpu_label, self._proc_gpu_label):
+            lbl.set_halign(Gtk.Align.START)
+            lbl.set_valign(Gtk.Align.START)
+            lbl.set_ellipsize(Pango.EllipsizeMode.END)
+            lbl.set_markup("<small>—</small>")
+            proc_box.pack_start(lbl, True, True, 0)
+        proc_frame.add(proc_box)
+        self.pack_start(proc_frame, False, False, 0)
+
         # --- Termal koruma durumu ---
         self._thermal_label = Gtk.Label()
         self._thermal_label.set_halign(Gtk.Align.START)
@@ -338,8 +356,13 @@ class DashboardPanel(Gtk.Box):
                 val.set_text("N/A")
             return
 
-        v["gpu_clock"].set_text(f"{nvidia_status.clock_graphics} MHz")
-        v["gpu_mem_clock"].set_text(f"{nvidia_status.clock_memory} MHz")
+        if nvidia_status.suspended:
+            # dGPU uykuda (D3cold) — saat/güç değerleri anlamsız
+            v["gpu_clock"].set_text("Uykuda")
+            v["gpu_mem_clock"].set_text("—")
+        else:
+            v["gpu_clock"].set_text(f"{nvidia_status.clock_graphics} MHz")
+            v["gpu_mem_clock"].set_text(f"{nvidia_status.clock_memory} MHz")
         v["gpu_power"].set_text(
             f"{nvidia_status.power_draw:.1f}W / {nvidia_status.power_limit:.0f}W"
         )
@@ -353,6 +376,31 @@ class DashboardPanel(Gtk.Box):
         v["gpu_mode"].set_text(mode_map.get(nvidia_status.graphics_mode,
                                              nvidia_status.graphics_mode))
 
+    def update_processes(self, snapshot):
+        """En çok CPU/GPU kullanan süreç listelerini güncelle."""
+        if snapshot.interval_sec <= 0 and not snapshot.gpu:
+            self._proc_cpu_label.set_markup("<small>Ölçülüyor…</small>")
+            return
+
+        cpu_lines = ["<b>CPU</b>"] + [
+            f"<tt>{p.cpu_pct:6.1f}%</tt>  {GLib.markup_escape_text(p.name)} "
+            f"<small>({p.pid})</small>"
+            for p in snapshot.cpu
+        ]
+        self._proc_cpu_label.set_markup("\n".join(cpu_lines))
+
+        if not snapshot.gpu:
+            self._proc_gpu_label.set_markup("<b>GPU</b>\n<small>—</small>")
+            return
+        gpu_lines = ["<b>GPU</b>"]
+        for p in snapshot.gpu:
+            sm = f"{p.gpu_sm_pct:3d}% " if p.gpu_sm_pct >= 0 else ""
+            gpu_lines.append(
+                f"<tt>{sm}{p.gpu_mem_mib:5d} MiB</tt>  {GLib.markup_escape_text(p.name)} "
+                f"<small>({p.pid})</small>"
+            )
+        self._proc_gpu_label.set_markup("\n".join(gpu_lines))
+
     def update_fan(self, fan_status):
         """Fan bilgilerini güncelle."""
         v = self._fan_values
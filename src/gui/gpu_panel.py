@@ -338,7 +338,10 @@ class GpuPanel(Gtk.Box):
 
         temp = nvidia_status.temp
         temp_color = "#4caf50" if temp < 70 else "#ff9800" if temp < 85 else "#f44336"
-        v["nv_temp"].set_markup(f'<span color="{temp_color}">{temp}°C</span>')
+        if nvidia_status.suspended:
+            v["nv_temp"].set_markup('<span color="#78909c">Uykuda (D3cold)</span>')
+        else:
+            v["nv_temp"].set_markup(f'<span color="{temp_color}">{temp}°C</span>')
 
         v["nv_power"].set_text(
             f"{nvidia_status.power_draw:.1f}W / {nvidia_status.power_limit:.0f}W"
@@ -5,27 +5,42 @@ Periyodik olarak sensör verilerini okur ve panelleri günceller.
 """
 
 import os
+import time
+from typing import Dict
 import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk, Gdk, GLib
 
-from src.core.cpu_controller import CpuController
+from src.core.cpu_controller import CpuController, CpuStatus
 from src.core.ec_access import EcAccess
-from src.core.fan_controller import FanController, FanCurvePoint
-from src.core.gpu_intel import IntelGpuController
-from src.core.gpu_nvidia import NvidiaGpuController
+from src.core.fan_controller import FanController, FanCurvePoint, FanStatus
+from src.core.gpu_intel import IntelGpuController, IntelGpuStatus
+from src.core.gpu_nvidia import NvidiaGpuController, NvidiaStatus
+from src.core.hotplug import HotplugDiscovery
 from src.core.notifier import TempNotifier
+from src.core.process_sampler import ProcessSampler
 from src.core.profile_manager import ProfileManager
 from src.core.thermal_protection import ThermalProtection
-from src.core.temp_monitor import TempMonitor
+from src.core.thermal_recorder import ThermalRecorder, sample_from_status
+from src.core.temp_monitor import TempMonitor, TempReading
 from src.gui.cpu_panel import CpuPanel
+from src.gui.daemon_thermal import DaemonThermalClient
 from src.gui.dashboard import DashboardPanel
 from src.gui.fan_panel import FanPanel
 from src.gui.gpu_panel import GpuPanel
 from src.gui.profile_panel import ProfilePanel
 from src.gui.tray_icon import TrayIcon
 from src.utils.config import ConfigManager
+from src.utils import startup_profiler
 from src.utils.logger import get_logger
+from src.utils.metrics import (
+    COUNTER_GUI_OVERRUNS, COUNTER_GUI_TICKS, GUI_METRICS_FILE,
+    STAGE_CPU_READ, STAGE_EC_READ, STAGE_GUI_UPDATE, STAGE_IGPU_READ,
+    STAGE_NVIDIA_QUERY, STAGE_PROCESS_SAMPLE, STAGE_REFRESH_TICK,
+    STAGE_SENSOR_READ, STAGE_THERMAL_CHECK, get_metrics,
+)
+from src.utils.snapshot import DoubleBuffer
+from src.utils.uevent import get_uevent_monitor
 
 log = get_logger("main_window")
 
@@ -122,7 +137,8 @@ class MainWindow(Gtk.Window):
         self._init_controllers()
 
         # GUI oluştur
-        self._build_ui()
+        with startup_profiler.timed("MainWindow._build_ui"):
+            self._build_ui()
 
         # Callback'leri bağla
         self._connect_callbacks()
@@ -136,13 +152,14 @@ class MainWindow(Gtk.Window):
         # Periyodik güncelleme zamanlayıcıları
         refresh_ms = self._config.get("refresh_interval_ms", 1500)
         fan_refresh_ms = self._config.get("fan_refresh_interval_ms", 2500)
+        self._refresh_ms = refresh_ms
 
         self._timer_main = GLib.timeout_add(refresh_ms, self._on_refresh)
         self._timer_fan = GLib.timeout_add(fan_refresh_ms, self._on_fan_refresh)
 
-        # İlk güncelleme
-        GLib.idle_add(self._on_refresh)
-        GLib.idle_add(self._on_fan_refresh)
+        # İlk güncelleme (tek seferlik — idle callback True dönerse sürekli çalışır)
+        GLib.idle_add(self._on_first_refresh)
+        GLib.idle_add(lambda: self._on_fan_refresh() and False)
 
         # Pencere kapatma
         self.connect("destroy", self._on_destroy)
@@ -163,18 +180,52 @@ class MainWindow(Gtk.Window):
 
     def _init_controllers(self):
         """Core kontrol bileşenlerini başlat."""
-        self._config = ConfigManager()
-        self._temp_monitor = TempMonitor()
-        self._cpu = CpuController()
-        self._nvidia = NvidiaGpuController()
-        self._igpu = IntelGpuController()
-        self._ec = EcAccess()
-        self._fan = FanController(self._ec)
-        self._profile_manager = ProfileManager(
-            self._config, self._cpu, self._nvidia, self._igpu, self._fan
+        timed = startup_profiler.timed_call
+        self._config = timed("ConfigManager()", ConfigManager)
+        self._temp_monitor = timed("TempMonitor()", TempMonitor, self._config.get("sensor_map"))
+        self._cpu = timed("CpuController()", CpuController)
+        self._nvidia = timed("NvidiaGpuController()", NvidiaGpuController)
+        self._igpu = timed("IntelGpuController()", IntelGpuController)
+        self._ec = timed("EcAccess()", EcAccess)
+        self._fan = timed("FanController()", FanController, self._ec)
+        self._profile_manager = timed(
+            "ProfileManager()", ProfileManager,
+            self._config, self._cpu, self._nvidia, self._igpu, self._fan,
         )
-        self._notifier = TempNotifier()
-        self._thermal = ThermalProtection(self._cpu, self._nvidia, self._fan)
+        self._notifier = timed("TempNotifier()", TempNotifier)
+        self._thermal = timed("ThermalProtection()", ThermalProtection,
+                              self._cpu, self._nvidia, self._fan,
+                              self._config.get("thermal_prediction"),
+                              self._config.get("thermal_pid"))
+        # Daemon watchdog'u varsa koruma orada çalışır; GUI yalnızca durumu gösterir
+        self._daemon_thermal = DaemonThermalClient()
+        timed("DaemonThermalClient.probe()", self._daemon_thermal.probe)
+        self._metrics = get_metrics()
+
+        # Yenileme döngülerinin durum nesneleri: her tur arka tampon doldurulur,
+        # önceki tur (ör. _last_fan_status) bir sonraki tura kadar geçerli kalır
+        self._temp_buf = DoubleBuffer(TempReading)
+        self._cpu_buf = DoubleBuffer(CpuStatus)
+        self._nvidia_buf = DoubleBuffer(NvidiaStatus)
+        self._igpu_buf = DoubleBuffer(IntelGpuStatus)
+        self._fan_buf = DoubleBuffer(FanStatus)
+
+        # hwmon/drm hotplug: yalnızca etkilenen sensörler yeniden keşfedilir
+        self._hotplug = HotplugDiscovery(self._temp_monitor, self._igpu, get_uevent_monitor())
+        self._hotplug.start()
+
+        proc_settings = self._config.get("process_sampler") or {}
+        self._proc_sampler = ProcessSampler(
+            self._nvidia, top_n=proc_settings.get("top_n", 5),
+            gpu_interval=proc_settings.get("gpu_interval_sec", 5.0),
+        )
+
+        # Termal olay kaydedici: örnekler bu tur okunan durumlardan beslenir
+        self._recorder_sample: Dict[str, float] = {}
+        self._last_fan_status = None
+        self._recorder = ThermalRecorder.from_settings(self._config.get("thermal_recorder"))
+        if self._recorder is not None:
+            self._thermal.attach_recorder(self._recorder, lambda: self._recorder_sample)
 
         log.info("Controller'lar başlatıldı - EC: %s, NVIDIA: %s, iGPU: %s",
                  self._ec.available, self._nvidia.available, self._igpu.available)
@@ -315,15 +366,18 @@ class MainWindow(Gtk.Window):
     def _connect_callbacks(self):
         """Panel callback'lerini controller'lara bağla."""
 
+        # Panel yazımlarından sonra yerel termal koruma seviyesini yeniden uygular
+        writes = self._then_invalidate_thermal
+
         # CPU Panel
-        self._cpu_panel.on_apply(self._apply_cpu)
+        self._cpu_panel.on_apply(writes(self._apply_cpu))
 
         # GPU Panel
-        self._gpu_panel.on_nvidia_apply(self._apply_nvidia)
-        self._gpu_panel.on_igpu_apply(self._apply_igpu)
+        self._gpu_panel.on_nvidia_apply(writes(self._apply_nvidia))
+        self._gpu_panel.on_igpu_apply(writes(self._apply_igpu))
 
         # Fan Panel
-        self._fan_panel.on_apply(self._apply_fan)
+        self._fan_panel.on_apply(writes(self._apply_fan))
 
         # Profile Panel
         self._profile_panel.on_apply(self._apply_profile)
@@ -331,6 +385,15 @@ class MainWindow(Gtk.Window):
         self._profile_panel.on_delete(self._delete_profile)
         self._profile_panel.on_edit(self._edit_profile)
 
+    def _then_invalidate_thermal(self, func):
+        """Ayar yazan callback'i sar: yazımdan sonra ThermalProtection'a bildir."""
+        def wrapper(settings):
+            try:
+                return func(settings)
+            finally:
+                self._thermal.invalidate()
+        return wrapper
+
     # === Controller Callback'leri ===
 
     def _apply_cpu(self, settings):
@@ -408,6 +471,7 @@ class MainWindow(Gtk.Window):
             return self._temp_monitor.read_all().cpu_package
 
         success = self._profile_manager.apply_profile(profile_name, temp_callback=temp_cb)
+        self._thermal.invalidate()  # Profil koruma eylemlerini geri almış olabilir
         if success:
             self._profile_panel.set_active_profile(profile_name)
             self._dashboard.update_profile(profile_name)
@@ -461,31 +525,37 @@ class MainWindow(Gtk.Window):
 
     # === Periyodik Güncelleme ===
 
+    def _on_first_refresh(self):
+        """İlk güncelleme; açılış profilini tamamlar."""
+        with startup_profiler.timed("ilk _on_refresh"):
+            self._on_refresh()
+        startup_profiler.finish()
+        if startup_profiler.exit_after_startup():
+            Gtk.main_quit()
+        return False
+
     def _on_refresh(self):
         """Ana güncelleme döngüsü (sıcaklık, CPU, GPU)."""
+        metrics = self._metrics
+        tick_start = time.perf_counter()
         try:
             # Sıcaklık
-            temp_reading = self._temp_monitor.read_all()
-            self._dashboard.update_temps(temp_reading)
-
-            # Tray icon sıcaklık güncelleme
-            self._tray.update_temps(temp_reading.cpu_package, temp_reading.gpu_nvidia)
-
-            # CPU sıcaklığını fan eğrisi editörüne ilet
-            self._fan_panel.set_current_temp(temp_reading.cpu_package)
+            with metrics.time(STAGE_SENSOR_READ):
+                temp_reading = self._temp_monitor.read_all(self._temp_buf.next())
 
             # CPU
-            cpu_status = self._cpu.get_status()
-            self._dashboard.update_cpu(cpu_status)
-            self._cpu_panel.update_from_status(cpu_status)
+            with metrics.time(STAGE_CPU_READ):
+                cpu_status = self._cpu.get_status(self._cpu_buf.next())
 
             # NVIDIA GPU
-            nvidia_status = self._nvidia.get_status()
-            self._dashboard.update_nvidia(nvidia_status)
-            self._gpu_panel.update_nvidia_status(nvidia_status)
+            with metrics.time(STAGE_NVIDIA_QUERY):
+                nvidia_status = self._nvidia.get_status(self._nvidia_buf.next())
 
             # NVIDIA sıcaklığını TempMonitor'a ilet (çift subprocess engelleme)
-            if nvidia_status.available and nvidia_status.temp > 0:
+            # Uykudaki GPU'nun eski sıcaklığı termal korumayı tetiklememeli
+            if nvidia_status.suspended:
+                self._temp_monitor.set_nvidia_temp(0.0)
+            elif nvidia_status.available and nvidia_status.temp > 0:
                 self._temp_monitor.set_nvidia_temp(nvidia_status.temp)
 
             # Sıcaklık bildirimlerini kontrol et
@@ -496,27 +566,81 @@ class MainWindow(Gtk.Window):
                 "pch": temp_reading.pch,
             }
             self._notifier.check_and_notify(temp_dict)
+            self._recorder_sample = sample_from_status(
+                cpu_status, self._last_fan_status, nvidia_status)
 
             # TERMAL KORUMA — 88°C sert limit (profilden bağımsız)
-            thermal_state = self._thermal.check(temp_dict)
-            self._dashboard.update_thermal_status(thermal_state)
+            with metrics.time(STAGE_THERMAL_CHECK):
+                thermal_state = self._check_thermal(temp_dict)
+
+            # Süreç örnekleme yalnızca dashboard görünürken veya koruma devredeyken
+            proc_snapshot = None
+            if self._dashboard_visible() or thermal_state.level >= 1:
+                with metrics.time(STAGE_PROCESS_SAMPLE):
+                    proc_snapshot = self._proc_sampler.sample()
+            elif self._proc_sampler.last.timestamp:
+                self._proc_sampler.reset()
 
             # Intel iGPU
-            igpu_status = self._igpu.get_status()
-            self._dashboard.update_igpu(igpu_status)
-            self._gpu_panel.update_igpu_status(igpu_status)
+            with metrics.time(STAGE_IGPU_READ):
+                igpu_status = self._igpu.get_status(self._igpu_buf.next())
+
+            with metrics.time(STAGE_GUI_UPDATE):
+                self._dashboard.update_temps(temp_reading)
+                # Tray icon sıcaklık güncelleme
+                self._tray.update_temps(temp_reading.cpu_package, temp_reading.gpu_nvidia)
+                # CPU sıcaklığını fan eğrisi editörüne ilet
+                self._fan_panel.set_current_temp(temp_reading.cpu_package)
+                self._dashboard.update_cpu(cpu_status)
+                self._cpu_panel.update_from_status(cpu_status)
+                self._dashboard.update_nvidia(nvidia_status)
+                self._gpu_panel.update_nvidia_status(nvidia_status)
+                self._dashboard.update_thermal_status(thermal_state)
+                self._dashboard.update_igpu(igpu_status)
+                self._gpu_panel.update_igpu_status(igpu_status)
+                if proc_snapshot is not None:
+                    self._dashboard.update_processes(proc_snapshot)
 
         except Exception as e:
             log.error("Güncelleme hatası: %s", e)
 
+        elapsed_ms = (time.perf_counter() - tick_start) * 1000
+        metrics.observe(STAGE_REFRESH_TICK, elapsed_ms)
+        metrics.incr(COUNTER_GUI_TICKS)
+        if elapsed_ms > self._refresh_ms:
+            metrics.incr(COUNTER_GUI_OVERRUNS)
+        metrics.maybe_dump(GUI_METRICS_FILE)
+
         return True  # GLib.timeout_add devam etsin
 
+    def _check_thermal(self, temps: Dict[str, float]):
+        """Daemon watchdog'u çalışıyorsa onun durumunu göster, yoksa yerel koruma.
+
+        Yerel koruma müdahaledeyken devir yapılmaz; seviye 0'a dönüp orijinal
+        limitleri geri yükledikten sonra daemon'a bırakılır.
+        """
+        self._daemon_thermal.poll()
+        if self._daemon_thermal.active and not self._thermal.active \
+                and not self._thermal.pid.engaged:
+            return self._daemon_thermal.state
+        return self._thermal.check(temps)
+
+    def _dashboard_visible(self) -> bool:
+        """Pencere açık, simge durumunda değil ve dashboard sekmesi seçili mi?"""
+        if not self.is_visible() or self._notebook.get_current_page() != 0:
+            return False
+        gdk_window = self.get_window()
+        return gdk_window is None or not (gdk_window.get_state() & Gdk.WindowState.ICONIFIED)
+
     def _on_fan_refresh(self):
         """Fan güncelleme döngüsü (daha yavaş, EC erişimi)."""
         try:
-            fan_status = self._fan.get_status()
-            self._dashboard.update_fan(fan_status)
-            self._fan_panel.update_fan_status(fan_status)
+            with self._metrics.time(STAGE_EC_READ):
+                fan_status = self._fan.get_status(self._fan_buf.next())
+            self._last_fan_status = fan_status
+            with self._metrics.time(STAGE_GUI_UPDATE):
+                self._dashboard.update_fan(fan_status)
+                self._fan_panel.update_fan_status(fan_status)
         except Exception as e:
             log.error("Fan güncelleme hatası: %s", e)
 
@@ -526,6 +650,10 @@ class MainWindow(Gtk.Window):
         """Pencere kapatılırken temizlik."""
         log.info("Uygulama kapatılıyor...")
 
+        if self._recorder is not None:
+            self._recorder.flush()
+        get_uevent_monitor().stop()
+
         # Fan'ı otomatik moda geri al
         if self._fan.mode != "auto":
             try:
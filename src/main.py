@@ -7,6 +7,7 @@ Kullanım:
     python3 -m src.main                  # GUI başlat
     sudo python3 -m src.main daemon      # Arka plan daemon
     python3 -m src.main status           # Anlık durum özeti
+    python3 -m src.main stats            # Döngü gecikme histogramları
     python3 -m src.main profile list     # Profilleri listele
     python3 -m src.main profile apply <ad>  # Profil uygula
     python3 -m src.main cpu --governor performance --turbo on
@@ -15,6 +16,7 @@ Kullanım:
 """
 
 import argparse
+import json
 import sys
 import os
 import signal
@@ -24,14 +26,22 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
+from src.utils import startup_profiler  # noqa: E402  (yalnızca stdlib, ucuz)
+
 
 def run_gui():
     """GTK3 GUI uygulamasını başlat."""
-    import gi
-    gi.require_version("Gtk", "3.0")
-    from gi.repository import Gtk, GLib
-
-    from src.gui.main_window import MainWindow
+    with startup_profiler.timed("import gi"):
+        import gi
+        gi.require_version("Gtk", "3.0")
+    with startup_profiler.timed("import Gtk"):
+        from gi.repository import Gtk, GLib
+    with startup_profiler.timed("import cairo"):
+        import cairo  # noqa: F401
+    startup_profiler.profile_imports(startup_profiler.CORE_MODULES)
+
+    with startup_profiler.timed("import src.gui.main_window"):
+        from src.gui.main_window import MainWindow
     from src.utils.logger import setup_logger, get_logger
 
     # Logger'ı başlat (tüm alt modüller için handler oluşturulur)
@@ -57,10 +67,13 @@ def run_gui():
     sys.excepthook = on_exception
 
     win = MainWindow()
-    win.show_all()
+    with startup_profiler.timed("MainWindow.show_all"):
+        win.show_all()
     Gtk.main()
 
     log.info("Uygulama kapatıldı")
+    if startup_profiler.exit_after_startup() and startup_profiler.budget_exceeded():
+        sys.exit(1)
 
 
 def run_daemon():
@@ -73,30 +86,84 @@ def run_daemon():
 # CLI Komutları
 # ============================================================
 
-def _init_cli_controllers():
-    """CLI için core controller'ları başlat."""
-    from src.core.cpu_controller import CpuController
-    from src.core.ec_access import EcAccess
-    from src.core.fan_controller import FanController
-    from src.core.gpu_intel import IntelGpuController
-    from src.core.gpu_nvidia import NvidiaGpuController
-    from src.core.temp_monitor import TempMonitor
-    from src.core.profile_manager import ProfileManager
-    from src.utils.config import ConfigManager
-
-    config = ConfigManager()
-    cpu = CpuController()
-    nvidia = NvidiaGpuController()
-    igpu = IntelGpuController()
-    ec = EcAccess()
-    fan = FanController(ec)
-    temp = TempMonitor()
-    pm = ProfileManager(config, cpu, nvidia, igpu, fan)
-
-    return {
-        "config": config, "cpu": cpu, "nvidia": nvidia,
-        "igpu": igpu, "ec": ec, "fan": fan, "temp": temp, "pm": pm,
-    }
+class _LazyProxy:
+    """Hedef nesneyi ilk öznitelik erişiminde oluşturan vekil."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+
+    def __getattr__(self, name):
+        if self._target is None:
+            self._target = self._factory()
+        return getattr(self._target, name)
+
+
+class _ControllerRegistry:
+    """CLI için tembel controller kaydı.
+
+    Her controller (ve modülü) yalnızca ilk erişimde oluşturulur; böylece
+    `cpu --turbo on` nvidia-smi çalıştırmaz, hwmon ya da EC taramaz.
+    """
+
+    def __init__(self):
+        self._instances = {}
+
+    def __getitem__(self, name: str):
+        if name not in self._instances:
+            self._instances[name] = startup_profiler.timed_call(
+                f"controller {name}", getattr(self, f"_make_{name}"))
+        return self._instances[name]
+
+    def lazy(self, name: str) -> _LazyProxy:
+        """İlk kullanımda oluşturulacak controller vekili."""
+        return _LazyProxy(lambda: self[name])
+
+    @staticmethod
+    def _make_config():
+        from src.utils.config import ConfigManager
+        return ConfigManager()
+
+    @staticmethod
+    def _make_cpu():
+        from src.core.cpu_controller import CpuController
+        return CpuController()
+
+    @staticmethod
+    def _make_nvidia():
+        from src.core.gpu_nvidia import NvidiaGpuController
+        return NvidiaGpuController()
+
+    @staticmethod
+    def _make_igpu():
+        from src.core.gpu_intel import IntelGpuController
+        return IntelGpuController()
+
+    @staticmethod
+    def _make_ec():
+        from src.core.ec_access import EcAccess
+        return EcAccess()
+
+    def _make_fan(self):
+        from src.core.fan_controller import FanController
+        return FanController(self["ec"])
+
+    def _make_temp(self):
+        from src.core.temp_monitor import TempMonitor
+        return TempMonitor(self["config"].get("sensor_map"))
+
+    def _make_pm(self):
+        from src.core.profile_manager import ProfileManager
+        # Donanım controller'ları profil gerçekten uygulanana kadar oluşturulmaz
+        return ProfileManager(
+            self["config"], self.lazy("cpu"), self.lazy("nvidia"),
+            self.lazy("igpu"), self.lazy("fan"),
+        )
+
+
+def _init_cli_controllers() -> _ControllerRegistry:
+    """CLI için core controller kaydını oluştur (controller'lar tembel)."""
+    return _ControllerRegistry()
 
 
 def cmd_status(_args):
@@ -281,12 +348,61 @@ def cmd_fan(args):
         print(f"Mod: {st.mode}  CPU RPM: {st.cpu_fan_rpm}  GPU RPM: {st.gpu_fan_rpm}")
 
 
+def _daemon_metrics():
+    """Daemon'dan GetMetrics ile metrikleri al (erişilemezse None)."""
+    try:
+        import gi
+        gi.require_version("Gio", "2.0")
+        from gi.repository import Gio, GLib
+        from src.daemon.dbus_interface import DBUS_INTERFACE, DBUS_PATH, DBUS_SERVICE
+
+        bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        reply = bus.call_sync(
+            DBUS_SERVICE, DBUS_PATH, DBUS_INTERFACE, "GetMetrics", None,
+            GLib.VariantType("(s)"), Gio.DBusCallFlags.NONE, 2000, None,
+        )
+        return json.loads(reply.unpack()[0])
+    except Exception as e:  # gi yok, bus yok veya daemon çalışmıyor
+        print(f"  (daemon metrikleri alınamadı: {e})", file=sys.stderr)
+        return None
+
+
+def cmd_stats(args):
+    """Daemon ve GUI döngü gecikme histogramlarını göster."""
+    from src.utils.metrics import GUI_METRICS_FILE, format_metrics
+
+    sources = {}
+    daemon = _daemon_metrics()
+    if daemon is not None:
+        sources["daemon"] = daemon
+    try:
+        sources["gui"] = json.loads(GUI_METRICS_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+
+    if args.json:
+        print(json.dumps(sources, indent=2))
+        return
+    if not sources:
+        print("Metrik bulunamadı: daemon çalışmıyor ve GUI henüz metrik yazmadı.")
+        sys.exit(1)
+    titles = {"daemon": "Daemon", "gui": f"GUI ({GUI_METRICS_FILE})"}
+    for name, snap in sources.items():
+        print(format_metrics(snap, titles[name]))
+        print()
+
+
 def build_parser() -> argparse.ArgumentParser:
     """Argparse parser oluştur."""
     parser = argparse.ArgumentParser(
         prog="monster-hw-ctrl",
         description="Monster TULPAR T5 V19.2 — Donanım Kontrolcüsü",
     )
+    parser.add_argument("--profile-startup", action="store_true", dest="profile_startup",
+                        help="Açılış sürelerini ölç ve sıralı rapor bas")
+    parser.add_argument("--startup-budget-ms", type=float, dest="startup_budget_ms",
+                        help="Açılış bütçesi (ms); ilk güncellemeden sonra çık, "
+                             "aşılırsa çıkış kodu 1")
     sub = parser.add_subparsers(dest="command")
 
     # GUI (varsayılan)
@@ -298,6 +414,10 @@ def build_parser() -> argparse.ArgumentParser:
     # Status
     sub.add_parser("status", help="Anlık sistem durumunu göster")
 
+    # Stats
+    p_stats = sub.add_parser("stats", help="Döngü gecikme histogramları ve sayaçlar")
+    p_stats.add_argument("--json", action="store_true", help="Ham JSON çıktısı")
+
     # Profile
     p_prof = sub.add_parser("profile", help="Profil yönetimi")
     p_prof.add_argument("profile_action", choices=["list", "apply"], help="list veya apply")
@@ -329,6 +449,9 @@ def main():
 
     cmd = args.command
 
+    if args.profile_startup or args.startup_budget_ms is not None:
+        startup_profiler.enable(args.startup_budget_ms)
+
     if cmd == "daemon":
         run_daemon()
     elif cmd == "status":
@@ -341,9 +464,17 @@ def main():
         cmd_gpu(args)
     elif cmd == "fan":
         cmd_fan(args)
+    elif cmd == "stats":
+        cmd_stats(args)
     else:
         # Varsayılan: GUI
         run_gui()
+        return
+
+    if cmd != "daemon":
+        startup_profiler.finish()
+        if startup_profiler.exit_after_startup() and startup_profiler.budget_exceeded():
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+"""
+Monster HW Controller - Capability Cache
+Donanım yetenek keşfi sonuçlarını (hwmon yolları, DRM card, EC yöntemi,
+NVIDIA erişilebilirliği, araç yolları) diskte saklar.
+
+Cache; boot_id, kernel sürümü, NVIDIA sürücü sürümü ve donanım kökü
+(MONSTER_HW_ROOT) ile anahtarlanır.
+Bunlardan biri değişirse cache yok sayılır. Controller'lar cache'ten başlar
+ve bulguları ilk kullanımda (lazy) doğrular.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.utils.config import CONFIG_DIR, atomic_write_json
+from src.utils.hw_paths import hw_path, hw_root
+from src.utils.logger import get_logger
+
+log = get_logger("capabilities")
+
+CAPS_FILE = CONFIG_DIR / "capabilities.json"
+BOOT_ID_FILE = hw_path("/proc/sys/kernel/random/boot_id")
+NVIDIA_VERSION_FILE = hw_path("/sys/module/nvidia/version")
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return ""
+
+
+def environment_key() -> Dict[str, str]:
+    """Cache geçerliliğini belirleyen ortam anahtarı."""
+    return {
+        "boot_id": _read(BOOT_ID_FILE),
+        "kernel": os.uname().release,
+        "nvidia_driver": _read(NVIDIA_VERSION_FILE),
+        "hw_root": hw_root(),
+    }
+
+
+class CapabilityCache:
+    """Ortam anahtarına bağlı, süreç içinde paylaşılan yetenek cache'i."""
+
+    def __init__(self, path: Path = CAPS_FILE):
+        self._path = path
+        self._key = environment_key()
+        self._data: Dict[str, Any] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        """Cache dosyasını oku; ortam anahtarı uyuşmuyorsa yok say."""
+        try:
+            raw = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(raw, dict) or raw.get("key") != self._key:
+            log.info("Yetenek cache'i geçersiz (boot/kernel/sürücü değişti), yeniden keşfedilecek")
+            return
+        self._data = raw.get("capabilities", {})
+        log.debug("Yetenek cache'i yüklendi: %s", sorted(self._data))
+
+    def get(self, name: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(name, default)
+
+    def set(self, name: str, value: Any):
+        """Bir yeteneği kaydet (diske çıkışta / flush() ile yazılır)."""
+        with self._lock:
+            if self._data.get(name) == value:
+                return
+            self._data[name] = value
+            self._dirty = True
+
+    def invalidate(self, name: str):
+        """Bir yeteneği cache'ten düşür (doğrulama başarısız olduğunda)."""
+        with self._lock:
+            if self._data.pop(name, None) is not None:
+                self._dirty = True
+
+    def tool_path(self, tool: str) -> Optional[str]:
+        """Harici aracın tam yolunu döndür (cache'li `which`)."""
+        tools = self.get("tools", {})
+        cached = tools.get(tool)
+        if cached and os.access(cached, os.X_OK):
+            return cached
+        path = shutil.which(tool)
+        self.set("tools", {**tools, tool: path})
+        return path
+
+    def flush(self):
+        """Değişiklikleri atomik olarak diske yaz."""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = {"key": self._key, "capabilities": dict(self._data)}
+            self._dirty = False
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(self._path, snapshot)
+        except OSError as e:
+            log.debug("Yetenek cache'i yazılamadı: %s", e)
+
+
+_cache: Optional[CapabilityCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_capability_cache() -> CapabilityCache:
+    """Süreç genelinde paylaşılan cache örneğini döndür."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CapabilityCache()
+        return _cache
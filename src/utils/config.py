@@ -3,10 +3,15 @@ Monster HW Controller - Configuration Manager
 JSON tabanlı yapılandırma yönetimi.
 """
 
+import atexit
+import copy
 import json
 import os
+import stat
+import tempfile
+import threading
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from src.utils.logger import get_logger
 
@@ -16,10 +21,81 @@ CONFIG_DIR = Path.home() / ".config" / "monster-hw-ctrl"
 PROFILES_DIR = CONFIG_DIR / "profiles"
 MAIN_CONFIG_FILE = CONFIG_DIR / "settings.json"
 
+# set() çağrıları bu süre boyunca biriktirilip tek yazmada kaydedilir
+SETTINGS_SAVE_DEBOUNCE_SEC = 1.0
+
 # Varsayılan uygulama ayarları
 DEFAULT_SETTINGS = {
     "refresh_interval_ms": 1500,
     "fan_refresh_interval_ms": 2500,
+    "setter_max_rate_hz": 4,
+    "metrics_exporter": {
+        "enabled": False,
+        "unix_socket": "/run/monster-hw-ctrl/metrics.sock",
+        "port": 0,            # >0 ise ayrıca 127.0.0.1:<port>
+        "interval_sec": 5.0,  # Donanım örnekleme aralığı (scrape'ten bağımsız)
+    },
+    "thermal_prediction": {
+        "enabled": True,
+        "window_sec": 6.0,    # Eğim için geçmiş penceresi
+        "horizon_sec": 4.0,   # Sensör/fan gecikmesini karşılayacak öngörü süresi
+        "min_samples": 3,
+        "min_slope": 0.3,     # °C/s
+        "max_level": 3,       # Seviye 4 yalnızca gerçek ölçümle
+    },
+    "thermal_pid": {
+        "enabled": False,     # Açıkken seviye 1-2 yalnızca fanları yönetir
+        "target_temp": 82.0,  # °C — seviye 3 (84°C) eşiğinin altında tutulmalı
+        "kp": 0.08,
+        "ki": 0.02,
+        "kd": 0.0,
+        "cpu_min_pct": 40,
+        "gpu_min_watts": 35,
+        "backstop_level": 3,
+    },
+    "thermal_watchdog": {
+        "enabled": True,      # Daemon içinde GUI'den bağımsız 88°C koruması
+        "interval_sec": 1.0,
+        "deadline_ms": 500,   # Aşılırsa fanlar %100 / EC otomatik
+    },
+    "thermal_recorder": {
+        "enabled": True,      # Seviye ≥2 olaylarını CONFIG_DIR/events'e yaz
+        "pre_sec": 60.0,
+        "post_sec": 30.0,
+        "capacity": 240,      # Halka tampon örnek sayısı (pre_sec'i kapsamalı)
+        "max_files": 50,
+    },
+    "process_sampler": {
+        "top_n": 5,
+        "gpu_interval_sec": 5.0,  # nvidia-smi/NVML süreç sorgusu aralığı
+    },
+    "auto_profile": {
+        "enabled": False,
+        "interval_sec": 3.0,
+        "debounce_sec": 6.0,      # İstenen profil bu kadar sabit kalmalı
+        "min_dwell_sec": 60.0,    # İki otomatik geçiş arasında en az
+        "default_profile": None,  # Hiçbir kural eşleşmezse (None = dokunma)
+        # Sırayla değerlendirilir, ilk eşleşen kazanır
+        "rules": [
+            {"name": "steam-oyun", "profile": "oyun", "power": "ac",
+             "processes": ["reaper", "gamescope*", "wine64-preloader", "*.exe"]},
+            {"name": "pil", "profile": "sessiz", "power": "battery"},
+            {"name": "uzun-derleme", "profile": "performans", "power": "ac",
+             "min_load": 70, "load_sec": 30},
+        ],
+    },
+    "power_profiles": {
+        "enabled": False,          # AC takılınca/çıkarılınca profili anında değiştir
+        "ac_profile": "dengeli",
+        "battery_profile": "sessiz",
+        "poll_interval_sec": 30.0,  # Yalnızca uevent dinlenemezse
+    },
+    "sensor_map": {
+        # Hazır eşleme paketleri (src/core/sensor_map.py); boş = hepsi
+        "packs": [],
+        # Paketlerden önce değerlendirilir: {"role", "chip" (regex), "label" (regex)}
+        "rules": [],
+    },
     "active_profile": None,
     "start_minimized": False,
     "enable_notifications": True,
@@ -38,13 +114,59 @@ DEFAULT_SETTINGS = {
 }
 
 
+def atomic_write_json(path: Path, data: Any):
+    """JSON'u atomik yaz: geçici dosya + fsync + rename.
+
+    Çökme anında dosya ya eski ya da yeni içerikle kalır, asla yarım kalmaz.
+    mkstemp 0600 ile oluşturur; mevcut dosyanın izinleri (yeni dosyada 0644) korunur.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.",
+                                    suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            os.fchmod(f.fileno(), mode)
+            json.dump(data, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _file_key(path: Path) -> Optional[Tuple[int, int]]:
+    """Cache anahtarı olarak (mtime_ns, boyut); dosya yoksa None."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
 class ConfigManager:
-    """JSON yapılandırma dosyalarını yönetir."""
+    """JSON yapılandırma dosyalarını yönetir.
+
+    Profiller bellekte cache'lenir ve dosyanın mtime/boyutu değişmedikçe
+    yeniden parse edilmez. Tüm yazmalar atomiktir; settings.json yazmaları
+    debounce ile birleştirilir.
+    """
 
     def __init__(self):
         self._settings: Dict[str, Any] = {}
+        self._profile_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._settings_dirty = False
+        self._save_timer: Optional[threading.Timer] = None
         self._ensure_dirs()
         self._load_settings()
+        atexit.register(self.flush)
 
     def _ensure_dirs(self):
         """Gerekli dizinleri oluştur."""
@@ -70,21 +192,45 @@ class ConfigManager:
             log.info("Varsayılan ayarlar oluşturuldu: %s", MAIN_CONFIG_FILE)
 
     def save_settings(self):
-        """Ayarları dosyaya kaydet."""
+        """Ayarları dosyaya hemen (atomik) kaydet."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            self._settings_dirty = False
+            snapshot = dict(self._settings)
         try:
-            with open(MAIN_CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(self._settings, f, indent=2, ensure_ascii=False)
-        except IOError as e:
+            atomic_write_json(MAIN_CONFIG_FILE, snapshot)
+        except (IOError, OSError) as e:
             log.error("Ayarlar kaydedilemedi: %s", e)
 
+    def _schedule_save(self):
+        """Ayar kaydını debounce ile planla."""
+        with self._lock:
+            self._settings_dirty = True
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(SETTINGS_SAVE_DEBOUNCE_SEC, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Bekleyen ayar değişikliklerini diske yaz."""
+        with self._lock:
+            dirty = self._settings_dirty
+        if dirty:
+            self.save_settings()
+
     def get(self, key: str, default: Any = None) -> Any:
         """Bir ayar değeri al."""
         return self._settings.get(key, default)
 
     def set(self, key: str, value: Any):
-        """Bir ayar değeri belirle ve kaydet."""
+        """Bir ayar değeri belirle ve kaydı planla (debounce)."""
+        if key in self._settings and self._settings[key] == value:
+            return
         self._settings[key] = value
-        self.save_settings()
+        self._schedule_save()
 
     @property
     def settings(self) -> Dict[str, Any]:
@@ -100,31 +246,43 @@ class ConfigManager:
         return sorted(profiles)
 
     def load_profile(self, name: str) -> Optional[Dict[str, Any]]:
-        """Bir profili yükle."""
+        """Bir profili yükle (mtime değişmediyse cache'den)."""
         path = PROFILES_DIR / f"{name}.json"
-        if not path.exists():
+        key = _file_key(path)
+        if key is None:
+            self._profile_cache.pop(name, None)
             log.warning("Profil bulunamadı: %s", name)
             return None
+
+        cached = self._profile_cache.get(name)
+        if cached is not None and cached[0] == key:
+            return copy.deepcopy(cached[1])
+
         try:
             with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
+                data = json.load(f)
         except (json.JSONDecodeError, IOError) as e:
             log.error("Profil okunamadı (%s): %s", name, e)
             return None
+        self._profile_cache[name] = (key, data)
+        return copy.deepcopy(data)
 
     def save_profile(self, name: str, data: Dict[str, Any]):
-        """Bir profili kaydet."""
+        """Bir profili atomik olarak kaydet."""
         path = PROFILES_DIR / f"{name}.json"
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            atomic_write_json(path, data)
+            key = _file_key(path)
+            if key is not None:
+                self._profile_cache[name] = (key, copy.deepcopy(data))
             log.info("Profil kaydedildi: %s", name)
-        except IOError as e:
+        except (IOError, OSError) as e:
             log.error("Profil kaydedilemedi (%s): %s", name, e)
 
     def delete_profile(self, name: str) -> bool:
         """Bir profili sil."""
         path = PROFILES_DIR / f"{name}.json"
+        self._profile_cache.pop(name, None)
         if path.exists():
             path.unlink()
             log.info("Profil silindi: %s", name)
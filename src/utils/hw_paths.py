@@ -0,0 +1,42 @@
+"""
+Monster HW Controller - Hardware Paths
+sysfs/debugfs/dev yollarını ve donanım araçlarını (nvidia-smi) tek noktadan
+çözer. MONSTER_HW_ROOT ayarlıysa tüm yollar bu kökün altına yönlendirilir;
+böylece controller'lar sahte bir donanım ağacına karşı (benchmarks/fake_hw.py)
+gerçek laptop olmadan çalıştırılabilir.
+"""
+
+import os
+from pathlib import Path
+
+HW_ROOT_ENV = "MONSTER_HW_ROOT"
+
+# Sahte kök altında araçların aranacağı dizin
+HW_ROOT_BIN = "usr/bin"
+
+
+def hw_root() -> str:
+    """Etkin donanım kökü ('' = gerçek sistem)."""
+    return os.environ.get(HW_ROOT_ENV, "")
+
+
+def hw_path(path: str) -> Path:
+    """Mutlak bir sistem yolunu etkin donanım köküne göre çöz."""
+    root = hw_root()
+    if not root:
+        return Path(path)
+    return Path(root) / path.lstrip("/")
+
+
+def hw_tool(name: str) -> str:
+    """Donanım aracının çağrılacak adı/yolu.
+
+    Sahte kök altında <kök>/usr/bin/<ad> varsa onun tam yolu döner,
+    aksi halde ad PATH üzerinden çözülür.
+    """
+    root = hw_root()
+    if root:
+        stub = Path(root) / HW_ROOT_BIN / name
+        if stub.exists():
+            return str(stub)
+    return name
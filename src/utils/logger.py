@@ -1,33 +1,115 @@
 """
 Monster HW Controller - Logger Utility
 Merkezi loglama yapılandırması.
+
+Log kayıtları bir kuyruğa (QueueHandler) bırakılır ve dosya/konsol yazımı
+arka plan thread'inde (QueueListener) yapılır; böylece fan eğrisi thread'i
+ve D-Bus ana döngüsü dosya I/O'su veya rotasyon yüzünden beklemez.
+Aynı mesajın hızlı tekrarları (ör. "EC IBF timeout!") hız sınırlanır.
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 LOG_DIR = Path.home() / ".config" / "monster-hw-ctrl" / "logs"
 LOG_FILE = LOG_DIR / "monster-hw-ctrl.log"
 LOG_MAX_BYTES = 5 * 1024 * 1024  # 5 MB
 LOG_BACKUP_COUNT = 3
 
+# Aynı mesaj (argümanlar uygulanmış) pencere başına en fazla RATE_LIMIT_BURST kez yazılır
+RATE_LIMIT_WINDOW_SEC = 10.0
+RATE_LIMIT_BURST = 3
+
+# systemd altında kompakt mod: konsola (journal) yalnızca uyarı ve üstü,
+# zaman damgasız yazılır; ayrıntılı kayıtlar yalnızca dosyaya gider
+COMPACT_ENV = "MONSTER_LOG_COMPACT"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Aynı (logger, mesaj) çiftinin hızlı tekrarlarını bastırır.
+
+    Anahtar argümanları uygulanmış mesajdır (getMessage()); aynı şablonla
+    farklı sensör/değer bildiren kayıtlar (ör. "%s: %.1f°C") birbirini
+    bastırmaz. Pencere başına ilk RATE_LIMIT_BURST kayıt geçer; sonrakiler
+    sayılır ve bir sonraki pencerenin ilk kaydına bastırılan adet eklenir.
+    CRITICAL kayıtlar asla bastırılmaz.
+    """
+
+    def __init__(self, window: float = RATE_LIMIT_WINDOW_SEC, burst: int = RATE_LIMIT_BURST):
+        super().__init__()
+        self._window = window
+        self._burst = burst
+        self._lock = threading.Lock()
+        # key -> [pencere başlangıcı, pencerede geçen, bastırılan]
+        self._state: Dict[Tuple[str, str], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.CRITICAL:
+            return True
+        try:
+            message = record.getMessage()
+        except Exception:  # Biçim hatası handler'da raporlanır
+            message = str(record.msg)
+        key = (record.name, message)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._state.get(key)
+            if entry is None or now - entry[0] >= self._window:
+                suppressed = entry[2] if entry else 0
+                self._state[key] = [now, 1, 0]
+                if len(self._state) > 1024:
+                    self._prune(now)
+                if suppressed:
+                    record.msg = f"{record.msg} [önceki {suppressed} tekrar bastırıldı]"
+                return True
+            if entry[1] < self._burst:
+                entry[1] += 1
+                return True
+            entry[2] += 1
+            return False
+
+    def _prune(self, now: float):
+        for key in [k for k, e in self._state.items() if now - e[0] >= self._window]:
+            del self._state[key]
 
-def setup_logger(name: str = "monster-hw-ctrl", level: int = logging.INFO) -> logging.Logger:
+
+def _compact_default() -> bool:
+    """Kompakt mod: açıkça istenmişse veya stdout journald'a bağlıysa."""
+    env = os.environ.get(COMPACT_ENV)
+    if env is not None:
+        return env.lower() in ("1", "true", "yes", "on")
+    return bool(os.environ.get("JOURNAL_STREAM"))
+
+
+def setup_logger(name: str = "monster-hw-ctrl", level: int = logging.INFO,
+                 compact: Optional[bool] = None) -> logging.Logger:
     """Uygulama logger'ını yapılandır ve döndür."""
+    global _listener
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
     logger = logging.getLogger(name)
     if logger.handlers:
         return logger
 
+    if compact is None:
+        compact = _compact_default()
+
     logger.setLevel(level)
     formatter = logging.Formatter(
         "[%(asctime)s] %(levelname)-8s %(name)-20s %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
+    handlers = []
 
     # Dosya handler (rotating)
     try:
@@ -37,20 +119,43 @@ def setup_logger(name: str = "monster-hw-ctrl", level: int = logging.INFO) -> lo
         )
         fh.setLevel(logging.DEBUG)
         fh.setFormatter(formatter)
-        logger.addHandler(fh)
+        handlers.append(fh)
     except (PermissionError, OSError) as e:
         # Dosya yazılamıyorsa konsola uyar
         sys.stderr.write(f"[monster-hw-ctrl] Log dosyası oluşturulamadı: {e}\n")
 
-    # Konsol handler
+    # Konsol handler (journald zaten zaman damgası ekler)
     ch = logging.StreamHandler(sys.stdout)
-    ch.setLevel(level)
-    ch.setFormatter(formatter)
-    logger.addHandler(ch)
+    if compact:
+        ch.setLevel(logging.WARNING if handlers else level)
+        ch.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    else:
+        ch.setLevel(level)
+        ch.setFormatter(formatter)
+    handlers.append(ch)
+
+    # Yazım arka plan thread'inde; çağıran thread yalnızca kuyruğa bırakır
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    qh = logging.handlers.QueueHandler(log_queue)
+    qh.addFilter(RateLimitFilter())
+    logger.addHandler(qh)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers,
+                                               respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
 
     return logger
 
 
+def shutdown_logging():
+    """Kuyruktaki kayıtları boşalt ve yazıcı thread'ini durdur."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def get_logger(module_name: str) -> logging.Logger:
     """Alt modül için logger al."""
     return logging.getLogger(f"monster-hw-ctrl.{module_name}")
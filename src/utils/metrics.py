@@ -0,0 +1,190 @@
+"""
+Monster HW Controller - Metrics
+Güncelleme/kontrol döngüsü aşamaları için hafif, sabit kovalı gecikme
+histogramları ve sayaçlar. DEBUG loglamayı açmadan hangi aşamanın yavaş
+olduğunu (sensör okuma, nvidia sorgusu, EC, termal kontrol, fan yazma,
+GUI güncelleme) görmek için kullanılır.
+
+Daemon metrikleri GetMetrics D-Bus metoduyla, GUI metrikleri ise periyodik
+olarak CONFIG_DIR/metrics-gui.json'a yazılarak `monster-hw-ctrl stats`
+komutuna sunulur.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.config import CONFIG_DIR, atomic_write_json
+from src.utils.logger import get_logger
+
+log = get_logger("metrics")
+
+# Kova üst sınırları (ms); son kova sınırsız (+Inf)
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+GUI_METRICS_FILE = CONFIG_DIR / "metrics-gui.json"
+METRICS_DUMP_INTERVAL_SEC = 15.0
+
+# Aşama adları
+STAGE_REFRESH_TICK = "refresh_tick"
+STAGE_SENSOR_READ = "sensor_read"
+STAGE_CPU_READ = "cpu_read"
+STAGE_NVIDIA_QUERY = "nvidia_query"
+STAGE_IGPU_READ = "igpu_read"
+STAGE_EC_READ = "ec_read"
+STAGE_THERMAL_CHECK = "thermal_check"
+STAGE_FAN_WRITE = "fan_write"
+STAGE_FAN_CURVE_TICK = "fan_curve_tick"
+STAGE_GUI_UPDATE = "gui_update"
+STAGE_DBUS_CALL = "dbus_call"
+STAGE_WATCHDOG_TICK = "watchdog_tick"
+STAGE_PROCESS_SAMPLE = "process_sample"
+
+# Sayaç adları
+# Döngü başına tur/aşım sayaçları (aynı süreçte iki döngü aynı sayacı paylaşmasın)
+COUNTER_FAN_CURVE_TICKS = "fan_curve_ticks"
+COUNTER_FAN_CURVE_OVERRUNS = "fan_curve_overruns"
+COUNTER_GUI_TICKS = "gui_ticks"
+COUNTER_GUI_OVERRUNS = "gui_overruns"
+COUNTER_EC_TIMEOUTS = "ec_timeouts"
+COUNTER_SMI_TIMEOUTS = "nvidia_smi_timeouts"
+COUNTER_WATCHDOG_FAILSAFE = "watchdog_failsafe"
+
+
+class LatencyHistogram:
+    """Sabit kovalı gecikme histogramı (ms)."""
+
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def quantile(self, q: float) -> float:
+        """Yaklaşık quantile: hedef sıraya ulaşılan kovanın üst sınırı (≤ max)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= rank and i < len(LATENCY_BUCKETS_MS):
+                return min(float(LATENCY_BUCKETS_MS[i]), self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum_ms, 3),
+            "max_ms": round(self.max_ms, 3),
+            "mean_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": list(self.counts),
+        }
+
+
+class MetricsRegistry:
+    """Süreç içi histogram ve sayaç kaydı (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._started = time.time()
+        self._last_dump: Optional[float] = None
+
+    def observe(self, stage: str, ms: float):
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = LatencyHistogram()
+            hist.observe(ms)
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    @contextmanager
+    def time(self, stage: str):
+        """Bloğun süresini `stage` histogramına ekle."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON'a uygun anlık görüntü."""
+        with self._lock:
+            return {
+                "started": self._started,
+                "uptime_sec": round(time.time() - self._started, 1),
+                "bucket_bounds_ms": list(LATENCY_BUCKETS_MS),
+                "counters": dict(self._counters),
+                "stages": {name: h.to_dict() for name, h in self._histograms.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._started = time.time()
+
+    def maybe_dump(self, path: Path = GUI_METRICS_FILE,
+                   interval: float = METRICS_DUMP_INTERVAL_SEC):
+        """En fazla `interval` saniyede bir anlık görüntüyü dosyaya yaz."""
+        now = time.monotonic()
+        if self._last_dump is not None and now - self._last_dump < interval:
+            return
+        self._last_dump = now
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_json(path, self.snapshot())
+        except OSError as e:
+            log.debug("Metrik dosyası yazılamadı: %s", e)
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Süreç genelinde paylaşılan metrik kaydı."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def format_metrics(snapshot: Dict[str, Any], title: str) -> str:
+    """`stats` komutu için okunabilir tablo."""
+    lines = [f"=== {title} (çalışma süresi {snapshot.get('uptime_sec', 0):.0f} s) ==="]
+    counters = snapshot.get("counters", {})
+    if counters:
+        lines.append("  " + "  ".join(f"{k}={v}" for k, v in sorted(counters.items())))
+    stages = snapshot.get("stages", {})
+    if not stages:
+        lines.append("  (henüz ölçüm yok)")
+        return "\n".join(lines)
+    lines.append(f"  {'aşama':<16} {'sayı':>8} {'ort':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>9}")
+    for name, h in sorted(stages.items(), key=lambda kv: kv[1]["p95_ms"], reverse=True):
+        lines.append(
+            f"  {name:<16} {h['count']:>8} {h['mean_ms']:>7.1f}ms {h['p50_ms']:>6.0f}ms "
+            f"{h['p95_ms']:>6.0f}ms {h['p99_ms']:>6.0f}ms {h['max_ms']:>7.1f}ms"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+"""
+Monster HW Controller - Snapshot Helpers
+Her turda yeniden doldurulan durum nesneleri (TempReading, CpuStatus, ...)
+için yardımcılar.
+
+Durum sınıfları `@dataclass(slots=True)`'dir; çekirdek başına değerler
+array('i')/array('f') tamponlarında tutulur. Sürekli çalışan döngüler
+(GUI yenileme, telemetri) nesneleri `DoubleBuffer` ile iki kopya arasında
+dönüşümlü kullanır: biri doldurulurken önceki tur okunabilir kalır,
+tur başına yeni nesne/liste oluşmaz. D-Bus/JSON için `snapshot_to_dict`.
+"""
+
+import functools
+from array import array
+from dataclasses import MISSING, fields, is_dataclass
+from typing import Any, Callable, Dict, Generic, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+@functools.lru_cache(maxsize=None)
+def _scalar_defaults(cls) -> Tuple[Tuple[str, Any], ...]:
+    """default_factory'siz alanların varsayılanları (tamponlar ve listeler hariç)."""
+    return tuple((f.name, f.default) for f in fields(cls) if f.default is not MISSING)
+
+
+def _plain(value):
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if is_dataclass(value):
+        return snapshot_to_dict(value)
+    return value
+
+
+def snapshot_to_dict(obj) -> Dict[str, Any]:
+    """Durum nesnesini JSON'a uygun sözlüğe çevir (tamponlar listeye)."""
+    return {name: _plain(getattr(obj, name)) for name in _field_names(type(obj))}
+
+
+def reset_snapshot(obj):
+    """Skaler alanları varsayılana döndür; tamponlar doldurulurken yeniden boyutlanır."""
+    for name, default in _scalar_defaults(type(obj)):
+        setattr(obj, name, default)
+
+
+def copy_snapshot(dst, src):
+    """src'yi dst'ye kopyala; dst'nin tamponları yerinde yeniden kullanılır."""
+    for name in _field_names(type(src)):
+        value = getattr(src, name)
+        if isinstance(value, array):
+            buf = getattr(dst, name)
+            fit_array(buf, len(value))
+            buf[:] = value
+        else:
+            setattr(dst, name, value)
+
+
+def fit_array(buf: array, size: int):
+    """Tamponu `size` elemana getir (boyut aynıysa hiçbir şey yapmaz)."""
+    n = len(buf)
+    if n > size:
+        del buf[size:]
+    elif n < size:
+        buf.frombytes(bytes((size - n) * buf.itemsize))
+
+
+class DoubleBuffer(Generic[T]):
+    """Önceden oluşturulmuş iki nesne; `next()` arka tamponu döndürür.
+
+    Yalnızca tek bir döngü (thread) tarafından kullanılmalıdır.
+    """
+
+    __slots__ = ("_buffers", "_index")
+
+    def __init__(self, factory: Callable[[], T]):
+        self._buffers = (factory(), factory())
+        self._index = 0
+
+    def next(self) -> T:
+        self._index ^= 1
+        return self._buffers[self._index]
+
+    @property
+    def front(self) -> T:
+        """En son `next()` ile verilen (doldurulmuş) nesne."""
+        return self._buffers[self._index]
@@ -0,0 +1,125 @@
+"""
+Monster HW Controller - Startup Profiler
+Açılış süresi ölçümü: import'lar, controller kurucuları, GUI inşası ve ilk
+güncelleme döngüsü için duvar saati süreleri toplanır ve sıralı rapor basılır.
+
+Etkinleştirme: `--profile-startup` bayrağı veya MONSTER_PROFILE_STARTUP=1.
+`--startup-budget-ms N` (veya MONSTER_STARTUP_BUDGET_MS) verilirse uygulama
+ilk güncellemeden sonra çıkar; toplam süre bütçeyi aşarsa çıkış kodu 1 olur.
+Kapalıyken tüm yardımcılar sıfır maliyetlidir.
+"""
+
+import importlib
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, List, Optional, Tuple
+
+ENV_ENABLE = "MONSTER_PROFILE_STARTUP"
+ENV_BUDGET = "MONSTER_STARTUP_BUDGET_MS"
+
+# Açılışta ayrı ayrı ölçülen çekirdek modüller
+CORE_MODULES = (
+    "src.utils.config",
+    "src.utils.capabilities",
+    "src.core.cpu_controller",
+    "src.core.ec_access",
+    "src.core.fan_controller",
+    "src.core.gpu_intel",
+    "src.core.gpu_nvidia",
+    "src.core.temp_monitor",
+    "src.core.notifier",
+    "src.core.thermal_protection",
+    "src.core.apply_engine",
+    "src.core.profile_manager",
+)
+
+_t0 = time.perf_counter()
+_enabled = bool(os.environ.get(ENV_ENABLE))
+_budget_ms: Optional[float] = (
+    float(os.environ[ENV_BUDGET]) if os.environ.get(ENV_BUDGET) else None
+)
+_records: List[Tuple[str, float]] = []
+_finished = False
+
+
+def enable(budget_ms: Optional[float] = None):
+    """Profil modunu aç. budget_ms verilirse ilk güncellemeden sonra çıkılır."""
+    global _enabled, _budget_ms
+    _enabled = True
+    if budget_ms is not None:
+        _budget_ms = budget_ms
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def exit_after_startup() -> bool:
+    """Bütçe kontrolü istendiyse açılış bitince uygulama kapanmalı."""
+    return _enabled and _budget_ms is not None
+
+
+@contextmanager
+def timed(label: str):
+    """Bloğun süresini kaydet (profil kapalıyken no-op)."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _records.append((label, (time.perf_counter() - start) * 1000))
+
+
+def timed_call(label: str, func: Callable, *args, **kwargs):
+    """func(*args, **kwargs) çağrısını ölçerek sonucunu döndür."""
+    with timed(label):
+        return func(*args, **kwargs)
+
+
+def profile_imports(modules: Iterable[str]):
+    """Modülleri tek tek import ederek her birinin süresini kaydet.
+
+    Önceden yüklenmiş modüller atlanır; süreler kümülatiftir (alt import'lar
+    dahil) ve sırayla ölçüldükleri için her modül yalnızca kendi ek yükünü taşır.
+    """
+    if not _enabled:
+        return
+    for name in modules:
+        if name in sys.modules:
+            continue
+        with timed(f"import {name}"):
+            importlib.import_module(name)
+
+
+def total_ms() -> float:
+    """Modülün yüklenmesinden bu yana geçen süre."""
+    return (time.perf_counter() - _t0) * 1000
+
+
+def budget_exceeded() -> bool:
+    return _budget_ms is not None and total_ms() > _budget_ms
+
+
+def report() -> str:
+    """Kayıtları süreye göre azalan sırada biçimlendir."""
+    lines = ["=== Açılış Profili ==="]
+    for label, ms in sorted(_records, key=lambda r: r[1], reverse=True):
+        lines.append(f"  {ms:9.1f} ms  {label}")
+    lines.append(f"  {total_ms():9.1f} ms  TOPLAM")
+    if _budget_ms is not None:
+        verdict = "AŞILDI" if budget_exceeded() else "OK"
+        lines.append(f"  Bütçe: {_budget_ms:.0f} ms — {verdict}")
+    return "\n".join(lines)
+
+
+def finish():
+    """Açılış tamamlandı: raporu bir kez stderr'e bas."""
+    global _finished
+    if not _enabled or _finished:
+        return
+    _finished = True
+    sys.stderr.write(report() + "\n")
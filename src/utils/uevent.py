@@ -0,0 +1,193 @@
+"""
+Monster HW Controller - Kernel Uevent Monitor
+Çekirdek uevent'lerini (power_supply, hwmon, drm, ...) dinleyen tek bir
+arka plan thread'i. pyudev varsa onun netlink monitörü, yoksa doğrudan
+NETLINK_KOBJECT_UEVENT soketi kullanılır; ikisi de zamanlayıcı gerektirmez.
+
+    monitor = UeventMonitor()
+    monitor.subscribe("power_supply", lambda ev: print(ev.action, ev.properties))
+    monitor.start()
+"""
+
+import os
+import select
+import socket
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+try:
+    import pyudev
+    HAS_PYUDEV = True
+except ImportError:
+    HAS_PYUDEV = False
+
+log = get_logger("uevent")
+
+NETLINK_KOBJECT_UEVENT = 15
+KERNEL_GROUP = 1
+RECV_BUFFER = 16384
+
+
+@dataclass
+class Uevent:
+    """Bir çekirdek uevent'i."""
+    action: str                 # add / remove / change / bind / ...
+    devpath: str                # /devices/... (sysfs'e göre)
+    subsystem: str
+    properties: Dict[str, str] = field(default_factory=dict)
+
+
+def parse_uevent(data: bytes) -> Optional[Uevent]:
+    """Çekirdek netlink mesajını ayrıştır: "action@devpath\\0KEY=VAL\\0..."."""
+    parts = data.split(b"\0")
+    if not parts or b"@" not in parts[0]:
+        return None  # udevd (libudev) mesajı veya bozuk veri
+    props: Dict[str, str] = {}
+    for item in parts[1:]:
+        key, sep, value = item.partition(b"=")
+        if sep:
+            props[key.decode("ascii", "replace")] = value.decode("utf-8", "replace")
+    return Uevent(
+        action=props.get("ACTION", ""),
+        devpath=props.get("DEVPATH", ""),
+        subsystem=props.get("SUBSYSTEM", ""),
+        properties=props,
+    )
+
+
+class UeventMonitor:
+    """Alt sisteme göre uevent aboneliği sağlayan dinleyici thread."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Callable[[Uevent], None]]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_r, self._stop_w = -1, -1
+        self._backend = ""
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def backend(self) -> str:
+        return self._backend
+
+    def subscribe(self, subsystem: str, callback: Callable[[Uevent], None]):
+        with self._lock:
+            self._subscribers.setdefault(subsystem, []).append(callback)
+
+    def start(self) -> bool:
+        """Dinlemeye başla; netlink açılamazsa False (çağıran yoklamaya düşer)."""
+        if self.running:
+            return True
+        source = self._open_pyudev() if HAS_PYUDEV else None
+        if source is None:
+            source = self._open_netlink()
+        if source is None:
+            return False
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, args=source, daemon=True,
+                                        name="uevent-monitor")
+        self._thread.start()
+        log.info("Uevent monitörü başladı (%s)", self._backend)
+        return True
+
+    def stop(self):
+        if self._stop_w >= 0:
+            try:
+                os.write(self._stop_w, b"x")
+            except OSError:
+                pass
+
+    def _open_pyudev(self):
+        try:
+            # Filtre yok: sonradan eklenen abonelikler de olay alsın
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.start()
+        except OSError as e:
+            log.debug("pyudev monitörü açılamadı: %s", e)
+            return None
+        self._backend = "pyudev"
+        return monitor.fileno(), lambda: self._read_pyudev(monitor)
+
+    def _open_netlink(self):
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC,
+                                 NETLINK_KOBJECT_UEVENT)
+            sock.bind((0, KERNEL_GROUP))
+            sock.setblocking(False)
+        except (OSError, AttributeError) as e:
+            log.warning("Uevent netlink soketi açılamadı: %s", e)
+            return None
+        self._backend = "netlink"
+        return sock.fileno(), lambda: self._read_netlink(sock)
+
+    @staticmethod
+    def _read_pyudev(monitor) -> List[Uevent]:
+        events = []
+        while True:
+            device = monitor.poll(timeout=0)
+            if device is None:
+                return events
+            events.append(Uevent(
+                action=device.action or "",
+                devpath=device.device_path,
+                subsystem=device.subsystem or "",
+                properties=dict(device.properties),
+            ))
+
+    @staticmethod
+    def _read_netlink(sock) -> List[Uevent]:
+        events = []
+        while True:
+            try:
+                data = sock.recv(RECV_BUFFER)
+            except BlockingIOError:
+                return events
+            except OSError as e:
+                # ENOBUFS: olay patlamasında kuyruk taştı, bazı olaylar kaçmış olabilir
+                log.debug("Uevent okuma hatası: %s", e)
+                return events
+            event = parse_uevent(data)
+            if event is not None:
+                events.append(event)
+
+    def _run(self, fd: int, read_events: Callable[[], List[Uevent]]):
+        poller = select.poll()
+        poller.register(fd, select.POLLIN)
+        poller.register(self._stop_r, select.POLLIN)
+        while True:
+            ready = {rfd for rfd, _ in poller.poll()}
+            if self._stop_r in ready:
+                break
+            for event in read_events():
+                self._dispatch(event)
+        os.close(self._stop_r)
+        os.close(self._stop_w)
+        self._stop_r, self._stop_w = -1, -1
+
+    def _dispatch(self, event: Uevent):
+        with self._lock:
+            callbacks = list(self._subscribers.get(event.subsystem, ()))
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                log.error("Uevent işleyici hatası (%s): %s", event.subsystem, e)
+
+
+_monitor: Optional[UeventMonitor] = None
+_monitor_lock = threading.Lock()
+
+
+def get_uevent_monitor() -> UeventMonitor:
+    """Süreç genelinde paylaşılan uevent monitörü (tek netlink soketi)."""
+    global _monitor
+    with _monitor_lock:
+        if _monitor is None:
+            _monitor = UeventMonitor()
+        return _monitor